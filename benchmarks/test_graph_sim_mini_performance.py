@@ -56,3 +56,40 @@ H_CHAIN_CIRCUIT_PATH = (
 )
 def test_graph_sim_mini(benchmark, circuit):
     benchmark(jl.run_graph_sim_mini, circuit)
+
+
+@pytest.mark.parametrize(
+    "adjacency_backend",
+    [
+        "adaptive",
+        # every vertex with a neighbor is stored as a bit row
+        jl.seval("n -> AdaptiveAdjacency(n; min_dense_degree=0)"),
+    ],
+)
+def test_cz_does_not_allocate(adjacency_backend):
+    # The rows are given enough capacity for any degree, so that only the
+    # simulation itself is measured and not the growth of the adjacency. The set
+    # backend is left out, as sets reallocate when they are rehashed after many
+    # deletions.
+    count_cz_allocations = jl.seval("""
+        function (adjacency_backend, n_vertices, n_passes)
+            lco = fill(H_code, n_vertices)
+            adj = empty_adjacency(adjacency_backend, n_vertices)
+            foreach(row -> sizehint!(row, n_vertices), adj.sparse_rows)
+            sizehint!(adj.scratch_neighbors, n_vertices)
+            sizehint!(adj.scratch_row, n_vertices)
+            control(i) = mod1(3i, n_vertices)
+            target(i) = mod1(7i + 1, n_vertices)
+            gates = [
+                (control(i), target(i))
+                for i in 1:10 * n_vertices if control(i) != target(i)
+            ]
+            apply_gates() = foreach(gate -> cz(lco, adj, gate...), gates)
+            for _ in 1:n_passes
+                apply_gates()  # compile and let the vertices switch representation
+            end
+            return @allocated apply_gates()
+        end
+        """)
+
+    assert count_cz_allocations(adjacency_backend, 50, 5) == 0
@@ -1,7 +1,11 @@
 import networkx as nx
 import pytest
 
-from benchq.resource_estimation.graph import substrate_scheduler
+from benchq.data_structures import CSRGraph
+from benchq.resource_estimation.graph import (
+    get_n_measurement_steps,
+    substrate_scheduler,
+)
 
 
 @pytest.mark.parametrize(
@@ -54,3 +58,25 @@ def test_substrate_scheduler_timing_barbell_graph(benchmark, chain_size, bell_si
 def test_substrate_scheduler_timing_erdos_renyi(benchmark, size, probablity_of_edge):
     graph = nx.erdos_renyi_graph(size, probablity_of_edge, seed=123)
     benchmark(substrate_scheduler, graph)
+
+
+@pytest.mark.parametrize(
+    "graph",
+    [nx.path_graph, nx.complete_graph, nx.star_graph, nx.wheel_graph],
+)
+@pytest.mark.parametrize(
+    "size",
+    [10, 100, 1000],
+)
+def test_native_scheduler_timing(benchmark, graph, size):
+    graph = CSRGraph.from_networkx(graph(size))
+    benchmark(get_n_measurement_steps, graph)
+
+
+@pytest.mark.parametrize(
+    "size",
+    [1000, 100000],
+)
+def test_native_scheduler_timing_erdos_renyi(benchmark, size):
+    graph = CSRGraph.from_networkx(nx.fast_gnp_random_graph(size, 10 / size, seed=123))
+    benchmark(get_n_measurement_steps, graph)
@@ -1,22 +1,24 @@
 ################################################################################
 # © Copyright 2022-2023 Zapata Computing Inc.
 ################################################################################
-import os
-import pathlib
-
-from juliacall import Main as jl
-
+from .graph_cache import GraphCache, get_default_graph_cache
+from .julia_runtime import jl, warmup
 from .julia_utils import (
+    encode_circuit,
     get_algorithmic_graph_and_icm_output,
     get_algorithmic_graph_from_graph_sim_mini,
     get_algorithmic_graph_from_Jabalizer,
+    get_csr_graph_from_graph_sim_mini,
+    get_graph_statistics_from_graph_sim_mini,
+    get_graph_trace_from_graph_sim_mini,
 )
 from .pyliqtr_compilation import pyliqtr_transpile_to_clifford_t
-from .transpilation import simplify_rotations
-
-jl.include(
-    os.path.join(pathlib.Path(__file__).parent.resolve(), "jabalizer_wrapper.jl"),
+from .simulation_control import (
+    SimulationCancelledError,
+    SimulationCheckpoint,
+    SimulationControl,
+    SimulationProgress,
+    print_progress,
 )
-
-
-jl.include(os.path.join(pathlib.Path(__file__).parent.resolve(), "graph_sim_mini.jl"))
+from .sysimage import build_sysimage
+from .transpilation import simplify_rotations
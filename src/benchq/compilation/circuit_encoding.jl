@@ -0,0 +1,218 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+"""This module contains a compact integer encoding of circuits which is shared by
+the julia simulators. Each gate is stored as an opcode together with the indices of
+the (at most two) qubits it acts on, with one column per field. Qubit indices are
+0-indexed, like in orquestra circuits, and single qubit gates use NO_QUBIT as their
+second qubit.
+
+Using this encoding instead of tuples of strings avoids parsing and hashing strings
+in the inner loops of the simulators.
+"""
+
+using PythonCall
+
+@enum Opcode::UInt8 begin
+    I_OP = 1
+    X_OP
+    Y_OP
+    Z_OP
+    H_OP
+    S_OP
+    S_DAGGER_OP
+    CZ_OP
+    CNOT_OP
+    T_OP
+    T_DAGGER_OP
+    RX_OP
+    RY_OP
+    RZ_OP
+end
+
+# names of the gates in orquestra, indexed by opcode
+const opcode_names = [
+    "I",
+    "X",
+    "Y",
+    "Z",
+    "H",
+    "S",
+    "S_Dagger",
+    "CZ",
+    "CNOT",
+    "T",
+    "T_Dagger",
+    "RX",
+    "RY",
+    "RZ",
+]
+const name_to_opcode = Dict(name => Opcode(i) for (i, name) in enumerate(opcode_names))
+
+const NO_QUBIT = Int32(-1)
+
+const non_clifford_opcodes = [T_OP, T_DAGGER_OP, RX_OP, RY_OP, RZ_OP]
+
+const n_opcodes = length(instances(Opcode))
+
+
+"""Lookup table indexed by opcode telling whether it is one of the given opcodes,
+so that checking a gate is a single index instead of a search through the list."""
+function opcode_mask(opcodes)
+    mask = zeros(Bool, n_opcodes)
+    for opcode in opcodes
+        mask[Int(opcode)] = true
+    end
+    return mask
+end
+
+
+"""Columnar integer representation of a circuit.
+
+Fields:
+    opcodes (Vector{Opcode}): gate applied at each step
+    qubit_1 (Vector{Int32}): first qubit each gate acts on
+    qubit_2 (Vector{Int32}): second qubit each gate acts on, NO_QUBIT if there
+        is none
+"""
+struct EncodedCircuit{
+    O<:AbstractVector{Opcode},Q1<:AbstractVector{Int32},Q2<:AbstractVector{Int32}
+}
+    opcodes::O
+    qubit_1::Q1
+    qubit_2::Q2
+end
+
+EncodedCircuit() = EncodedCircuit(Opcode[], Int32[], Int32[])
+
+Base.length(circuit::EncodedCircuit) = length(circuit.opcodes)
+
+# iterating over a circuit gives (opcode, qubit_1, qubit_2) tuples
+function Base.iterate(circuit::EncodedCircuit, i=1)
+    i > length(circuit) && return nothing
+    return (circuit.opcodes[i], circuit.qubit_1[i], circuit.qubit_2[i]), i + 1
+end
+
+function push_gate!(circuit::EncodedCircuit, opcode::Opcode, qubit_1, qubit_2=NO_QUBIT)
+    push!(circuit.opcodes, opcode)
+    push!(circuit.qubit_1, Int32(qubit_1))
+    push!(circuit.qubit_2, Int32(qubit_2))
+end
+
+function Base.sizehint!(circuit::EncodedCircuit, n)
+    sizehint!(circuit.opcodes, n)
+    sizehint!(circuit.qubit_1, n)
+    sizehint!(circuit.qubit_2, n)
+    return circuit
+end
+
+
+"""Get the opcode corresponding to the name of an orquestra gate.
+
+Raises:
+    ValueError: if the gate is not supported by the encoding
+"""
+function get_opcode(name::String)
+    opcode = get(name_to_opcode, name, nothing)
+    isnothing(opcode) && error("Unknown gate: $name")
+    return opcode
+end
+
+
+"""Encode an orquestra circuit into the integer representation.
+
+Args:
+    circuit (Circuit): orquestra circuit to encode
+
+Returns:
+    EncodedCircuit: integer representation of the circuit
+"""
+function encode_circuit(circuit)
+    encoded_circuit = EncodedCircuit()
+    sizehint!(encoded_circuit, pyconvert(Int, pylen(circuit.operations)))
+    for op in circuit.operations
+        push_gate!(encoded_circuit, encode_operation(op)...)
+    end
+    return encoded_circuit
+end
+
+
+"""Wrap a circuit encoded on the python side into numpy arrays by
+benchq.compilation.julia_utils.encode_circuit. The arrays are used in place, so
+neither are they copied nor are their elements converted one by one.
+
+Args:
+    opcodes (numpy.ndarray[uint8]): opcode of each gate
+    qubit_1 (numpy.ndarray[int32]): first qubit of each gate
+    qubit_2 (numpy.ndarray[int32]): second qubit of each gate, NO_QUBIT if none
+
+Returns:
+    EncodedCircuit: view of the arrays as an encoded circuit
+"""
+function wrap_encoded_circuit(opcodes, qubit_1, qubit_2)
+    return EncodedCircuit(
+        reinterpret(Opcode, as_column(UInt8, opcodes)),
+        as_column(Int32, qubit_1),
+        as_column(Int32, qubit_2),
+    )
+end
+
+as_column(::Type{T}, column::AbstractVector{T}) where {T} = column
+as_column(::Type{T}, column::Py) where {T} = PyArray{T,1}(column)
+
+
+"""Encode a single orquestra operation as an (opcode, qubit_1, qubit_2) tuple."""
+function encode_operation(op)
+    opcode = get_opcode(pyconvert(String, op.gate.name))
+    qubits = [pyconvert(Int32, qubit) for qubit in op.qubit_indices]
+    return opcode, qubits[1], length(qubits) > 1 ? qubits[2] : NO_QUBIT
+end
+
+
+"""
+Perfoms gates decomposition to provide a circuit in the icm format.
+Each gate in gates_to_decompose is replaced by a CNOT from every qubit it acts on
+to a new qubit, which takes the place of the old one for the rest of the circuit.
+Reference: https://arxiv.org/abs/1509.02004
+
+Args:
+    circuit (EncodedCircuit): circuit to compile
+    n_qubits (int): number of qubits in the circuit
+    gates_to_decompose (List[Opcode]): gates to replace
+
+Returns:
+    EncodedCircuit: the circuit in icm form
+    int: number of qubits in the icm circuit
+"""
+function get_icm(
+    circuit::EncodedCircuit,
+    n_qubits::Int,
+    gates_to_decompose::Vector{Opcode}=non_clifford_opcodes
+)
+    # compiled version of each qubit, indexed by the original qubit + 1
+    qubit_map = collect(Int32(0):Int32(n_qubits - 1))
+    compiled_circuit = EncodedCircuit()
+    sizehint!(compiled_circuit, length(circuit))
+    curr_qubits = n_qubits
+    is_decomposed = opcode_mask(gates_to_decompose)
+
+    for i in 1:length(circuit)
+        opcode = circuit.opcodes[i]
+        original_qubit_1 = circuit.qubit_1[i]
+        original_qubit_2 = circuit.qubit_2[i]
+
+        if is_decomposed[Int(opcode)]
+            for original_qubit in (original_qubit_1, original_qubit_2)
+                original_qubit == NO_QUBIT && continue
+                push_gate!(compiled_circuit, CNOT_OP, qubit_map[original_qubit+1], curr_qubits)
+                qubit_map[original_qubit+1] = curr_qubits
+                curr_qubits += 1
+            end
+        else
+            compiled_qubit_2 = original_qubit_2 == NO_QUBIT ? NO_QUBIT : qubit_map[original_qubit_2+1]
+            push_gate!(compiled_circuit, opcode, qubit_map[original_qubit_1+1], compiled_qubit_2)
+        end
+    end
+
+    return compiled_circuit, curr_qubits
+end
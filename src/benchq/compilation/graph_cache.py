@@ -0,0 +1,225 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+"""On-disk cache of the graphs produced for circuits.
+
+Graphs are stored under a hash of the circuit's gates and qubits, of the function
+which produced them and of the julia sources of the simulators, so a cached graph is
+never reused after the simulators change. When the cache grows above its size limit,
+the least recently used graphs are evicted.
+"""
+
+import hashlib
+import os
+import pathlib
+import tempfile
+import zipfile
+from functools import partial
+from typing import Callable, Optional, TypeVar, Union
+
+import networkx as nx
+import numpy as np
+from orquestra.quantum.circuits import Circuit
+
+from ..data_structures import CSRGraph, GraphStatistics
+from .julia_utils import (
+    EncodedCircuit,
+    encode_circuit,
+    get_algorithmic_graph_from_graph_sim_mini,
+    get_algorithmic_graph_from_Jabalizer,
+    get_csr_graph_from_graph_sim_mini,
+    get_graph_statistics_from_graph_sim_mini,
+)
+from .sysimage import get_sources_version
+
+# Directory of the cache used by the transformers when none is given explicitly
+GRAPH_CACHE_DIR_ENV = "BENCHQ_GRAPH_CACHE_DIR"
+GRAPH_CACHE_MAX_SIZE_ENV = "BENCHQ_GRAPH_CACHE_MAX_SIZE"
+
+DEFAULT_MAX_SIZE_IN_BYTES = 2**30
+
+AnyGraph = Union[nx.Graph, CSRGraph, GraphStatistics]
+GraphType = TypeVar("GraphType", nx.Graph, CSRGraph, GraphStatistics)
+
+SIMULATOR_VERSION = get_sources_version()
+
+# Graph production methods which accept encoded circuits, so that the circuits
+# encoded for their keys don't have to be encoded again
+_ENCODED_CIRCUIT_METHODS = (
+    get_algorithmic_graph_from_graph_sim_mini,
+    get_algorithmic_graph_from_Jabalizer,
+    get_csr_graph_from_graph_sim_mini,
+    get_graph_statistics_from_graph_sim_mini,
+)
+
+
+class GraphCache:
+    """Size bounded, least recently used cache of graphs stored in a directory.
+
+    Args:
+        directory: where the graphs are stored. Created if it doesn't exist.
+        max_size_in_bytes: once the graphs take more space than this, the least
+            recently used ones are deleted.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, os.PathLike],
+        max_size_in_bytes: int = DEFAULT_MAX_SIZE_IN_BYTES,
+    ):
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size_in_bytes = max_size_in_bytes
+
+    def key(self, circuit: Union[Circuit, EncodedCircuit], method_name: str) -> str:
+        """Canonical hash of the circuit's gates and qubits, gate parameters are
+        ignored since they don't change the graph."""
+        encoded_circuit = encode_circuit(circuit)
+        key = hashlib.sha256()
+        key.update(SIMULATOR_VERSION.encode())
+        key.update(method_name.encode())
+        key.update(encoded_circuit.digest().encode())
+        return key.hexdigest()
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / f"{key}.npz"
+
+    def get(self, key: str) -> Optional[AnyGraph]:
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                graph = _deserialize(data)
+            # mark as recently used
+            os.utime(path)
+        # missing, truncated or otherwise corrupt files are misses
+        except (KeyError, ValueError, OSError, EOFError, zipfile.BadZipFile):
+            return None
+        return graph
+
+    def put(self, key: str, graph: AnyGraph) -> None:
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=self.directory, suffix=".tmp"
+        )
+        with os.fdopen(file_descriptor, "wb") as file:
+            np.savez(file, **_serialize(graph))
+        os.replace(temporary_path, self._path(key))
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.npz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size_in_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+    def cached(
+        self, graph_production_method: Callable[[Circuit], GraphType]
+    ) -> Callable[[Circuit], GraphType]:
+        """Wraps a graph production method so that graphs are looked up in the cache
+        before being computed, and stored in it afterwards."""
+        method_name = _get_method_name(graph_production_method)
+        accepts_encoded_circuits = _accepts_encoded_circuits(graph_production_method)
+
+        def _cached_graph_production_method(circuit: Circuit) -> GraphType:
+            encoded_circuit = encode_circuit(circuit)
+            key = self.key(encoded_circuit, method_name)
+            graph = self.get(key)
+            if graph is None:
+                graph = graph_production_method(
+                    encoded_circuit if accepts_encoded_circuits else circuit
+                )
+                self.put(key, graph)
+            return graph
+
+        return _cached_graph_production_method
+
+
+def _get_method_name(method) -> str:
+    # partials are named after their function and arguments, e.g. a graph sim mini
+    # with a different adjacency backend, since their repr contains addresses
+    if isinstance(method, partial):
+        arguments = [repr(argument) for argument in method.args] + [
+            f"{name}={value!r}" for name, value in sorted(method.keywords.items())
+        ]
+        return f"{_get_method_name(method.func)}({', '.join(arguments)})"
+    name = getattr(method, "__qualname__", repr(method))
+    return f"{method.__module__}.{name}"
+
+
+def _accepts_encoded_circuits(method) -> bool:
+    while isinstance(method, partial):
+        method = method.func
+    return method in _ENCODED_CIRCUIT_METHODS
+
+
+def get_default_graph_cache() -> Optional[GraphCache]:
+    """Returns the cache in the directory given by the BENCHQ_GRAPH_CACHE_DIR
+    environment variable, or None if it is not set."""
+    directory = os.getenv(GRAPH_CACHE_DIR_ENV)
+    if not directory:
+        return None
+    max_size_in_bytes = int(
+        os.getenv(GRAPH_CACHE_MAX_SIZE_ENV, DEFAULT_MAX_SIZE_IN_BYTES)
+    )
+    return GraphCache(directory, max_size_in_bytes)
+
+
+def _serialize(graph: AnyGraph) -> dict:
+    if isinstance(graph, GraphStatistics):
+        return {
+            "kind": np.array("statistics"),
+            "counts": np.array(
+                [
+                    graph.n_nodes,
+                    graph.n_edges,
+                    graph.max_degree,
+                    graph.n_isolated_nodes,
+                ]
+            ),
+            "degree_histogram": np.asarray(graph.degree_histogram),
+        }
+    if isinstance(graph, nx.Graph):
+        # nodes are stored explicitly since they aren't always labeled 0 to n - 1
+        return {
+            "kind": np.array("networkx"),
+            "nodes": np.array(list(graph.nodes), dtype=np.int64),
+            "edges": np.array(list(graph.edges), dtype=np.int64).reshape(-1, 2),
+        }
+    return {
+        "kind": np.array("csr"),
+        "indptr": np.asarray(graph.indptr),
+        "indices": np.asarray(graph.indices),
+    }
+
+
+def _deserialize(data) -> AnyGraph:
+    kind = str(data["kind"])
+    if kind == "statistics":
+        n_nodes, n_edges, max_degree, n_isolated_nodes = data["counts"].tolist()
+        return GraphStatistics(
+            n_nodes=n_nodes,
+            n_edges=n_edges,
+            max_degree=max_degree,
+            n_isolated_nodes=n_isolated_nodes,
+            degree_histogram=data["degree_histogram"],
+        )
+    if kind == "networkx":
+        graph = nx.Graph()
+        graph.add_nodes_from(data["nodes"].tolist())
+        graph.add_edges_from(data["edges"].tolist())
+        return graph
+    if kind == "csr":
+        return CSRGraph(indptr=data["indptr"], indices=data["indices"])
+    raise ValueError(f"Unknown kind of cached graph: {kind}")
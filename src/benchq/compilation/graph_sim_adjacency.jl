@@ -0,0 +1,307 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+"""This module contains the adjacency backends of graph sim mini. Both of them
+implement the same small interface (n_vertices, push_vertex!, vertex_degree,
+is_connected, vertex_neighbors, toggle_edge and complement_neighborhood!), so the
+simulator is written once against it.
+
+- :set stores the neighbors of each vertex in a Set{Int}.
+- :adaptive stores the neighbors of low degree vertices in sorted vectors and those
+  of high degree vertices in bit rows, so that local complementation of highly
+  connected graphs is done with word-wide xors instead of hashing every pair of
+  neighbors. Vertices switch between both representations as their degree changes.
+
+Vertices are 1-indexed.
+"""
+
+"""Adjacency storing the neighbors of each vertex in a set.
+
+Fields:
+    rows (Vector{Set{Int}}): neighbors of each vertex
+"""
+struct SetAdjacency
+    rows::Vector{Set{Int}}
+    # buffer reused by complement_neighborhood!
+    scratch_neighbors::Vector{Int}
+end
+
+SetAdjacency(n_vertices::Integer) = SetAdjacency([Set{Int}() for _ in 1:n_vertices], Int[])
+
+n_vertices(adj::SetAdjacency) = length(adj.rows)
+push_vertex!(adj::SetAdjacency) = push!(adj.rows, Set{Int}())
+vertex_degree(adj::SetAdjacency, v) = length(adj.rows[v])
+is_connected(adj::SetAdjacency, v, u) = u in adj.rows[v]
+vertex_neighbors(adj::SetAdjacency, v) = adj.rows[v]
+
+
+"""If vertices vertex_1 and vertex_2 are connected, we remove the edge.
+Otherwise, add it.
+
+Args:
+    adj (SetAdjacency): adjacency list describing the graph state
+    vertex_1 (int): index of vertex to be connected or disconnected
+    vertex_2 (int): index of vertex to be connected or disconnected
+"""
+function toggle_edge(adj::SetAdjacency, vertex_1, vertex_2)
+    rows = adj.rows
+    if vertex_2 in rows[vertex_1] || vertex_1 in rows[vertex_2]
+        delete!(rows[vertex_1], vertex_2)
+        delete!(rows[vertex_2], vertex_1)
+    else
+        push!(rows[vertex_1], vertex_2)
+        push!(rows[vertex_2], vertex_1)
+    end
+end
+
+
+"""Toggle all the edges between the neighbors of v."""
+function complement_neighborhood!(adj::SetAdjacency, v)
+    neighbors = adj.scratch_neighbors
+    empty!(neighbors)
+    append!(neighbors, adj.rows[v])
+    for i in 1:length(neighbors)
+        for j in i+1:length(neighbors)
+            toggle_edge(adj, neighbors[i], neighbors[j])
+        end
+    end
+end
+
+
+"""Adjacency storing each vertex either as a sorted vector of its neighbors or, once
+its degree is high enough, as a bit row over all the vertices.
+
+Fields:
+    sparse_rows (Vector{Vector{Int32}}): sorted neighbors of each sparse vertex
+    dense_rows (Vector{BitVector}): neighbors of each dense vertex, as bit rows
+    is_dense (Vector{Bool}): which representation each vertex uses
+    degrees (Vector{Int}): degree of each vertex
+    min_dense_degree (int): vertices with a lower degree are never dense
+"""
+struct AdaptiveAdjacency
+    sparse_rows::Vector{Vector{Int32}}
+    dense_rows::Vector{BitVector}
+    is_dense::Vector{Bool}
+    degrees::Vector{Int}
+    min_dense_degree::Int
+    # buffers reused by complement_neighborhood!
+    scratch_neighbors::Vector{Int32}
+    scratch_row::Vector{Int32}
+    mask::BitVector
+end
+
+function AdaptiveAdjacency(n_vertices::Integer; min_dense_degree::Integer=64)
+    return AdaptiveAdjacency(
+        [Int32[] for _ in 1:n_vertices],
+        [BitVector() for _ in 1:n_vertices],
+        zeros(Bool, n_vertices),
+        zeros(Int, n_vertices),
+        min_dense_degree,
+        Int32[],
+        Int32[],
+        BitVector(),
+    )
+end
+
+n_vertices(adj::AdaptiveAdjacency) = length(adj.degrees)
+vertex_degree(adj::AdaptiveAdjacency, v) = adj.degrees[v]
+
+function push_vertex!(adj::AdaptiveAdjacency)
+    push!(adj.sparse_rows, Int32[])
+    push!(adj.dense_rows, BitVector())
+    push!(adj.is_dense, false)
+    push!(adj.degrees, 0)
+    return adj
+end
+
+function is_connected(adj::AdaptiveAdjacency, v, u)
+    if adj.is_dense[v]
+        row = adj.dense_rows[v]
+        return u <= length(row) && row[u]
+    end
+    row = adj.sparse_rows[v]
+    i = searchsortedfirst(row, u)
+    return i <= length(row) && row[i] == u
+end
+
+function vertex_neighbors(adj::AdaptiveAdjacency, v)
+    return adj.is_dense[v] ? BitRowNeighbors(adj.dense_rows[v]) : adj.sparse_rows[v]
+end
+
+
+"""Iterates over the neighbors in a bit row without collecting them."""
+struct BitRowNeighbors
+    row::BitVector
+end
+
+function Base.iterate(neighbors::BitRowNeighbors, start=1)
+    u = findnext(neighbors.row, start)
+    return isnothing(u) ? nothing : (u, u + 1)
+end
+
+Base.IteratorSize(::Type{BitRowNeighbors}) = Base.SizeUnknown()
+Base.eltype(::Type{BitRowNeighbors}) = Int
+
+function toggle_edge(adj::AdaptiveAdjacency, vertex_1, vertex_2)
+    toggle_entry!(adj, vertex_1, vertex_2)
+    toggle_entry!(adj, vertex_2, vertex_1)
+end
+
+
+"""Toggle all the edges between the neighbors of v. Each neighbor u of v gets its
+row replaced by its symmetric difference with the other neighbors of v, which is a
+single xor with a mask of the neighborhood for dense rows and a merge of sorted
+vectors for sparse ones.
+"""
+function complement_neighborhood!(adj::AdaptiveAdjacency, v)
+    neighborhood = adj.scratch_neighbors
+    empty!(neighborhood)
+    if adj.is_dense[v]
+        row = adj.dense_rows[v]
+        u = findnext(row, 1)
+        while !isnothing(u)
+            push!(neighborhood, u)
+            u = findnext(row, u + 1)
+        end
+    else
+        append!(neighborhood, adj.sparse_rows[v])
+    end
+    length(neighborhood) < 2 && return
+
+    n = n_vertices(adj)
+    mask = adj.mask
+    mask_is_built = false
+    for u in neighborhood
+        if adj.is_dense[u]
+            if !mask_is_built
+                resize!(mask, n)
+                fill!(mask, false)
+                for w in neighborhood
+                    mask[w] = true
+                end
+                mask_is_built = true
+            end
+            row = adj.dense_rows[u]
+            grow_row!(row, n)
+            map!(xor, row, row, mask)
+            row[u] = false  # u is not a neighbor of itself
+            adj.degrees[u] = count(row)
+        else
+            symmetric_difference!(adj, u, neighborhood)
+        end
+        update_representation!(adj, u)
+    end
+end
+
+
+# Vertices with at least this degree are stored as bit rows. A bit row takes n / 8
+# bytes and a sorted vector 4 bytes per neighbor, so they break even at degree n / 32.
+dense_threshold(adj::AdaptiveAdjacency) =
+    max(adj.min_dense_degree, n_vertices(adj) ÷ 32, 1)
+
+
+function toggle_entry!(adj::AdaptiveAdjacency, v, u)
+    if adj.is_dense[v]
+        row = adj.dense_rows[v]
+        grow_row!(row, u)
+        row[u] = !row[u]
+        adj.degrees[v] += row[u] ? 1 : -1
+    else
+        row = adj.sparse_rows[v]
+        i = searchsortedfirst(row, u)
+        if i <= length(row) && row[i] == u
+            deleteat!(row, i)
+            adj.degrees[v] -= 1
+        else
+            insert!(row, i, Int32(u))
+            adj.degrees[v] += 1
+        end
+    end
+    update_representation!(adj, v)
+end
+
+
+"""Replace the sorted neighbors of u by their symmetric difference with the sorted
+neighborhood, leaving out u itself."""
+function symmetric_difference!(adj::AdaptiveAdjacency, u, neighborhood)
+    row = adj.sparse_rows[u]
+    result = adj.scratch_row
+    empty!(result)
+    i = 1
+    j = 1
+    while i <= length(row) || j <= length(neighborhood)
+        if j <= length(neighborhood) && neighborhood[j] == u
+            j += 1
+        elseif j > length(neighborhood) || (i <= length(row) && row[i] < neighborhood[j])
+            push!(result, row[i])
+            i += 1
+        elseif i > length(row) || neighborhood[j] < row[i]
+            push!(result, neighborhood[j])
+            j += 1
+        else  # the edge exists, so it is removed
+            i += 1
+            j += 1
+        end
+    end
+    resize!(row, length(result))
+    copyto!(row, result)
+    adj.degrees[u] = length(row)
+end
+
+
+"""Switch the representation of v if its degree crossed the threshold. Rows only
+become sparse again well below the threshold, so that vertices whose degree
+oscillates around it are not converted back and forth."""
+function update_representation!(adj::AdaptiveAdjacency, v)
+    threshold = dense_threshold(adj)
+    if !adj.is_dense[v] && adj.degrees[v] >= threshold
+        row = adj.dense_rows[v]
+        resize!(row, n_vertices(adj))
+        fill!(row, false)
+        for u in adj.sparse_rows[v]
+            row[u] = true
+        end
+        adj.sparse_rows[v] = Int32[]
+        adj.is_dense[v] = true
+    elseif adj.is_dense[v] && adj.degrees[v] < threshold ÷ 4
+        adj.sparse_rows[v] = Int32.(findall(adj.dense_rows[v]))
+        adj.dense_rows[v] = BitVector()
+        adj.is_dense[v] = false
+    end
+end
+
+
+"""Make sure a bit row has at least n entries, new vertices not being neighbors."""
+function grow_row!(row::BitVector, n)
+    old_length = length(row)
+    if old_length < n
+        resize!(row, n)
+        row[old_length+1:n] .= false
+    end
+end
+
+
+"""Create an adjacency with n_vertices isolated vertices.
+
+Args:
+    backend (Union[Symbol, String, Function]): :set or :adaptive, or a function
+        creating the adjacency from the number of vertices
+    n_vertices (int): number of vertices
+
+Raises:
+    ArgumentError: if the backend is unknown
+"""
+function empty_adjacency(backend::Symbol, n_vertices::Integer)
+    if backend == :set
+        return SetAdjacency(n_vertices)
+    elseif backend == :adaptive
+        return AdaptiveAdjacency(n_vertices)
+    else
+        throw(ArgumentError("Unknown adjacency backend: $backend"))
+    end
+end
+
+empty_adjacency(backend::AbstractString, n_vertices::Integer) =
+    empty_adjacency(Symbol(backend), n_vertices)
+
+empty_adjacency(backend::Function, n_vertices::Integer) = backend(n_vertices)
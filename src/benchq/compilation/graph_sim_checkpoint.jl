@@ -0,0 +1,185 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+"""This module contains the checkpointing of long simulations, so that they can be
+resumed after a crash or a preemption instead of being started over.
+
+A checkpoint stores the number of operations done, the local clifford operations and
+the graph in compressed sparse row format. In streaming mode it also stores the map
+from the original qubits to the qubits of the icm circuit. It is only resumed from by
+a simulation of a circuit with the same hash in the same mode, otherwise it is
+ignored and overwritten.
+"""
+
+const CHECKPOINT_MAGIC = b"BENCHQ_GRAPH_SIM_CHECKPOINT_1"
+
+
+"""Periodically saves the state of a simulation to a file.
+
+Fields:
+    path (String): file the checkpoints are written to
+    circuit_hash (String): hash of the simulated circuit, a checkpoint is only
+        resumed from by the simulation of the circuit with the same hash
+    every_seconds (float): time between two checkpoints
+    every_ops (int): number of operations between two checkpoints
+    remove_when_done (bool): whether the checkpoint is deleted once the simulation
+        finished
+    check_every_ops (int): number of operations between two looks at the time
+"""
+mutable struct Checkpointer
+    path::String
+    circuit_hash::String
+    every_seconds::Float64
+    every_ops::Int
+    remove_when_done::Bool
+    check_every_ops::Int
+    # state of the current simulation
+    last_checkpoint_time::Float64
+    last_checkpoint_ops::Int
+    next_check::Int
+end
+
+function Checkpointer(
+    path::AbstractString,
+    circuit_hash::AbstractString;
+    every_seconds::Real=600,
+    every_ops::Integer=typemax(Int),
+    remove_when_done::Bool=true,
+    check_every_ops::Integer=1024
+)
+    return Checkpointer(
+        path, circuit_hash, every_seconds, every_ops, remove_when_done, check_every_ops,
+        0.0, 0, 0,
+    )
+end
+
+
+"""State of a simulation restored from a checkpoint."""
+struct SimulationState{A}
+    n_ops_done::Int
+    lco::Vector{Int}
+    adj::A
+    qubit_map::Vector{Int32}
+end
+
+
+"""Restore the state saved by a previous run of the same simulation and start
+checkpointing the current one.
+
+Args:
+    checkpointer (Checkpointer): nothing if the simulation isn't checkpointed
+    streaming (bool): whether the simulation is in streaming mode
+    adjacency_backend (Symbol): adjacency the graph is restored into
+
+Returns:
+    SimulationState: the restored state, nothing if there is no usable checkpoint
+"""
+start_checkpointing!(::Nothing, streaming, adjacency_backend) = nothing
+
+function start_checkpointing!(checkpointer::Checkpointer, streaming, adjacency_backend)
+    state = load_checkpoint(checkpointer, streaming, adjacency_backend)
+    n_ops_done = isnothing(state) ? 0 : state.n_ops_done
+    checkpointer.last_checkpoint_time = time()
+    checkpointer.last_checkpoint_ops = n_ops_done
+    checkpointer.next_check = n_ops_done + min(checkpointer.check_every_ops, checkpointer.every_ops)
+    return state
+end
+
+
+"""Called by the simulation after each of its operations. Saves its state if the
+last checkpoint is old enough."""
+checkpoint_step!(::Nothing, n_ops_done, lco, adj, qubit_map, streaming) = nothing
+
+@inline function checkpoint_step!(
+    checkpointer::Checkpointer, n_ops_done, lco, adj, qubit_map, streaming
+)
+    if n_ops_done >= checkpointer.next_check
+        check_checkpoint!(checkpointer, n_ops_done, lco, adj, qubit_map, streaming)
+    end
+end
+
+
+"""Delete the checkpoint of a finished simulation, unless it should be kept."""
+finish_checkpointing!(::Nothing) = nothing
+
+function finish_checkpointing!(checkpointer::Checkpointer)
+    checkpointer.remove_when_done && rm(checkpointer.path; force=true)
+end
+
+
+@noinline function check_checkpoint!(
+    checkpointer::Checkpointer, n_ops_done, lco, adj, qubit_map, streaming
+)
+    checkpointer.next_check = n_ops_done + min(checkpointer.check_every_ops, checkpointer.every_ops)
+    now = time()
+    if (
+        n_ops_done - checkpointer.last_checkpoint_ops >= checkpointer.every_ops ||
+        now - checkpointer.last_checkpoint_time >= checkpointer.every_seconds
+    )
+        save_checkpoint(checkpointer, n_ops_done, lco, adj, qubit_map, streaming)
+        checkpointer.last_checkpoint_time = time()
+        checkpointer.last_checkpoint_ops = n_ops_done
+    end
+end
+
+
+"""Write the state of the simulation to the checkpoint file. The file is replaced
+atomically, so a crash while writing leaves the previous checkpoint intact."""
+function save_checkpoint(checkpointer::Checkpointer, n_ops_done, lco, adj, qubit_map, streaming)
+    indptr, indices = adjacency_to_csr(adj)
+    temporary_path = checkpointer.path * ".tmp"
+    open(temporary_path, "w") do io
+        write(io, CHECKPOINT_MAGIC)
+        write_vector(io, Vector{UInt8}(checkpointer.circuit_hash))
+        write(io, streaming)
+        write(io, Int64(n_ops_done))
+        write_vector(io, UInt8.(lco))
+        write_vector(io, indptr)
+        write_vector(io, indices)
+        write_vector(io, isnothing(qubit_map) ? Int32[] : qubit_map)
+    end
+    mv(temporary_path, checkpointer.path; force=true)
+end
+
+
+"""Read the checkpoint file, returning nothing if there is none, if it is for another
+circuit or mode, or if it can't be read."""
+function load_checkpoint(checkpointer::Checkpointer, streaming, adjacency_backend)
+    isfile(checkpointer.path) || return nothing
+    try
+        open(checkpointer.path, "r") do io
+            read(io, length(CHECKPOINT_MAGIC)) == CHECKPOINT_MAGIC || return nothing
+            String(read_vector(io, UInt8)) == checkpointer.circuit_hash || return nothing
+            read(io, Bool) == streaming || return nothing
+            n_ops_done = Int(read(io, Int64))
+            lco = Vector{Int}(read_vector(io, UInt8))
+            indptr = read_vector(io, Int64)
+            indices = read_vector(io, Int32)
+            qubit_map = read_vector(io, Int32)
+
+            adj = empty_adjacency(adjacency_backend, length(lco))
+            for v in 1:length(lco)
+                for k in indptr[v]+1:indptr[v+1]
+                    u = indices[k] + 1  # convert back to 1-indexing
+                    u > v && toggle_edge(adj, v, u)
+                end
+            end
+            return SimulationState(n_ops_done, lco, adj, qubit_map)
+        end
+    catch e
+        e isa EOFError || rethrow()
+        return nothing  # truncated file
+    end
+end
+
+
+function write_vector(io::IO, vector::Vector)
+    write(io, Int64(length(vector)))
+    write(io, vector)
+end
+
+function read_vector(io::IO, ::Type{T}) where {T}
+    vector = Vector{T}(undef, read(io, Int64))
+    read!(io, vector)
+    return vector
+end
@@ -134,3 +134,21 @@ const cz_table = [
         (1, 9, 7) (1, 9, 8) (1, 9, 5) (1, 9, 6) (1, 9, 2) (1, 9, 1) (1, 9, 4) (1, 9, 3) (0, 5, 1) (0, 5, 3) (0, 7, 3) (0, 7, 1) (0, 1, 7) (0, 3, 5) (0, 1, 5) (0, 3, 7) (0, 3, 3) (0, 1, 1) (0, 3, 1) (0, 1, 3) (0, 7, 5) (0, 7, 7) (0, 5, 7) (0, 5, 5)
     ],
 ]
+
+# Flat versions of multiply_lco and cz_table used by the simulator, so that each
+# lookup is a single index into a contiguous array instead of going through the
+# nested table. The entries are stored in column major order, like the matrices.
+const n_lcos = 24
+const multiply_lco_flat = vec(multiply_lco)
+const cz_table_flat = vcat(vec(cz_table[1]), vec(cz_table[2]))
+
+"""Product of the local clifford operations a and b, i.e. multiply_lco[a, b]."""
+@inline function lco_product(a, b)
+    return @inbounds multiply_lco_flat[a+n_lcos*(b-1)]
+end
+
+"""Entry of the cz_table for the given connection and local clifford operations,
+i.e. cz_table[connected+1][lco_1, lco_2]."""
+@inline function cz_table_entry(connected::Bool, lco_1, lco_2)
+    return @inbounds cz_table_flat[lco_1+n_lcos*(lco_2-1)+n_lcos^2*connected]
+end
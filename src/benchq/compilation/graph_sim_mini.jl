@@ -11,69 +11,234 @@ using Jabalizer
 using PythonCall
 
 include("graph_sim_data.jl")
+include("graph_sim_adjacency.jl")
+include("graph_sim_progress.jl")
+include("graph_sim_checkpoint.jl")
 
 
 # numbers which correspond to each of the gates in multiply_lco
-H_code = 11
-S_code = 7
-S_Dagger_code = 6
-sqrt_X_code = 15
+const H_code = 11
+const S_code = 7
+const S_Dagger_code = 6
+const sqrt_X_code = 15
 
 """Get the vertices of a graph state corresponding to enacting the given circuit
 on the |0> state. Also gives the local clifford operation on each node.
 
 Args:
-    circuit (Circuit): circuit to get the graph state for
+    icm_circuit (EncodedCircuit): circuit to get the graph state for
+    n_qubits (int): number of qubits in the circuit
+    adjacency_backend (Symbol): how the adjacency is stored, see
+        graph_sim_adjacency.jl
+    monitor (SimulationMonitor): reports the progress of the simulation and
+        cancels it, see graph_sim_progress.jl. Does nothing if no monitor is
+        given.
+    checkpointer (Checkpointer): periodically saves the state of the simulation,
+        which is resumed from if it was saved by an earlier run, see
+        graph_sim_checkpoint.jl. Does nothing if no checkpointer is given.
 
 Raises:
     ValueError: if an unsupported gate is encountered
+    SimulationCancelled: if the monitor cancelled the simulation
 
 Returns:
     List[int]: the list of local clifford operations on each node
     List[Set[int]]: the adjacency list describing the graph corresponding to the
         graph state
 """
-function get_graph_state_data(icm_circuit, n_qubits)
-    lco = [H_code for _ in 1:n_qubits]  # local clifford operation on each node
-    adj = [Set{Int}() for _ in 1:n_qubits]  # adjacency list
+function get_graph_state_data(
+    icm_circuit::EncodedCircuit,
+    n_qubits;
+    adjacency_backend=:set,
+    monitor=nothing,
+    checkpointer=nothing
+)
+    state = start_checkpointing!(checkpointer, false, adjacency_backend)
+    if isnothing(state)
+        lco = [H_code for _ in 1:n_qubits]  # local clifford operation on each node
+        adj = empty_adjacency(adjacency_backend, n_qubits)  # adjacency list
+        n_ops_done = 0
+    else
+        lco, adj, n_ops_done = state.lco, state.adj, state.n_ops_done
+    end
+
+    start_monitoring!(monitor, length(icm_circuit), n_ops_done)
+    simulate_icm_circuit!(lco, adj, icm_circuit, n_ops_done + 1, monitor, checkpointer)
+    finish_monitoring!(monitor)
+    finish_checkpointing!(checkpointer)
+
+    return lco, adj
+end
+
+
+# Separate function so that the loop is compiled for the type of the adjacency
+function simulate_icm_circuit!(lco, adj, icm_circuit, first_op, monitor, checkpointer)
+    for i in first_op:length(icm_circuit)
+        apply_gate(
+            lco, adj, icm_circuit.opcodes[i], icm_circuit.qubit_1[i], icm_circuit.qubit_2[i]
+        )
+        monitor_step!(monitor, i)
+        checkpoint_step!(checkpointer, i, lco, adj, nothing, false)
+    end
+end
+
+
+"""Get the graph state data for a Clifford + T circuit without ever storing its
+icm form. Each gate is converted to icm form as it is read and immediately applied
+to the graph state, so new vertices are appended to lco and adj as they appear.
+
+Args:
+    circuit (Iterable[Tuple[Opcode, int, int]]): circuit to get the graph state for,
+        given as (opcode, qubit_1, qubit_2) tuples, e.g. an EncodedCircuit or a
+        lazy generator.
+    n_qubits (int): number of qubits in the circuit
+    gates_to_decompose (List[Opcode]): gates which are replaced by a CNOT to a new
+        qubit
+    total_length (int): number of gates in circuit, used for reporting progress
+    boundaries (List[int]): sorted numbers of gates after which on_boundary is called
+    on_boundary (Callable[[List[int], List[Set[int]]], None]): called with the
+        current lco and adj once each boundary is reached
+    adjacency_backend (Symbol): how the adjacency is stored, see
+        graph_sim_adjacency.jl
+    monitor (SimulationMonitor): reports the progress of the simulation and
+        cancels it, see graph_sim_progress.jl. Does nothing if no monitor is
+        given.
+    checkpointer (Checkpointer): periodically saves the state of the simulation,
+        which is resumed from if it was saved by an earlier run, see
+        graph_sim_checkpoint.jl. Does nothing if no checkpointer is given.
+
+Raises:
+    SimulationCancelled: if the monitor cancelled the simulation
 
-    # for keeping track of progress
-    total_length = length(icm_circuit)
-    last_10_percent_completed = 0
+Returns:
+    List[int]: the list of local clifford operations on each node
+    List[Set[int]]: the adjacency list describing the graph corresponding to the
+        graph state
+"""
+function get_graph_state_data_streaming(
+    circuit,
+    n_qubits::Int,
+    gates_to_decompose::Vector{Opcode},
+    total_length::Int;
+    boundaries::AbstractVector{<:Integer}=Int[],
+    on_boundary=nothing,
+    adjacency_backend=:set,
+    monitor=nothing,
+    checkpointer=nothing
+)
+    state = start_checkpointing!(checkpointer, true, adjacency_backend)
+    if isnothing(state)
+        lco = [H_code for _ in 1:n_qubits]  # local clifford operation on each node
+        adj = empty_adjacency(adjacency_backend, n_qubits)  # adjacency list
+        # compiled version of each qubit, indexed by the original qubit + 1
+        qubit_map = collect(Int32(0):Int32(n_qubits - 1))
+        n_ops_done = 0
+    else
+        lco, adj, qubit_map, n_ops_done = state.lco, state.adj, state.qubit_map, state.n_ops_done
+    end
+
+    start_monitoring!(monitor, total_length, n_ops_done)
+    simulate_streaming!(
+        lco, adj, qubit_map, circuit, opcode_mask(gates_to_decompose), n_ops_done,
+        boundaries, on_boundary, monitor, checkpointer
+    )
+    finish_monitoring!(monitor)
+    finish_checkpointing!(checkpointer)
+
+    return lco, adj
+end
+
+
+# Separate function so that the loop is compiled for the type of the adjacency
+function simulate_streaming!(
+    lco, adj, qubit_map, circuit, is_decomposed, n_ops_done, boundaries, on_boundary,
+    monitor, checkpointer
+)
+    curr_qubits = n_vertices(adj)
     i = 0
+    next_boundary = searchsortedfirst(boundaries, n_ops_done + 1)
 
-    for (op_name, op_qubits) in icm_circuit
+    for (opcode, original_qubit_1, original_qubit_2) in circuit
         i += 1
-        percent_completed = round(100 * i / total_length)
-        if percent_completed >= last_10_percent_completed + 10
-            println("GraphSim Mini is $percent_completed% completed")
-            last_10_percent_completed += 10
-        end
+        i <= n_ops_done && continue  # already simulated before resuming
+
+        if is_decomposed[Int(opcode)]
+            for original_qubit in (original_qubit_1, original_qubit_2)
+                original_qubit == NO_QUBIT && continue
+                push!(lco, H_code)
+                push_vertex!(adj)
 
-        qubit_1 = parse(Int, op_qubits[1]) + 1
-        if op_name in ["I", "X", "Y", "Z"]
-            # these gates do not change the graph
-            continue
-        elseif op_name == "H"
-            lco[qubit_1] = multiply_lco[H_code, lco[qubit_1]]
-        elseif op_name == "S"
-            lco[qubit_1] = multiply_lco[S_code, lco[qubit_1]]
-        elseif op_name == "S_Dagger"
-            lco[qubit_1] = multiply_lco[S_Dagger_code, lco[qubit_1]]
-        elseif op_name == "CZ"
-            cz(lco, adj, qubit_1, parse(Int, op_qubits[2]) + 1)
-        elseif op_name == "CNOT"
-            # CNOT = (I \otimes H) CZ (I \otimes H)
-            qubit_2 = parse(Int, op_qubits[2]) + 1
-            lco[qubit_2] = multiply_lco[H_code, lco[qubit_2]]
-            cz(lco, adj, qubit_1, qubit_2)
-            lco[qubit_2] = multiply_lco[H_code, lco[qubit_2]]
+                apply_gate(lco, adj, CNOT_OP, qubit_map[original_qubit+1], curr_qubits)
+                qubit_map[original_qubit+1] = curr_qubits
+                curr_qubits += 1
+            end
         else
-            error("Unknown gate: $op_name")
+            compiled_qubit_2 = original_qubit_2 == NO_QUBIT ? NO_QUBIT : qubit_map[original_qubit_2+1]
+            apply_gate(lco, adj, opcode, qubit_map[original_qubit_1+1], compiled_qubit_2)
         end
+
+        while next_boundary <= length(boundaries) && boundaries[next_boundary] == i
+            on_boundary(lco, adj)
+            next_boundary += 1
+        end
+        monitor_step!(monitor, i)
+        checkpoint_step!(checkpointer, i, lco, adj, qubit_map, true)
     end
+end
 
-    return lco, adj
+
+# What apply_gate does for each kind of gate
+@enum GateAction::UInt8 begin
+    NO_ACTION  # the gate does not change the graph
+    LCO_ACTION  # the gate multiplies the local clifford operation of its qubit
+    CZ_ACTION
+    CNOT_ACTION
+    UNSUPPORTED_ACTION
+end
+
+# Dispatch tables indexed by opcode, so that each gate is resolved with a single
+# lookup. gate_lcos holds the local clifford operation of LCO_ACTION gates.
+const gate_actions = fill(UNSUPPORTED_ACTION, n_opcodes)
+const gate_lcos = zeros(Int, n_opcodes)
+for opcode in (I_OP, X_OP, Y_OP, Z_OP)
+    gate_actions[Int(opcode)] = NO_ACTION
+end
+for (opcode, code) in ((H_OP, H_code), (S_OP, S_code), (S_DAGGER_OP, S_Dagger_code))
+    gate_actions[Int(opcode)] = LCO_ACTION
+    gate_lcos[Int(opcode)] = code
+end
+gate_actions[Int(CZ_OP)] = CZ_ACTION
+gate_actions[Int(CNOT_OP)] = CNOT_ACTION
+
+
+"""Apply a single gate of an icm circuit to the graph state.
+
+Args:
+    lco (List[int]): local clifford operation on each node
+    adj (List[Set[int]]): adjacency list describing the graph state
+    opcode (Opcode): gate to apply
+    op_qubit_1 (int): 0-indexed first qubit the gate acts on
+    op_qubit_2 (int): 0-indexed second qubit the gate acts on, NO_QUBIT if none
+
+Raises:
+    ValueError: if an unsupported gate is encountered
+"""
+function apply_gate(lco, adj, opcode::Opcode, op_qubit_1, op_qubit_2)
+    action = gate_actions[Int(opcode)]
+    qubit_1 = op_qubit_1 + 1
+    if action == CNOT_ACTION
+        # CNOT = (I \otimes H) CZ (I \otimes H)
+        qubit_2 = op_qubit_2 + 1
+        lco[qubit_2] = lco_product(H_code, lco[qubit_2])
+        cz(lco, adj, qubit_1, qubit_2)
+        lco[qubit_2] = lco_product(H_code, lco[qubit_2])
+    elseif action == LCO_ACTION
+        lco[qubit_1] = lco_product(gate_lcos[Int(opcode)], lco[qubit_1])
+    elseif action == CZ_ACTION
+        cz(lco, adj, qubit_1, op_qubit_2 + 1)
+    elseif action == UNSUPPORTED_ACTION
+        error("Unknown gate: $(opcode_names[Int(opcode)])")
+    end
 end
 
 
@@ -86,12 +251,12 @@ Args:
     vertex_2 (int): vertex to enact the CZ gate on
 """
 function cz(lco, adj, vertex_1, vertex_2)
-    check_almost_isolated(adj[vertex_1], vertex_2) && remove_lco(lco, adj, vertex_1, vertex_2)
-    check_almost_isolated(adj[vertex_2], vertex_1) && remove_lco(lco, adj, vertex_2, vertex_1)
-    check_almost_isolated(adj[vertex_1], vertex_2) && remove_lco(lco, adj, vertex_1, vertex_2)
+    check_almost_isolated(adj, vertex_1, vertex_2) && remove_lco(lco, adj, vertex_1, vertex_2)
+    check_almost_isolated(adj, vertex_2, vertex_1) && remove_lco(lco, adj, vertex_2, vertex_1)
+    check_almost_isolated(adj, vertex_1, vertex_2) && remove_lco(lco, adj, vertex_1, vertex_2)
 
-    connected = vertex_1 in adj[vertex_2] || vertex_2 in adj[vertex_1]
-    table_tuple = cz_table[connected+1][lco[vertex_1], lco[vertex_2]]
+    connected = is_connected(adj, vertex_2, vertex_1) || is_connected(adj, vertex_1, vertex_2)
+    table_tuple = cz_table_entry(connected, lco[vertex_1], lco[vertex_2])
 
     connected != table_tuple[1] && toggle_edge(adj, vertex_1, vertex_2)
     lco[vertex_1] = table_tuple[2]
@@ -103,21 +268,29 @@ end
 neighbors or if it has one neighbor and that neighbor is the given vertex.
 
 Args:
-    set (Set[int]): set of neighbors of a vertex
-    vertex (int): vertex to check if it is almost isolated
+    adj (List[Set[int]]): adjacency list describing the graph state
+    v (int): vertex to check if it is almost isolated
+    vertex (int): the neighbor v may have
 
 Returns:
     bool: whether the vertex is almost isolated
 """
-function check_almost_isolated(set, vertex)
-    l = length(set)
-    return l != 0 || (l == 1 && vertex in set)
+function check_almost_isolated(adj, v, vertex)
+    l = vertex_degree(adj, v)
+    return l != 0 || (l == 1 && is_connected(adj, v, vertex))
 end
 
 
 """Remove all local clifford operations on a vertex v. Needs use of a neighbor
 of v, but if we wish to avoid using a particular neighbor, we can specify it.
 
+The neighbor with the lowest degree is used, as its neighborhood is complemented
+along with the one of v. Ties are broken by index, so that the resulting graph
+doesn't depend on the order in which the adjacency stores the neighbors.
+
+Neither this nor local_complement allocate, so the only allocations of a CZ gate
+are those needed to grow the adjacency.
+
 Args:
     lco (List[int]): local clifford operations on each node
     adj (List[Set[int]]): adjacency list describing the graph state
@@ -125,11 +298,18 @@ Args:
     avoid (int): index of a neighbor of v to avoid using
 """
 function remove_lco(lco, adj, v, avoid)
-    other_neighbors = deepcopy(adj[v])
-    delete!(other_neighbors, avoid)
-    vb = isempty(other_neighbors) ? avoid : pop!(other_neighbors)
+    vb::Int = avoid
+    vb_degree = typemax(Int)
+    for neighbor in vertex_neighbors(adj, v)
+        neighbor == avoid && continue
+        neighbor_degree = vertex_degree(adj, neighbor)
+        if neighbor_degree < vb_degree || (neighbor_degree == vb_degree && neighbor < vb)
+            vb = neighbor
+            vb_degree = neighbor_degree
+        end
+    end
 
-    for factor in reverse(decomposition_lookup_table[lco[v]])
+    for factor in Iterators.reverse(decomposition_lookup_table[lco[v]])
         local_complement(lco, adj, factor == 'U' ? v : vb)
     end
 end
@@ -143,35 +323,11 @@ Args:
     v (int): index node to take the local complement of
 """
 function local_complement(lco, adj, v)
-    neighbors = collect(adj[v])
-    for i in 1:length(neighbors)
-        for j in i+1:length(neighbors)
-            toggle_edge(adj, neighbors[i], neighbors[j])
-        end
-    end
-
-    lco[v] = multiply_lco[lco[v], sqrt_X_code]
-    for i in adj[v]
-        lco[i] = multiply_lco[lco[i], S_code]
-    end
-end
-
-
-"""If vertices vertex_1 and vertex_2 are connected, we remove the edge.
-Otherwise, add it.
+    complement_neighborhood!(adj, v)
 
-Args:
-    adj (List[Set[int]]): adjacency list describing the graph state
-    vertex_1 (int): index of vertex to be connected or disconnected
-    vertex_2 (int): index of vertex to be connected or disconnected
-"""
-function toggle_edge(adj, vertex_1, vertex_2)
-    if vertex_2 in adj[vertex_1] || vertex_1 in adj[vertex_2]
-        delete!(adj[vertex_1], vertex_2)
-        delete!(adj[vertex_2], vertex_1)
-    else
-        push!(adj[vertex_1], vertex_2)
-        push!(adj[vertex_2], vertex_1)
+    lco[v] = lco_product(lco[v], sqrt_X_code)
+    for i in vertex_neighbors(adj, v)
+        lco[i] = lco_product(lco[i], S_code)
     end
 end
 
@@ -224,33 +380,233 @@ state created by the icm circuit along with the single qubit operations on each
 
 Args:
     circuit (Circuit): circuit to be simulated
+    streaming (bool): if true, the gates are read from the python circuit, compiled
+        to icm form and simulated one at a time, so neither the bare nor the icm
+        circuit is ever stored. Uses much less memory for large circuits.
+    adjacency_backend (Union[Symbol, String, Function]): adjacency used by the
+        simulation, see empty_adjacency
+    monitor (SimulationMonitor): reports the progress of the simulation and
+        cancels it, see graph_sim_progress.jl
+    checkpointer (Checkpointer): periodically saves the state of the simulation,
+        see graph_sim_checkpoint.jl
 
 Returns:    
     adj (List[Set[int]]): adjacency list describing the graph state
     lco (List[int]): local clifford operations on each node
 """
-function run_graph_sim_mini(circuit)
+function run_graph_sim_mini(
+    circuit, streaming=false, adjacency_backend=:set; monitor=nothing, checkpointer=nothing
+)
     n_qubits = Jabalizer.pyconvert(Int, circuit.n_qubits)
-    bare_circuit = Jabalizer.ICMGate[]
-    for op in circuit.operations
-        name = Jabalizer.pyconvert(String, op.gate.name)
-        indices = [string(Jabalizer.pyconvert(Int, qubit)) for qubit in op.qubit_indices]
-        push!(bare_circuit, (name, indices))
+    if streaming
+        n_gates = Jabalizer.pyconvert(Int, pylen(circuit.operations))
+        bare_circuit = (encode_operation(op) for op in circuit.operations)
+    else
+        bare_circuit = encode_circuit(circuit)
+        n_gates = length(bare_circuit)
     end
 
-    print("ICM compilation: qubits=$n_qubits, gates=$(length(bare_circuit))\n\t")
-    @time (icm_circuit, icm_n_qubits) = get_icm(bare_circuit, n_qubits, ["T", "T_Dagger", "RX", "RY", "RZ"])
+    loc, adj = graph_sim_mini(
+        bare_circuit, n_qubits, n_gates, streaming, adjacency_backend;
+        monitor=monitor, checkpointer=checkpointer
+    )
 
-    print("Graph Sim Mini: qubits=$icm_n_qubits, gates=$(length(icm_circuit))\n\t")
-    @time loc, adj = get_graph_state_data(icm_circuit, icm_n_qubits)
-
-    println("Graph Sim Mini finished")
-
-    py_adj = pylist([pylist(adj[i] .- 1) for i in 1:length(adj)]) # subtract 1 to convert to 0-indexing
+    py_adj = pylist([pylist(vertex_neighbors(adj, i) .- 1) for i in 1:n_vertices(adj)]) # subtract 1 to convert to 0-indexing
     py_loc = pylist(loc)
 
     return py_loc, py_adj
 end
 
 
-const ICMGate = Tuple{String,Vector{String}}
+"""Same as run_graph_sim_mini, but for a circuit which was already encoded into
+numpy arrays by benchq.compilation.julia_utils.encode_circuit. The arrays are used
+in place, without converting the gates one by one. The graph is returned in
+compressed sparse row format, so it can be wrapped by numpy without copying.
+
+Args:
+    n_qubits (int): number of qubits in the circuit
+    opcodes (numpy.ndarray[uint8]): opcode of each gate
+    qubit_1 (numpy.ndarray[int32]): first qubit of each gate
+    qubit_2 (numpy.ndarray[int32]): second qubit of each gate, -1 if none
+    streaming (bool): if true, the icm circuit is never stored
+    adjacency_backend (str): "set" or "adaptive", see graph_sim_adjacency.jl. The
+        adaptive backend is faster for highly connected graphs.
+    monitor (SimulationMonitor): reports the progress of the simulation and
+        cancels it, see graph_sim_progress.jl
+    checkpointer (Checkpointer): periodically saves the state of the simulation,
+        see graph_sim_checkpoint.jl
+
+Returns:    
+    lco (Vector{Int}): local clifford operations on each node
+    indptr (Vector{Int64}): neighbors of node i are indices[indptr[i]+1:indptr[i+1]]
+    indices (Vector{Int32}): 0-indexed neighbors of all the nodes
+"""
+function run_graph_sim_mini_encoded(
+    n_qubits, opcodes, qubit_1, qubit_2, streaming=false, adjacency_backend="set";
+    monitor=nothing, checkpointer=nothing
+)
+    bare_circuit = wrap_encoded_circuit(opcodes, qubit_1, qubit_2)
+    loc, adj = graph_sim_mini(
+        bare_circuit, n_qubits, length(bare_circuit), streaming, Symbol(adjacency_backend);
+        monitor=monitor, checkpointer=checkpointer
+    )
+    indptr, indices = adjacency_to_csr(adj)
+    return loc, indptr, indices
+end
+
+
+"""Same as run_graph_sim_mini_encoded, but only returns statistics about the degrees
+of the graph instead of the graph itself. Useful for graphs too big to be handled
+in python.
+
+Returns:
+    GraphStatistics: statistics of the graph state
+"""
+function run_graph_sim_mini_statistics(
+    n_qubits, opcodes, qubit_1, qubit_2, streaming=false, adjacency_backend="set";
+    monitor=nothing, checkpointer=nothing
+)
+    bare_circuit = wrap_encoded_circuit(opcodes, qubit_1, qubit_2)
+    _, adj = graph_sim_mini(
+        bare_circuit, n_qubits, length(bare_circuit), streaming, Symbol(adjacency_backend);
+        monitor=monitor, checkpointer=checkpointer
+    )
+    return get_graph_statistics(adj)
+end
+
+
+"""Simulates an encoded circuit while recording the graph after given numbers of
+gates. This gives the graphs of all the prefixes of the circuit in a single run.
+
+Args:
+    n_qubits (int): number of qubits in the circuit
+    opcodes (numpy.ndarray[uint8]): opcode of each gate
+    qubit_1 (numpy.ndarray[int32]): first qubit of each gate
+    qubit_2 (numpy.ndarray[int32]): second qubit of each gate, -1 if none
+    boundaries (numpy.ndarray[int64]): sorted numbers of gates after which the graph
+        is recorded
+    record_graphs (bool): if true, the graph at each boundary is recorded in
+        compressed sparse row format along with its statistics
+    adjacency_backend (str): "set" or "adaptive", see graph_sim_adjacency.jl
+    monitor (SimulationMonitor): reports the progress of the simulation and
+        cancels it, see graph_sim_progress.jl
+
+Returns:
+    List[GraphStatistics]: statistics of the graph at each boundary
+    List[Tuple[Vector{Int64}, Vector{Int32}]]: indptr and indices of the graph at
+        each boundary, empty if record_graphs is false
+"""
+function run_graph_sim_mini_trace(
+    n_qubits, opcodes, qubit_1, qubit_2, boundaries, record_graphs=false,
+    adjacency_backend="set"; monitor=nothing
+)
+    bare_circuit = wrap_encoded_circuit(opcodes, qubit_1, qubit_2)
+    boundaries = as_column(Int64, boundaries)
+
+    statistics = GraphStatistics[]
+    graphs = Tuple{Vector{Int64},Vector{Int32}}[]
+    function record(lco, adj)
+        push!(statistics, get_graph_statistics(adj))
+        record_graphs && push!(graphs, adjacency_to_csr(adj))
+    end
+
+    get_graph_state_data_streaming(
+        bare_circuit,
+        n_qubits,
+        non_clifford_opcodes,
+        length(bare_circuit);
+        boundaries=boundaries,
+        on_boundary=record,
+        adjacency_backend=Symbol(adjacency_backend),
+        monitor=monitor
+    )
+
+    return statistics, graphs
+end
+
+
+function graph_sim_mini(
+    bare_circuit, n_qubits, n_gates, streaming, adjacency_backend=:set;
+    monitor=nothing, checkpointer=nothing
+)
+    if streaming
+        loc, adj = get_graph_state_data_streaming(
+            bare_circuit, n_qubits, non_clifford_opcodes, n_gates;
+            adjacency_backend=adjacency_backend, monitor=monitor, checkpointer=checkpointer
+        )
+    else
+        icm_circuit, icm_n_qubits = get_icm(bare_circuit, n_qubits, non_clifford_opcodes)
+        loc, adj = get_graph_state_data(
+            icm_circuit, icm_n_qubits;
+            adjacency_backend=adjacency_backend, monitor=monitor, checkpointer=checkpointer
+        )
+    end
+
+    return loc, adj
+end
+
+
+"""Statistics of the degrees of the nodes of a graph.
+
+Fields:
+    n_nodes (int): number of nodes in the graph
+    n_edges (int): number of edges in the graph
+    max_degree (int): largest degree of a node
+    n_isolated_nodes (int): number of nodes without neighbors
+    degree_histogram (Vector{Int}): degree_histogram[d+1] is the number of nodes
+        with degree d
+"""
+struct GraphStatistics
+    n_nodes::Int
+    n_edges::Int
+    max_degree::Int
+    n_isolated_nodes::Int
+    degree_histogram::Vector{Int}
+end
+
+
+"""Get the statistics of the degrees of a graph given by its adjacency list."""
+function get_graph_statistics(adj)
+    degrees = [vertex_degree(adj, v) for v in 1:n_vertices(adj)]
+    max_degree = maximum(degrees; init=0)
+    degree_histogram = zeros(Int, max_degree + 1)
+    for degree in degrees
+        degree_histogram[degree+1] += 1
+    end
+    sum_of_degrees = sum(degrees; init=0)
+    return GraphStatistics(
+        n_vertices(adj),
+        sum_of_degrees ÷ 2,
+        max_degree,
+        degree_histogram[1],
+        degree_histogram,
+    )
+end
+
+
+"""Convert an adjacency list into compressed sparse row format.
+
+Args:
+    adj (List[Set[int]]): adjacency list describing the graph state
+
+Returns:
+    indptr (Vector{Int64}): neighbors of node i are indices[indptr[i]+1:indptr[i+1]]
+    indices (Vector{Int32}): sorted, 0-indexed neighbors of all the nodes
+"""
+function adjacency_to_csr(adj)
+    indptr = Vector{Int64}(undef, n_vertices(adj) + 1)
+    indptr[1] = 0
+    for i in 1:n_vertices(adj)
+        indptr[i+1] = indptr[i] + vertex_degree(adj, i)
+    end
+
+    indices = Vector{Int32}(undef, indptr[end])
+    for i in 1:n_vertices(adj)
+        row = view(indices, indptr[i]+1:indptr[i+1])
+        copyto!(row, vertex_neighbors(adj, i))
+        row .-= 1  # subtract 1 to convert to 0-indexing
+        sort!(row)
+    end
+
+    return indptr, indices
+end
@@ -0,0 +1,160 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+"""This module contains the progress reporting and cancellation of long simulations.
+The simulators call monitor_step! after every operation. When no monitor is given
+this does nothing, otherwise the time is looked at once every check_every_ops
+operations, which is when progress is reported and cancellation is checked.
+"""
+
+using PythonCall
+
+
+"""Thrown by a simulation which was cancelled, either because its deadline passed or
+because it was asked to stop.
+
+Fields:
+    reason (String): "deadline" or "cancelled"
+    n_ops_done (int): number of operations simulated before the cancellation
+    n_ops (int): total number of operations of the simulation
+"""
+struct SimulationCancelled <: Exception
+    reason::String
+    n_ops_done::Int
+    n_ops::Int
+end
+
+function Base.showerror(io::IO, e::SimulationCancelled)
+    print(io, "Simulation cancelled ($(e.reason)) after $(e.n_ops_done) of $(e.n_ops) operations")
+end
+
+
+"""Reports the progress of a simulation and cancels it when asked to.
+
+Fields:
+    on_progress (Callable[[int, int, float, float, float], None]): called with the
+        number of operations done, the total number of operations, the elapsed time,
+        the number of operations per second since the last report and the estimated
+        remaining time in seconds. Nothing to not report progress.
+    should_cancel (Callable[[], bool]): the simulation is cancelled once it returns
+        true. Nothing to never cancel.
+    deadline (float): time(), in seconds since the epoch, after which the simulation
+        is cancelled
+    report_every_ops (int): minimal number of operations between two reports
+    report_every_seconds (float): progress is also reported if that much time
+        passed since the last report, even if fewer operations were done
+    check_every_ops (int): number of operations between two looks at the time
+"""
+mutable struct SimulationMonitor
+    on_progress::Any
+    should_cancel::Any
+    deadline::Float64
+    report_every_ops::Int
+    report_every_seconds::Float64
+    check_every_ops::Int
+    # state of the current simulation
+    n_ops::Int
+    start_time::Float64
+    last_report_ops::Int
+    last_report_time::Float64
+    next_check::Int
+end
+
+function SimulationMonitor(;
+    on_progress=nothing,
+    should_cancel=nothing,
+    deadline::Real=Inf,
+    report_every_ops::Integer=typemax(Int),
+    report_every_seconds::Real=Inf,
+    check_every_ops::Integer=1024
+)
+    return SimulationMonitor(
+        on_progress,
+        should_cancel,
+        deadline,
+        report_every_ops,
+        report_every_seconds,
+        check_every_ops,
+        0,
+        0.0,
+        0,
+        0.0,
+        0,
+    )
+end
+
+
+"""Start monitoring a simulation of n_ops operations, n_ops_done of which were
+already done, e.g. by the run the simulation was resumed from."""
+start_monitoring!(::Nothing, n_ops, n_ops_done=0) = nothing
+
+function start_monitoring!(monitor::SimulationMonitor, n_ops, n_ops_done=0)
+    monitor.n_ops = n_ops
+    monitor.start_time = time()
+    monitor.last_report_ops = n_ops_done
+    monitor.last_report_time = monitor.start_time
+    monitor.next_check = n_ops_done + min(monitor.check_every_ops, monitor.report_every_ops)
+    check_progress!(monitor, n_ops_done)
+end
+
+
+"""Called by the simulation after each of its operations, n_ops_done being the
+number of operations done so far.
+
+Throws:
+    SimulationCancelled: if the simulation has to stop
+"""
+monitor_step!(::Nothing, n_ops_done) = nothing
+
+@inline function monitor_step!(monitor::SimulationMonitor, n_ops_done)
+    n_ops_done >= monitor.next_check && check_progress!(monitor, n_ops_done)
+end
+
+
+"""Report the end of the simulation."""
+finish_monitoring!(::Nothing) = nothing
+
+function finish_monitoring!(monitor::SimulationMonitor)
+    report_progress(monitor, monitor.n_ops, time())
+end
+
+
+@noinline function check_progress!(monitor::SimulationMonitor, n_ops_done)
+    monitor.next_check = n_ops_done + min(monitor.check_every_ops, monitor.report_every_ops)
+    now = time()
+    if now > monitor.deadline
+        throw(SimulationCancelled("deadline", n_ops_done, monitor.n_ops))
+    end
+    if is_cancelled(monitor.should_cancel)
+        throw(SimulationCancelled("cancelled", n_ops_done, monitor.n_ops))
+    end
+    if (
+        n_ops_done - monitor.last_report_ops >= monitor.report_every_ops ||
+        now - monitor.last_report_time >= monitor.report_every_seconds
+    )
+        report_progress(monitor, n_ops_done, now)
+    end
+end
+
+
+function report_progress(monitor::SimulationMonitor, n_ops_done, now)
+    isnothing(monitor.on_progress) && return
+    interval = now - monitor.last_report_time
+    ops_per_second = interval > 0 ? (n_ops_done - monitor.last_report_ops) / interval : 0.0
+    remaining_ops = monitor.n_ops - n_ops_done
+    if remaining_ops <= 0
+        remaining_time = 0.0
+    else
+        remaining_time = ops_per_second > 0 ? remaining_ops / ops_per_second : Inf
+    end
+    monitor.on_progress(
+        n_ops_done, monitor.n_ops, now - monitor.start_time, ops_per_second, remaining_time
+    )
+    monitor.last_report_ops = n_ops_done
+    monitor.last_report_time = now
+end
+
+
+is_cancelled(::Nothing) = false
+is_cancelled(should_cancel::Py) = pytruth(should_cancel())
+is_cancelled(should_cancel) = should_cancel()::Bool
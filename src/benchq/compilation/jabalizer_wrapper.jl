@@ -56,6 +56,38 @@ function prepare(num_qubits, qubit_map, icm_output, debug_flag=false)
     state
 end
 
+# Jabalizer gates indexed by opcode, nothing for gates Jabalizer does not support
+const jabalizer_gates = [get(Jabalizer.gate_map, name, nothing) for name in opcode_names]
+
+function prepare(num_qubits, icm_output::EncodedCircuit, debug_flag=false)
+    state = zero_state(num_qubits)
+    chkcnt = prevop = opcnt = 0
+    pt = t0 = time_ns()
+    # loops over all operations in the circuit and applies them to the state
+    for i in 1:length(icm_output)
+        opcnt += 1
+        opcode = icm_output.opcodes[i]
+        gate = jabalizer_gates[Int(opcode)]
+        isnothing(gate) && error("Unsupported gate: $(opcode_names[Int(opcode)])")
+        qubit_2 = icm_output.qubit_2[i]
+        if qubit_2 == NO_QUBIT
+            (gate(icm_output.qubit_1[i] + 1))(state)
+        else
+            (gate(icm_output.qubit_1[i] + 1, qubit_2 + 1))(state)
+        end
+        if debug_flag && (chkcnt += 1) > 99
+            chkcnt = 0
+            if ((tn = time_ns()) - pt >= 60_000_000_000)
+                out_cnt(opcnt, prevop, tn, pt, t0)
+                pt, prevop = tn, opcnt
+            end
+        end
+    end
+    debug_flag && out_cnt(opcnt, prevop, time_ns(), pt, t0)
+
+    state
+end
+
 function run_jabalizer(circuit, debug_flag=false)
     # Convert to Julia values
     n_qubits = Jabalizer.pyconvert(Int, circuit.n_qubits)
@@ -86,3 +118,36 @@ function run_jabalizer(circuit, debug_flag=false)
 
     return svec, op_seq, icm_output, data_qubits_map
 end
+
+# Same as run_jabalizer, but works on the integer circuit encoding throughout and
+# only returns the graph state, not the icm circuit.
+function run_jabalizer_graph(circuit, debug_flag=false)
+    n_qubits = Jabalizer.pyconvert(Int, circuit.n_qubits)
+    return jabalizer_graph(encode_circuit(circuit), n_qubits, debug_flag)
+end
+
+# Same as run_jabalizer_graph, for a circuit encoded into numpy arrays by
+# benchq.compilation.julia_utils.encode_circuit.
+function run_jabalizer_graph_encoded(n_qubits, opcodes, qubit_1, qubit_2, debug_flag=false)
+    icm_input = wrap_encoded_circuit(opcodes, qubit_1, qubit_2)
+    return jabalizer_graph(icm_input, n_qubits, debug_flag)
+end
+
+function jabalizer_graph(icm_input, n_qubits, debug_flag=false)
+    if debug_flag
+        print("ICM compilation: qubits=$n_qubits, gates=$(length(icm_input))\n\t")
+        @time (icm_output, n_qubits) = get_icm(icm_input, n_qubits)
+
+        print("Jabalizer state preparation: qubits=$n_qubits, gates=$(length(icm_output))\n\t")
+        @time state = prepare(n_qubits, icm_output)
+
+        print("Jabalizer graph generation: $n_qubits\n\t")
+        @time (svec, op_seq) = graph_as_stabilizer_vector(state)
+    else
+        icm_output, n_qubits = get_icm(icm_input, n_qubits)
+        state = prepare(n_qubits, icm_output)
+        svec, op_seq = graph_as_stabilizer_vector(state)
+    end
+
+    return svec, op_seq
+end
@@ -0,0 +1,66 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+"""Lazily started julia runtime used by the graph compilers.
+
+Julia is only started, and the julia sources of benchq included, the first time a
+julia backed function is called, so that importing benchq stays fast for the code
+which doesn't need julia. Services which would rather pay for it up front can call
+warmup() once at startup.
+"""
+
+import threading
+
+from .sysimage import configure_sysimage, include_julia_sources
+
+_main = None
+_lock = threading.Lock()
+
+
+def get_julia():
+    """Julia's Main module with the benchq sources included, starting julia if it
+    isn't running yet."""
+    global _main
+    if _main is None:
+        with _lock:
+            if _main is None:
+                configure_sysimage()
+                from juliacall import Main
+
+                include_julia_sources(Main)
+                _main = Main
+    return _main
+
+
+def is_julia_started() -> bool:
+    """Whether julia was already started by benchq."""
+    return _main is not None
+
+
+def warmup(precompile: bool = True) -> None:
+    """Start julia and include the benchq sources now instead of on first use.
+
+    Args:
+        precompile: also compile the graph compilers by running them on a small
+            circuit, so that their first call is fast too. This is cheap when julia
+            was started from the benchq sysimage, see sysimage.py.
+    """
+    julia = get_julia()
+    if precompile:
+        julia.run_precompile_workload()
+
+
+class _LazyJulia:
+    """Stands for julia's Main module, which is only started on first use."""
+
+    def __getattr__(self, name):
+        return getattr(get_julia(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_julia(), name, value)
+
+    def __repr__(self):
+        return repr(get_julia()) if is_julia_started() else "<julia, not started>"
+
+
+jl = _LazyJulia()
@@ -1,30 +1,351 @@
 ################################################################################
 # © Copyright 2022-2023 Zapata Computing Inc.
 ################################################################################
-import time
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 import networkx as nx
+import numpy as np
+from orquestra.quantum.circuits import Circuit
 
-from . import jl
+from ..data_structures import (
+    CSRGraph,
+    FullCircuitView,
+    GraphStatistics,
+    SubroutineSequence,
+)
+from .julia_runtime import jl
+from .simulation_control import (
+    SimulationCheckpoint,
+    SimulationControl,
+    run_monitored_simulation,
+)
 
+# Opcodes of the gates understood by the julia simulators. They have to match the
+# Opcode enum in circuit_encoding.jl.
+OPCODES = {
+    "I": 1,
+    "X": 2,
+    "Y": 3,
+    "Z": 4,
+    "H": 5,
+    "S": 6,
+    "S_Dagger": 7,
+    "CZ": 8,
+    "CNOT": 9,
+    "T": 10,
+    "T_Dagger": 11,
+    "RX": 12,
+    "RY": 13,
+    "RZ": 14,
+}
+# Used as the second qubit of single qubit gates
+NO_QUBIT = -1
+# Adjacency backends known to empty_adjacency in graph_sim_adjacency.jl. Julia
+# functions creating the adjacency from the number of vertices are accepted too.
+ADJACENCY_BACKENDS = ("set", "adaptive")
 
-def get_algorithmic_graph_from_graph_sim_mini(circuit):
-    lco, adj = jl.run_graph_sim_mini(circuit)
 
-    print("getting networkx graph from vertices")
-    start = time.time()
-    graph = nx.empty_graph(len(adj))
-    for vertex_id, neighbors in enumerate(adj):
-        for neighbor in neighbors:
-            graph.add_edge(vertex_id, neighbor)
-    end = time.time()
-    print("time: ", end - start)
+@dataclass
+class EncodedCircuit:
+    """Circuit packed into numpy arrays which can be handed over to julia without
+    converting each gate separately.
 
-    return graph
+    Attributes:
+        n_qubits: number of qubits in the circuit.
+        opcodes: opcode of each gate, see OPCODES.
+        qubit_1: first qubit each gate acts on.
+        qubit_2: second qubit each gate acts on, NO_QUBIT for single qubit gates.
+    """
+
+    n_qubits: int
+    opcodes: np.ndarray
+    qubit_1: np.ndarray
+    qubit_2: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+    def digest(self) -> str:
+        """Hash of the gates and qubits of the circuit."""
+        circuit_hash = hashlib.sha256()
+        circuit_hash.update(str(self.n_qubits).encode())
+        circuit_hash.update(self.opcodes.tobytes())
+        circuit_hash.update(self.qubit_1.tobytes())
+        circuit_hash.update(self.qubit_2.tobytes())
+        return circuit_hash.hexdigest()
+
+
+def encode_circuit(
+    circuit: Union[Circuit, FullCircuitView, EncodedCircuit],
+) -> EncodedCircuit:
+    """Packs a circuit into arrays of opcodes and qubit indices.
+
+    Args:
+        circuit: circuit consisting of gates listed in OPCODES. For the full circuit
+            view of a program, each distinct subroutine is only encoded once and
+            the arrays are tiled according to the subroutine sequence. Circuits
+            which are already encoded are returned as they are, so the simulators
+            also accept them.
+
+    Raises:
+        ValueError: if the circuit contains a gate which can't be encoded.
+    """
+    if isinstance(circuit, EncodedCircuit):
+        return circuit
+    if isinstance(circuit, FullCircuitView):
+        return _encode_program(circuit)
+
+    opcodes = []
+    qubit_1 = []
+    qubit_2 = []
+    for op in circuit.operations:
+        try:
+            opcodes.append(OPCODES[op.gate.name])
+        except KeyError:
+            raise ValueError(f"Unknown gate: {op.gate.name}")
+        qubit_1.append(op.qubit_indices[0])
+        qubit_2.append(op.qubit_indices[1] if len(op.qubit_indices) > 1 else NO_QUBIT)
+
+    return EncodedCircuit(
+        n_qubits=circuit.n_qubits,
+        opcodes=np.array(opcodes, dtype=np.uint8),
+        qubit_1=np.array(qubit_1, dtype=np.int32),
+        qubit_2=np.array(qubit_2, dtype=np.int32),
+    )
+
+
+def _encode_program(circuit: FullCircuitView) -> EncodedCircuit:
+    program = circuit.program
+    encoded_subroutines = {
+        i: encode_circuit(program.subroutines[i])
+        for i, multiplicity in enumerate(program.multiplicities)
+        if multiplicity > 0
+    }
+    return EncodedCircuit(
+        circuit.n_qubits,
+        *_tile_encoded_subroutines(program.subroutine_sequence, encoded_subroutines),
+    )
+
+
+def _tile_encoded_subroutines(
+    sequence: SubroutineSequence, encoded_subroutines: Dict[int, EncodedCircuit]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Concatenates the columns of the encoded subroutines in the order of the
+    sequence, tiling each repeated block instead of looping over its calls."""
+    parts = []
+    for item, repetitions in sequence.blocks:
+        if isinstance(item, SubroutineSequence):
+            columns = _tile_encoded_subroutines(item, encoded_subroutines)
+        else:
+            encoded = encoded_subroutines[item]
+            columns = (encoded.opcodes, encoded.qubit_1, encoded.qubit_2)
+        parts.append([np.tile(column, repetitions) for column in columns])
+    if not parts:
+        return (
+            np.empty(0, dtype=np.uint8),
+            np.empty(0, dtype=np.int32),
+            np.empty(0, dtype=np.int32),
+        )
+    opcodes, qubit_1, qubit_2 = (np.concatenate(columns) for columns in zip(*parts))
+    return opcodes, qubit_1, qubit_2
+
+
+def get_algorithmic_graph_from_graph_sim_mini(
+    circuit,
+    streaming=False,
+    stats_only=False,
+    adjacency_backend="set",
+    control: Optional[SimulationControl] = None,
+    checkpoint: Optional[SimulationCheckpoint] = None,
+) -> Union[nx.Graph, GraphStatistics]:
+    """Simulates the circuit with graph sim mini and returns the resulting graph.
+
+    Args:
+        circuit: Clifford + T circuit to simulate.
+        streaming: if True, the icm form of the circuit is never stored in julia.
+        stats_only: if True, only the statistics of the degrees of the graph are
+            computed in julia and returned, the graph itself never reaches python.
+        adjacency_backend: how the graph is stored during the simulation, either
+            "set" or "adaptive". The adaptive backend stores high degree nodes as
+            bit rows, which is much faster for highly connected graphs.
+        control: reports the progress of the simulation and cancels it, raising
+            SimulationCancelledError, when asked to or once its deadline passed.
+        checkpoint: where and how often the state of the simulation is saved. If
+            it was saved by an earlier simulation of the same circuit, the
+            simulation resumes from it.
+
+    Raises:
+        ValueError: if the adjacency backend is unknown.
+    """
+    if stats_only:
+        return get_graph_statistics_from_graph_sim_mini(
+            circuit, streaming, adjacency_backend, control, checkpoint
+        )
+    return get_csr_graph_from_graph_sim_mini(
+        circuit, streaming, adjacency_backend, control, checkpoint
+    ).to_networkx()
+
+
+def get_graph_statistics_from_graph_sim_mini(
+    circuit,
+    streaming=False,
+    adjacency_backend="set",
+    control: Optional[SimulationControl] = None,
+    checkpoint: Optional[SimulationCheckpoint] = None,
+) -> GraphStatistics:
+    _check_adjacency_backend(adjacency_backend)
+    encoded_circuit = encode_circuit(circuit)
+    statistics = run_monitored_simulation(
+        jl.run_graph_sim_mini_statistics,
+        encoded_circuit.n_qubits,
+        encoded_circuit.opcodes,
+        encoded_circuit.qubit_1,
+        encoded_circuit.qubit_2,
+        streaming,
+        adjacency_backend,
+        control=control,
+        checkpointer=_make_checkpointer(checkpoint, encoded_circuit),
+    )
+    return _to_graph_statistics(statistics)
+
+
+def get_graph_trace_from_graph_sim_mini(
+    circuit,
+    boundaries: Sequence[int],
+    stats_only=False,
+    adjacency_backend="set",
+    control: Optional[SimulationControl] = None,
+) -> List[Union[CSRGraph, GraphStatistics]]:
+    """Simulates the circuit with graph sim mini once and records the graph after
+    each of the given numbers of gates.
+
+    Args:
+        circuit: Clifford + T circuit to simulate.
+        boundaries: numbers of gates of the circuit after which the graph is
+            recorded, in increasing order.
+        stats_only: if True, only the statistics of the degrees of the graphs are
+            recorded instead of the whole graphs.
+        adjacency_backend: how the graph is stored during the simulation, either
+            "set" or "adaptive".
+        control: reports the progress of the simulation and cancels it.
+
+    Raises:
+        ValueError: if the boundaries aren't sorted numbers of gates of the
+            circuit, since the simulator would skip the graphs of the others, or
+            if the adjacency backend is unknown.
+    """
+    _check_adjacency_backend(adjacency_backend)
+    encoded_circuit = encode_circuit(circuit)
+    boundaries = np.array(boundaries, dtype=np.int64)
+    if len(boundaries) > 0 and (
+        boundaries[0] <= 0
+        or boundaries[-1] > len(encoded_circuit)
+        or np.any(np.diff(boundaries) < 0)
+    ):
+        raise ValueError(
+            f"Boundaries {boundaries.tolist()} aren't sorted numbers of gates of a "
+            f"circuit with {len(encoded_circuit)} gates."
+        )
+    statistics, graphs = run_monitored_simulation(
+        jl.run_graph_sim_mini_trace,
+        encoded_circuit.n_qubits,
+        encoded_circuit.opcodes,
+        encoded_circuit.qubit_1,
+        encoded_circuit.qubit_2,
+        boundaries,
+        not stats_only,
+        adjacency_backend,
+        control=control,
+    )
+    if stats_only:
+        return [
+            _to_graph_statistics(graph_statistics) for graph_statistics in statistics
+        ]
+    return [
+        CSRGraph(
+            indptr=indptr.to_numpy(copy=False), indices=indices.to_numpy(copy=False)
+        )
+        for indptr, indices in graphs
+    ]
+
+
+def _check_adjacency_backend(adjacency_backend) -> None:
+    if isinstance(adjacency_backend, str) and (
+        adjacency_backend not in ADJACENCY_BACKENDS
+    ):
+        raise ValueError(
+            f"Unknown adjacency backend {adjacency_backend!r}, expected one of "
+            f"{', '.join(ADJACENCY_BACKENDS)}."
+        )
+
+
+def _to_graph_statistics(statistics) -> GraphStatistics:
+    return GraphStatistics(
+        n_nodes=statistics.n_nodes,
+        n_edges=statistics.n_edges,
+        max_degree=statistics.max_degree,
+        n_isolated_nodes=statistics.n_isolated_nodes,
+        degree_histogram=statistics.degree_histogram.to_numpy(),
+    )
+
+
+def get_csr_graph_from_graph_sim_mini(
+    circuit,
+    streaming=False,
+    adjacency_backend="set",
+    control: Optional[SimulationControl] = None,
+    checkpoint: Optional[SimulationCheckpoint] = None,
+) -> CSRGraph:
+    """Simulates the circuit with graph sim mini and returns the graph state in CSR
+    format. The arrays are shared with julia, so no copy of the graph is made.
+
+    Args:
+        circuit: Clifford + T circuit to simulate.
+        streaming: if True, the icm form of the circuit is never stored in julia.
+        adjacency_backend: how the graph is stored during the simulation, either
+            "set" or "adaptive".
+        control: reports the progress of the simulation and cancels it.
+        checkpoint: where and how often the state of the simulation is saved.
+
+    Raises:
+        ValueError: if the adjacency backend is unknown.
+    """
+    _check_adjacency_backend(adjacency_backend)
+    encoded_circuit = encode_circuit(circuit)
+    lco, indptr, indices = run_monitored_simulation(
+        jl.run_graph_sim_mini_encoded,
+        encoded_circuit.n_qubits,
+        encoded_circuit.opcodes,
+        encoded_circuit.qubit_1,
+        encoded_circuit.qubit_2,
+        streaming,
+        adjacency_backend,
+        control=control,
+        checkpointer=_make_checkpointer(checkpoint, encoded_circuit),
+    )
+    return CSRGraph(
+        indptr=indptr.to_numpy(copy=False), indices=indices.to_numpy(copy=False)
+    )
+
+
+def _make_checkpointer(
+    checkpoint: Optional[SimulationCheckpoint], encoded_circuit: EncodedCircuit
+):
+    if checkpoint is None:
+        return None
+    return checkpoint._make_julia_checkpointer(encoded_circuit.digest())
 
 
 def get_algorithmic_graph_from_Jabalizer(circuit):
-    svec, op_seq, icm_output, data_qubits_map = jl.run_jabalizer(circuit)
+    encoded_circuit = encode_circuit(circuit)
+    svec, op_seq = jl.run_jabalizer_graph_encoded(
+        encoded_circuit.n_qubits,
+        encoded_circuit.opcodes,
+        encoded_circuit.qubit_1,
+        encoded_circuit.qubit_2,
+    )
     return create_graph_from_stabilizers(svec)
 
 
@@ -0,0 +1,70 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+"""This module contains a small workload running the julia entry points of benchq
+the way benchq.compilation.julia_utils calls them: the encoded ones on a circuit
+given as numpy arrays, and run_graph_sim_mini and run_jabalizer on a python
+circuit. Running it compiles the methods called from python. It is run when
+building the sysimage and by benchq.compilation.warmup.
+"""
+
+using PythonCall
+
+
+function run_precompile_workload()
+    np = pyimport("numpy")
+    n_qubits = 4
+    gates = [
+        (H_OP, 0, -1),
+        (CNOT_OP, 0, 1),
+        (S_OP, 1, -1),
+        (T_OP, 1, -1),
+        (CZ_OP, 1, 2),
+        (S_DAGGER_OP, 2, -1),
+        (RZ_OP, 2, -1),
+        (X_OP, 3, -1),
+        (CNOT_OP, 2, 3),
+        (T_DAGGER_OP, 3, -1),
+        (H_OP, 3, -1),
+    ]
+    opcodes = np.array([UInt8(opcode) for (opcode, _, _) in gates], dtype=np.uint8)
+    qubit_1 = np.array([qubit for (_, qubit, _) in gates], dtype=np.int32)
+    qubit_2 = np.array([qubit for (_, _, qubit) in gates], dtype=np.int32)
+    boundaries = np.array([1, length(gates)], dtype=np.int64)
+
+    for streaming in (false, true), adjacency_backend in ("set", "adaptive")
+        run_graph_sim_mini_encoded(
+            n_qubits, opcodes, qubit_1, qubit_2, streaming, adjacency_backend
+        )
+        run_graph_sim_mini_statistics(
+            n_qubits, opcodes, qubit_1, qubit_2, streaming, adjacency_backend
+        )
+    end
+    for record_graphs in (false, true), adjacency_backend in ("set", "adaptive")
+        run_graph_sim_mini_trace(
+            n_qubits, opcodes, qubit_1, qubit_2, boundaries, record_graphs,
+            adjacency_backend
+        )
+    end
+    run_graph_sim_mini_encoded(
+        n_qubits, opcodes, qubit_1, qubit_2; monitor=SimulationMonitor()
+    )
+    run_jabalizer_graph_encoded(n_qubits, opcodes, qubit_1, qubit_2)
+
+    # run_graph_sim_mini and run_jabalizer read the gates from a python circuit,
+    # which only needs the attributes of orquestra circuits they use
+    types = pyimport("types")
+    operations = pylist([
+        types.SimpleNamespace(
+            gate=types.SimpleNamespace(name=opcode_names[Int(opcode)]),
+            qubit_indices=pylist(qubit_b == -1 ? [qubit_a] : [qubit_a, qubit_b]),
+        )
+        for (opcode, qubit_a, qubit_b) in gates
+    ])
+    circuit = types.SimpleNamespace(n_qubits=n_qubits, operations=operations)
+    for streaming in (false, true)
+        run_graph_sim_mini(circuit, streaming)
+    end
+    run_jabalizer(circuit)
+    return nothing
+end
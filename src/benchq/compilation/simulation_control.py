@@ -0,0 +1,183 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+"""Progress reporting, cancellation and checkpointing of long graph sim mini runs.
+
+The simulation itself is monitored in julia, see graph_sim_progress.jl and
+graph_sim_checkpoint.jl. It only looks at the clock every so many operations, so an
+unmonitored run is as fast as before and a monitored one is barely slower.
+"""
+
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Union
+
+from .julia_runtime import jl
+
+
+@dataclass(frozen=True)
+class SimulationProgress:
+    """Progress of a simulation, as given to SimulationControl.progress_callback.
+
+    Attributes:
+        n_ops_done: number of operations simulated so far.
+        n_ops: total number of operations of the simulation.
+        elapsed_time: seconds since the start of the simulation.
+        ops_per_second: simulation rate since the previous report.
+        remaining_time: estimated number of seconds left at that rate, inf if it
+            can't be estimated yet.
+    """
+
+    n_ops_done: int
+    n_ops: int
+    elapsed_time: float
+    ops_per_second: float
+    remaining_time: float
+
+    @property
+    def fraction_done(self) -> float:
+        return self.n_ops_done / self.n_ops if self.n_ops > 0 else 1.0
+
+
+class SimulationCancelledError(RuntimeError):
+    """Raised when a simulation is stopped by its SimulationControl, so that the
+    caller can give up or fall back to a cheaper estimate."""
+
+    def __init__(self, reason: str, n_ops_done: int, n_ops: int):
+        super().__init__(
+            f"Simulation cancelled ({reason}) after {n_ops_done} of {n_ops} "
+            "operations."
+        )
+        self.reason = reason
+        self.n_ops_done = n_ops_done
+        self.n_ops = n_ops
+
+
+@dataclass
+class SimulationControl:
+    """Controls the progress reporting and cancellation of simulations.
+
+    Attributes:
+        progress_callback: called with the progress of the simulation, at most once
+            every report_every_ops operations or report_every_seconds seconds, and
+            once more at the end. None to not report progress.
+        report_every_ops: number of operations between two reports.
+        report_every_seconds: number of seconds between two reports.
+        time_limit: number of seconds after which each simulation is cancelled.
+        deadline: time.time() after which simulations are cancelled.
+        cancel_event: simulations are cancelled once this event is set, e.g. from
+            another thread or from the progress callback.
+    """
+
+    progress_callback: Optional[Callable[[SimulationProgress], None]] = None
+    report_every_ops: Optional[int] = None
+    report_every_seconds: Optional[float] = 10.0
+    time_limit: Optional[float] = None
+    deadline: Optional[float] = None
+    cancel_event: Optional[threading.Event] = None
+
+    def _make_julia_monitor(self):
+        kwargs = {}
+        if self.progress_callback is not None:
+            kwargs["on_progress"] = self._on_progress
+            if self.report_every_ops is not None:
+                kwargs["report_every_ops"] = self.report_every_ops
+            if self.report_every_seconds is not None:
+                kwargs["report_every_seconds"] = self.report_every_seconds
+        if self.cancel_event is not None:
+            kwargs["should_cancel"] = self.cancel_event.is_set
+        deadline = math.inf if self.deadline is None else self.deadline
+        if self.time_limit is not None:
+            deadline = min(deadline, time.time() + self.time_limit)
+        kwargs["deadline"] = deadline
+        return jl.SimulationMonitor(**kwargs)
+
+    def _on_progress(self, n_ops_done, n_ops, elapsed_time, ops_per_second, eta):
+        assert self.progress_callback is not None
+        self.progress_callback(
+            SimulationProgress(
+                n_ops_done=n_ops_done,
+                n_ops=n_ops,
+                elapsed_time=elapsed_time,
+                ops_per_second=ops_per_second,
+                remaining_time=eta,
+            )
+        )
+
+
+@dataclass
+class SimulationCheckpoint:
+    """Periodically saves the state of a simulation to a file, so that it can be
+    resumed after a crash or a preemption instead of being started over.
+
+    A simulation resumes from the file if it was written by a simulation of the same
+    circuit in the same mode, otherwise the file is overwritten.
+
+    Attributes:
+        path: file the state is saved to.
+        every_seconds: time between two saves.
+        every_ops: number of operations between two saves, None to only save based
+            on time.
+        remove_when_done: whether the file is deleted once the simulation finished.
+    """
+
+    path: Union[str, os.PathLike]
+    every_seconds: float = 600.0
+    every_ops: Optional[int] = None
+    remove_when_done: bool = True
+
+    def _make_julia_checkpointer(self, circuit_hash: str):
+        kwargs = {}
+        if self.every_ops is not None:
+            kwargs["every_ops"] = self.every_ops
+        return jl.Checkpointer(
+            os.fspath(self.path),
+            circuit_hash,
+            every_seconds=self.every_seconds,
+            remove_when_done=self.remove_when_done,
+            **kwargs,
+        )
+
+
+def print_progress(progress: SimulationProgress) -> None:
+    """Progress callback printing a one line summary of the progress."""
+    print(
+        f"Graph Sim Mini is {100 * progress.fraction_done:.0f}% completed "
+        f"({progress.ops_per_second:.3g} ops/s, "
+        f"{progress.remaining_time:.0f}s remaining)"
+    )
+
+
+def run_monitored_simulation(
+    julia_function,
+    *args,
+    control: Optional[SimulationControl] = None,
+    checkpointer=None,
+):
+    """Calls a julia simulation, monitored by the given control and julia
+    Checkpointer if there are any.
+
+    Raises:
+        SimulationCancelledError: if the control cancelled the simulation.
+    """
+    kwargs = {}
+    if control is not None:
+        kwargs["monitor"] = control._make_julia_monitor()
+    if checkpointer is not None:
+        kwargs["checkpointer"] = checkpointer
+    # julia is running by now, so importing juliacall doesn't start it
+    from juliacall import JuliaError
+
+    try:
+        return julia_function(*args, **kwargs)
+    except JuliaError as error:
+        if jl.isa(error.exception, jl.SimulationCancelled):
+            raise SimulationCancelledError(
+                str(error.exception.reason),
+                int(error.exception.n_ops_done),
+                int(error.exception.n_ops),
+            ) from error
+        raise
@@ -0,0 +1,189 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+"""Precompiled julia sysimage containing the graph state simulators of benchq.
+
+Without it, every new python process pays for compiling Jabalizer and the
+simulators on their first call, which takes much longer than simulating a small
+circuit. The sysimage is built once with
+
+    python -m benchq.compilation.sysimage [path]
+
+after which benchq starts julia from it automatically, taking it from the path given
+by the BENCHQ_SYSIMAGE environment variable, or from the default location in the
+user's cache directory. A sysimage built from other julia sources than the installed
+ones is ignored with a warning, since their definitions could conflict, and has to
+be built again.
+
+This module must not import juliacall, since the sysimage has to be chosen before
+julia is started.
+"""
+
+import hashlib
+import os
+import pathlib
+import shutil
+import subprocess
+import sys
+import tempfile
+import warnings
+from typing import Optional, Union
+
+SYSIMAGE_ENV = "BENCHQ_SYSIMAGE"
+JULIACALL_SYSIMAGE_ENV = "PYTHON_JULIACALL_SYSIMAGE"
+
+PACKAGE_COMPILER_UUID = "9b87118b-4619-50d2-8e1e-99f35a4d4d9d"
+
+_DIRECTORY = pathlib.Path(__file__).parent
+
+# Sources included in julia by benchq.compilation, in order. They include the
+# remaining .jl files of this directory.
+JULIA_SOURCES = [
+    "circuit_encoding.jl",
+    "jabalizer_wrapper.jl",
+    "graph_sim_mini.jl",
+    "precompile_workload.jl",
+]
+
+# PackageCompiler is only added to the temporary copy of the juliapkg project the
+# sysimage is built in, see build_sysimage.
+_BUILD_SCRIPT = """
+import Pkg
+Pkg.add(Pkg.PackageSpec(name="PackageCompiler", uuid=ARGS[3]))
+using PackageCompiler
+create_sysimage(
+    ["Jabalizer", "PythonCall"];
+    sysimage_path=ARGS[1],
+    script=ARGS[2],
+)
+"""
+
+
+def get_sources_version() -> str:
+    """Hash of all the julia sources of benchq.compilation."""
+    sources_hash = hashlib.sha256()
+    for source in sorted(_DIRECTORY.glob("*.jl")):
+        sources_hash.update(source.name.encode())
+        sources_hash.update(source.read_bytes())
+    return sources_hash.hexdigest()
+
+
+def get_default_sysimage_path() -> pathlib.Path:
+    """Where the sysimage is built and looked for when no path is given."""
+    if SYSIMAGE_ENV in os.environ:
+        return pathlib.Path(os.environ[SYSIMAGE_ENV])
+    extension = {"darwin": "dylib", "win32": "dll"}.get(sys.platform, "so")
+    return pathlib.Path.home() / ".cache" / "benchq" / f"benchq_sysimage.{extension}"
+
+
+def _get_version_path(sysimage_path: pathlib.Path) -> pathlib.Path:
+    # the version of the sources a sysimage was built from is stored next to it
+    return sysimage_path.with_name(sysimage_path.name + ".version")
+
+
+def configure_sysimage() -> Optional[pathlib.Path]:
+    """Make juliacall start julia from the benchq sysimage, if it was built.
+
+    Does nothing if juliacall was already imported, since julia is then already
+    running, or if juliacall was explicitly told which sysimage to use. Warns if the
+    sysimage was built from other julia sources than the installed ones.
+
+    Returns:
+        The sysimage julia is started from, None for the default one.
+    """
+    if JULIACALL_SYSIMAGE_ENV in os.environ:
+        return pathlib.Path(os.environ[JULIACALL_SYSIMAGE_ENV])
+    path = get_default_sysimage_path()
+    if "juliacall" in sys.modules or not path.is_file():
+        return None
+    version_path = _get_version_path(path)
+    if not version_path.is_file() or version_path.read_text() != get_sources_version():
+        warnings.warn(
+            f"Ignoring the sysimage {path}, which was built for another version of "
+            "benchq. Run `python -m benchq.compilation.sysimage` to rebuild it."
+        )
+        return None
+    os.environ[JULIACALL_SYSIMAGE_ENV] = os.fspath(path)
+    return path
+
+
+def include_julia_sources(jl) -> None:
+    """Include the julia sources of benchq, unless julia was started from a sysimage
+    which already contains them.
+
+    Including them again would replace the precompiled methods by ones that have
+    to be compiled on their first call.
+    """
+    if (
+        jl.seval("isdefined(Main, :BENCHQ_SYSIMAGE_VERSION)")
+        and str(jl.BENCHQ_SYSIMAGE_VERSION) == get_sources_version()
+    ):
+        return
+    for source in JULIA_SOURCES:
+        jl.include(os.fspath(_DIRECTORY / source))
+
+
+def build_sysimage(path: Optional[Union[str, os.PathLike]] = None) -> pathlib.Path:
+    """Build the benchq sysimage with PackageCompiler.
+
+    The julia sources of benchq are compiled into it, along with the methods called
+    by a small precompile workload, see precompile_workload.jl. This takes several
+    minutes, and has to be done again after updating julia or Jabalizer.
+
+    PackageCompiler, which is only needed to build the sysimage, is added to a
+    temporary copy of the julia project of juliacall rather than to the project
+    itself, so julia doesn't have to install it when juliacall starts. The copy
+    keeps the manifest, so the sysimage has the same package versions as the
+    project.
+
+    Args:
+        path: where the sysimage is written, defaults to get_default_sysimage_path().
+
+    Returns:
+        The path of the sysimage.
+
+    Raises:
+        RuntimeError: if julia failed to build the sysimage.
+    """
+    import juliapkg
+
+    path = pathlib.Path(path) if path is not None else get_default_sysimage_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    juliapkg.resolve()
+    project = pathlib.Path(juliapkg.project())
+
+    env = dict(os.environ)
+    # the workload runs in a separate julia process, which has to use the python
+    # of this environment, with its numpy, instead of installing its own
+    env["JULIA_PYTHONCALL_EXE"] = sys.executable
+    env["JULIA_CONDAPKG_BACKEND"] = "Null"
+    version = get_sources_version()
+    env["BENCHQ_SYSIMAGE_VERSION"] = version
+    with tempfile.TemporaryDirectory() as build_project:
+        for project_file in ["Project.toml", "Manifest.toml"]:
+            if (project / project_file).is_file():
+                shutil.copy(project / project_file, build_project)
+        result = subprocess.run(
+            [
+                juliapkg.executable(),
+                f"--project={build_project}",
+                "--startup-file=no",
+                "-e",
+                _BUILD_SCRIPT,
+                os.fspath(path),
+                os.fspath(_DIRECTORY / "sysimage_workload.jl"),
+                PACKAGE_COMPILER_UUID,
+            ],
+            env=env,
+        )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"Building the sysimage failed with exit code {result.returncode}."
+        )
+    _get_version_path(path).write_text(version)
+    return path
+
+
+if __name__ == "__main__":
+    print(f"Sysimage written to {build_sysimage(*sys.argv[1:2])}")
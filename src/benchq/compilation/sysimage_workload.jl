@@ -0,0 +1,20 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+"""Script run by PackageCompiler while the benchq sysimage is built, see sysimage.py.
+
+It includes the julia sources of benchq, so that they are part of the sysimage and
+don't have to be included again when it is loaded, and compiles them by running the
+precompile workload.
+"""
+
+# Compared against the installed sources when the sysimage is loaded, so that the
+# sources are included again if they changed since the sysimage was built.
+const BENCHQ_SYSIMAGE_VERSION = ENV["BENCHQ_SYSIMAGE_VERSION"]
+
+include(joinpath(@__DIR__, "circuit_encoding.jl"))
+include(joinpath(@__DIR__, "jabalizer_wrapper.jl"))
+include(joinpath(@__DIR__, "graph_sim_mini.jl"))
+include(joinpath(@__DIR__, "precompile_workload.jl"))
+
+run_precompile_workload()
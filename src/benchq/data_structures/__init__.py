@@ -2,7 +2,14 @@
 # © Copyright 2022-2023 Zapata Computing Inc.
 ################################################################################
 from .algorithm_description import AlgorithmDescription
+from .csr_graph import CSRGraph
 from .decoder import DecoderModel
 from .error_budget import ErrorBudget
+from .graph_statistics import GraphStatistics
 from .hardware_architecture_models import BasicArchitectureModel
-from .quantum_program import QuantumProgram, get_program_from_circuit
+from .quantum_program import (
+    FullCircuitView,
+    QuantumProgram,
+    get_program_from_circuit,
+)
+from .subroutine_sequence import SubroutineSequence, SubroutineSequencePattern
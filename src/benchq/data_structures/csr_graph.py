@@ -0,0 +1,67 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+from dataclasses import dataclass
+
+import networkx as nx
+import numpy as np
+
+from .graph_statistics import GraphStatistics
+
+
+@dataclass
+class CSRGraph:
+    """Undirected graph stored in compressed sparse row format.
+
+    The neighbors of node i are indices[indptr[i]:indptr[i + 1]], so every edge
+    appears in the rows of both of its nodes. Nodes are labeled 0 to n_nodes - 1.
+
+    Attributes:
+        indptr: offsets of the rows of each node in indices, of length n_nodes + 1.
+        indices: neighbors of all the nodes, concatenated.
+    """
+
+    indptr: np.ndarray
+    indices: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.indices) // 2
+
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def statistics(self) -> GraphStatistics:
+        return GraphStatistics.from_degrees(self.degrees())
+
+    def neighbors(self, node: int) -> np.ndarray:
+        return self.indices[self.indptr[node] : self.indptr[node + 1]]
+
+    def to_networkx(self) -> nx.Graph:
+        """Builds a networkx graph with the same nodes and edges in bulk."""
+        sources = np.repeat(np.arange(len(self)), self.degrees())
+        # keep only one copy of each edge
+        mask = sources < self.indices
+        graph = nx.empty_graph(len(self))
+        graph.add_edges_from(zip(sources[mask].tolist(), self.indices[mask].tolist()))
+        return graph
+
+    @classmethod
+    def from_networkx(cls, graph: nx.Graph) -> "CSRGraph":
+        """Creates CSR representation of a graph with nodes labeled 0 to n - 1."""
+        n_nodes = graph.number_of_nodes()
+        indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        for node, degree in graph.degree():
+            indptr[node + 1] = degree
+        np.cumsum(indptr, out=indptr)
+        indices = np.empty(indptr[-1], dtype=np.int32)
+        for node in range(n_nodes):
+            indices[indptr[node] : indptr[node + 1]] = sorted(graph.adj[node])
+        return cls(indptr=indptr, indices=indices)
@@ -0,0 +1,44 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class GraphStatistics:
+    """Statistics about the degrees of the nodes of a graph.
+
+    They carry all the information about the graph which is needed to choose the
+    code distance and number of qubits, while being small enough to be created for
+    graphs which don't fit in memory on the python side.
+
+    Attributes:
+        n_nodes: number of nodes in the graph.
+        n_edges: number of edges in the graph.
+        max_degree: largest degree of a node.
+        n_isolated_nodes: number of nodes without neighbors.
+        degree_histogram: degree_histogram[d] is the number of nodes of degree d.
+    """
+
+    n_nodes: int
+    n_edges: int
+    max_degree: int
+    n_isolated_nodes: int
+    degree_histogram: np.ndarray
+
+    def __len__(self) -> int:
+        return self.n_nodes
+
+    @classmethod
+    def from_degrees(cls, degrees: np.ndarray) -> "GraphStatistics":
+        """Computes the statistics of a graph from the degrees of its nodes."""
+        degree_histogram = np.bincount(degrees, minlength=1)
+        return cls(
+            n_nodes=len(degrees),
+            n_edges=int(np.sum(degrees)) // 2,
+            max_degree=len(degree_histogram) - 1,
+            n_isolated_nodes=int(degree_histogram[0]),
+            degree_histogram=degree_histogram,
+        )
@@ -1,10 +1,17 @@
 ################################################################################
 # © Copyright 2022-2023 Zapata Computing Inc.
 ################################################################################
-from typing import Callable, Sequence
+from itertools import chain
+from typing import Callable, Iterator, Sequence, Union
 
 from orquestra.quantum.circuits import Circuit
 
+from .subroutine_sequence import (
+    SubroutineSequence,
+    SubroutineSequencePattern,
+    as_subroutine_sequence,
+)
+
 
 class QuantumProgram:
     """Simple structure describing a quantum program consisting of multiple circuits
@@ -19,7 +26,9 @@ class QuantumProgram:
         self,
         subroutines: Sequence[Circuit],
         steps: int,
-        calculate_subroutine_sequence: Callable[[int], Sequence[int]],
+        calculate_subroutine_sequence: Callable[
+            [int], Union[Sequence[int], SubroutineSequence]
+        ],
     ) -> None:
         """An object which abbreviates repeated subcircuits within a quantum circuit.
         Each one of these subcircuits is called a subroutine and the subroutine_sequence
@@ -30,7 +39,11 @@ class QuantumProgram:
                 number of subroutines showing how the subroutines are ordered.
             subroutine_sequence (Sequence[int]): _description_
             steps (int): _description_
-            calculate_multiplicities (Callable[[int], Sequence[int]]): _description_
+            calculate_subroutine_sequence (Callable[[int], Sequence[int]]): gives the
+                subroutine sequence for a number of steps, either as a list or as a
+                SubroutineSequence, which avoids listing every call for programs
+                with many steps. Pass a SubroutineSequencePattern for programs which
+                need to be pickled.
         """
         if not all(
             subroutine.n_qubits == subroutines[0].n_qubits for subroutine in subroutines
@@ -40,24 +53,45 @@ class QuantumProgram:
         self.subroutines = subroutines
         self.steps = steps
         self.calculate_subroutine_sequence = calculate_subroutine_sequence
+        self._subroutine_sequence_cache = None
 
     @property
     def multiplicities(self) -> Sequence[int]:
-        mult_list = [0] * (max(self.subroutine_sequence) + 1)
-        for i in self.subroutine_sequence:
-            mult_list[i] += 1
-        return mult_list
+        return self.subroutine_sequence.multiplicities(len(self.subroutines))
 
     @property
-    def subroutine_sequence(self) -> Sequence[int]:
-        return self.calculate_subroutine_sequence(self.steps)
+    def subroutine_sequence(self) -> SubroutineSequence:
+        # computed once for each number of steps, since steps can be changed
+        cache_key = (self.steps, self.calculate_subroutine_sequence)
+        if (
+            self._subroutine_sequence_cache is None
+            or self._subroutine_sequence_cache[0] != cache_key
+        ):
+            self._subroutine_sequence_cache = (
+                cache_key,
+                as_subroutine_sequence(self.calculate_subroutine_sequence(self.steps)),
+            )
+        return self._subroutine_sequence_cache[1]
 
     @property
     def full_circuit(self) -> Circuit:
-        recreated_circuit = Circuit()
-        for i in self.subroutine_sequence:
-            recreated_circuit += self.subroutines[i]
-        return recreated_circuit
+        return Circuit(
+            list(self.full_circuit_view.operations), n_qubits=self.num_data_qubits
+        )
+
+    @property
+    def full_circuit_view(self) -> "FullCircuitView":
+        """Lazy view of the full circuit, which doesn't build its operations list."""
+        return FullCircuitView(self)
+
+    def with_steps(self, steps: int) -> "QuantumProgram":
+        """Same program with a different number of steps. The subroutines are shared
+        with this program rather than copied."""
+        return QuantumProgram(
+            subroutines=self.subroutines,
+            steps=steps,
+            calculate_subroutine_sequence=self.calculate_subroutine_sequence,
+        )
 
     def replace_circuits(self, new_circuits: Sequence[Circuit]) -> "QuantumProgram":
         return QuantumProgram(
@@ -67,7 +101,42 @@ class QuantumProgram:
         )
 
 
+class FullCircuitView:
+    """Full circuit of a program, whose operations are yielded subroutine by
+    subroutine instead of being copied into a single circuit.
+
+    It can be used in place of a circuit by functions which only read its
+    operations and number of qubits. Functions which know about it, like
+    benchq.compilation.encode_circuit, process each distinct subroutine only once.
+    """
+
+    def __init__(self, program: QuantumProgram):
+        self.program = program
+
+    @property
+    def n_qubits(self) -> int:
+        return self.program.num_data_qubits
+
+    @property
+    def operations(self) -> Iterator:
+        return chain.from_iterable(
+            self.program.subroutines[i].operations
+            for i in self.program.subroutine_sequence
+        )
+
+    def __len__(self) -> int:
+        """Number of operations in the full circuit."""
+        return sum(
+            multiplicity * len(subroutine.operations)
+            for multiplicity, subroutine in zip(
+                self.program.multiplicities, self.program.subroutines
+            )
+        )
+
+
 def get_program_from_circuit(circuit):
     return QuantumProgram(
-        [circuit], steps=1, calculate_subroutine_sequence=lambda x: [0]
+        [circuit],
+        steps=1,
+        calculate_subroutine_sequence=SubroutineSequencePattern(prefix=[0]),
     )
@@ -0,0 +1,220 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+Block = Tuple[Union[int, "SubroutineSequence"], int]
+
+
+class SubroutineSequence:
+    """Compact representation of the order in which the subroutines of a program
+    are called.
+
+    The sequence is stored as a list of blocks, each of which is either the index of
+    a subroutine or a nested SubroutineSequence, together with the number of times it
+    is repeated. Its length and the multiplicities of the subroutines are computed
+    from the blocks, so they don't depend on the number of calls.
+
+    Example:
+        The sequence [0, 1, 2, 1, 2, 1, 0] of QSP with 2 block encodings is
+        SubroutineSequence([(0, 1), (SubroutineSequence([(1, 1), (2, 1)]), 2),
+        (1, 1), (0, 1)]), or equivalently
+        SubroutineSequence.from_list([0]) + SubroutineSequence.repeat([1, 2], 2)
+        + SubroutineSequence.from_list([1, 0]).
+    """
+
+    def __init__(self, blocks: Iterable[Block] = ()):
+        self.blocks: List[Block] = []
+        for item, repetitions in blocks:
+            if repetitions < 0:
+                raise ValueError("Blocks can't be repeated a negative number of times.")
+            if isinstance(item, SubroutineSequence):
+                if len(item) == 0:
+                    continue
+            else:
+                item = int(item)
+            if repetitions == 0:
+                continue
+            # flatten nested sequences consisting of a single subroutine
+            if isinstance(item, SubroutineSequence) and len(item.blocks) == 1:
+                inner_item, inner_repetitions = item.blocks[0]
+                if isinstance(inner_item, int):
+                    item, repetitions = inner_item, inner_repetitions * repetitions
+            if self.blocks and isinstance(item, int) and self.blocks[-1][0] == item:
+                self.blocks[-1] = (item, self.blocks[-1][1] + repetitions)
+            else:
+                self.blocks.append((item, repetitions))
+
+        self._length = sum(
+            _item_length(item) * repetitions for item, repetitions in self.blocks
+        )
+        self._multiplicities = self._calculate_multiplicities()
+
+    @classmethod
+    def from_list(cls, sequence: Sequence[int]) -> "SubroutineSequence":
+        """Run-length encodes a flat list of subroutine indices."""
+        return cls((index, 1) for index in sequence)
+
+    @classmethod
+    def repeat(
+        cls, body: Union[Sequence[int], "SubroutineSequence"], times: int
+    ) -> "SubroutineSequence":
+        return cls([(as_subroutine_sequence(body), times)])
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[int]:
+        for item, repetitions in self.blocks:
+            for _ in range(repetitions):
+                if isinstance(item, int):
+                    yield item
+                else:
+                    yield from item
+
+    def __add__(
+        self, other: Union[Sequence[int], "SubroutineSequence"]
+    ) -> "SubroutineSequence":
+        return SubroutineSequence(
+            self.blocks + as_subroutine_sequence(other).blocks  # type: ignore
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (SubroutineSequence, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            index == other_index for index, other_index in zip(self, other)
+        )
+
+    def __repr__(self) -> str:
+        return f"SubroutineSequence({self.blocks})"
+
+    def to_list(self) -> List[int]:
+        return list(self)
+
+    @property
+    def n_subroutines(self) -> int:
+        """Number of subroutines needed by the sequence, i.e. largest index + 1."""
+        return len(self._multiplicities)
+
+    def multiplicities(self, n_subroutines: Optional[int] = None) -> List[int]:
+        """Number of times each subroutine is called.
+
+        Args:
+            n_subroutines: length of the result, so that it lines up with the
+                subroutines of a program even if the last ones aren't called.
+                Defaults to the n_subroutines of the sequence.
+        """
+        return self._pad(self._multiplicities, n_subroutines)
+
+    def prefix_multiplicities(
+        self, n_calls: int, n_subroutines: Optional[int] = None
+    ) -> List[int]:
+        """Number of times each subroutine is called in the first n_calls calls.
+
+        Args:
+            n_calls: number of calls from the start of the sequence.
+            n_subroutines: length of the result, as in multiplicities.
+        """
+        if not 0 <= n_calls <= len(self):
+            raise ValueError(
+                f"Can't take {n_calls} calls of a sequence of length {len(self)}."
+            )
+        multiplicities = self._pad([], n_subroutines)
+        remaining_calls = n_calls
+        for item, repetitions in self.blocks:
+            if remaining_calls == 0:
+                break
+            item_length = _item_length(item)
+            full_repetitions = min(repetitions, remaining_calls // item_length)
+            _add_multiplicities(
+                multiplicities, _item_multiplicities(item), full_repetitions
+            )
+            remaining_calls -= full_repetitions * item_length
+            if full_repetitions < repetitions and remaining_calls > 0:
+                # only part of the nested sequence is called
+                assert isinstance(item, SubroutineSequence)
+                _add_multiplicities(
+                    multiplicities, item.prefix_multiplicities(remaining_calls), 1
+                )
+                remaining_calls = 0
+        return multiplicities
+
+    def _pad(
+        self, multiplicities: List[int], n_subroutines: Optional[int]
+    ) -> List[int]:
+        if n_subroutines is None:
+            n_subroutines = self.n_subroutines
+        elif n_subroutines < self.n_subroutines:
+            raise ValueError(
+                f"The sequence calls {self.n_subroutines} subroutines, "
+                f"not {n_subroutines}."
+            )
+        return list(multiplicities) + [0] * (n_subroutines - len(multiplicities))
+
+    def _calculate_multiplicities(self) -> List[int]:
+        multiplicities: List[int] = []
+        for item, repetitions in self.blocks:
+            _add_multiplicities(multiplicities, _item_multiplicities(item), repetitions)
+        return multiplicities
+
+
+def as_subroutine_sequence(
+    sequence: Union[Sequence[int], SubroutineSequence],
+) -> SubroutineSequence:
+    """Converts the output of calculate_subroutine_sequence to a SubroutineSequence,
+    keeping it as it is if it already is one."""
+    if isinstance(sequence, SubroutineSequence):
+        return sequence
+    return SubroutineSequence.from_list(sequence)
+
+
+def _item_length(item: Union[int, SubroutineSequence]) -> int:
+    return 1 if isinstance(item, int) else len(item)
+
+
+def _item_multiplicities(item: Union[int, SubroutineSequence]) -> List[int]:
+    if isinstance(item, int):
+        multiplicities = [0] * (item + 1)
+        multiplicities[item] = 1
+        return multiplicities
+    return item._multiplicities
+
+
+def _add_multiplicities(target: List[int], source: List[int], factor: int) -> None:
+    if len(target) < len(source):
+        target.extend([0] * (len(source) - len(target)))
+    for index, multiplicity in enumerate(source):
+        target[index] += factor * multiplicity
+
+
+@dataclass(frozen=True)
+class SubroutineSequencePattern:
+    """Declarative calculate_subroutine_sequence for programs whose subroutine
+    sequence is a prefix, followed by a body repeated once per step, followed by a
+    suffix.
+
+    Unlike lambdas and closures it can be pickled, so programs using it can be sent
+    to other processes or stored.
+
+    Example:
+        SubroutineSequencePattern(prefix=[0], body=[1, 2], suffix=[1, 0]) gives
+        [0, 1, 2, 1, 2, 1, 0] for 2 steps.
+    """
+
+    prefix: Tuple[int, ...] = ()
+    body: Tuple[int, ...] = ()
+    suffix: Tuple[int, ...] = ()
+
+    def __post_init__(self):
+        # accept lists, but store tuples to keep the pattern hashable
+        for field in ["prefix", "body", "suffix"]:
+            object.__setattr__(self, field, tuple(getattr(self, field)))
+
+    def __call__(self, steps: int) -> SubroutineSequence:
+        return (
+            SubroutineSequence.from_list(self.prefix)
+            + SubroutineSequence.repeat(self.body, steps)
+            + SubroutineSequence.from_list(self.suffix)
+        )
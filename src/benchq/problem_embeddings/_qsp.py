@@ -10,7 +10,7 @@ from orquestra.quantum.operators import PauliRepresentation
 from pyLIQTR.QSP import gen_qsp
 
 from ..conversions import openfermion_to_pyliqtr
-from ..data_structures import QuantumProgram
+from ..data_structures import QuantumProgram, SubroutineSequencePattern
 
 
 def get_qsp_circuit(
@@ -91,20 +91,12 @@ def get_qsp_program(
             new_circuit += op.gate(*[shift + index for index in op.qubit_indices])
         padded_sanitized_circuits.append(new_circuit)
 
-    def subroutine_sequence_for_qsp(n_block_encodings):
-        my_subroutines = []
-        my_subroutines.append(0)
-        for _ in range(n_block_encodings):
-            my_subroutines.append(1)
-            my_subroutines.append(2)
-        my_subroutines.append(1)
-        my_subroutines.append(0)
-        return my_subroutines
-
     return QuantumProgram(
         subroutines=padded_sanitized_circuits,
         steps=n_block_encodings,
-        calculate_subroutine_sequence=subroutine_sequence_for_qsp,
+        calculate_subroutine_sequence=SubroutineSequencePattern(
+            prefix=[0], body=[1, 2], suffix=[1, 0]
+        ),
     )
 
 
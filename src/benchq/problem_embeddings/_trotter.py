@@ -6,7 +6,7 @@ import math
 from orquestra.quantum.evolution import time_evolution
 from orquestra.quantum.operators._pauli_operators import PauliRepresentation
 
-from ..data_structures import QuantumProgram
+from ..data_structures import QuantumProgram, SubroutineSequencePattern
 
 
 def get_trotter_circuit(hamiltonian, evolution_time, number_of_steps):
@@ -24,11 +24,8 @@ def get_trotter_program(
     # It actually is number of trotter steps
     circuit = time_evolution(hamiltonian, time=time_per_step, trotter_order=1)
 
-    def subrountines_for_trotter(steps):
-        return [0] * steps
-
     return QuantumProgram(
         subroutines=[circuit],
         steps=number_of_steps,
-        calculate_subroutine_sequence=subrountines_for_trotter,
+        calculate_subroutine_sequence=SubroutineSequencePattern(body=[0]),
     )
@@ -5,14 +5,20 @@ import os
 import warnings
 from collections import Counter
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 
 from azure.quantum.qiskit import AzureQuantumProvider
 from orquestra.integrations.qiskit.conversions import export_to_qiskit
 from orquestra.quantum.circuits import Circuit
+from qiskit import QuantumCircuit
 from qiskit.tools.monitor import job_monitor
 
-from ..data_structures import BasicArchitectureModel, ErrorBudget, QuantumProgram
+from ..data_structures import (
+    BasicArchitectureModel,
+    ErrorBudget,
+    FullCircuitView,
+    QuantumProgram,
+)
 
 
 @dataclass
@@ -42,6 +48,23 @@ def _azure_result_to_resource_info(job_results: dict) -> AzureResourceInfo:
     )
 
 
+def _export_to_qiskit(circuit: Union[Circuit, FullCircuitView]) -> QuantumCircuit:
+    """Exports a circuit to qiskit. The full circuit of a program is composed from
+    its subroutines, each of which is only exported once."""
+    if not isinstance(circuit, FullCircuitView):
+        return export_to_qiskit(circuit)
+    program = circuit.program
+    qiskit_subroutines = {
+        i: export_to_qiskit(program.subroutines[i])
+        for i, multiplicity in enumerate(program.multiplicities)
+        if multiplicity > 0
+    }
+    qiskit_circuit = QuantumCircuit(circuit.n_qubits)
+    for i in program.subroutine_sequence:
+        qiskit_circuit.compose(qiskit_subroutines[i], inplace=True)
+    return qiskit_circuit
+
+
 class AzureResourceEstimator:
     """Class that interfaces between Bench-Q and Azure QRE.
 
@@ -83,7 +106,7 @@ class AzureResourceEstimator:
             azure_error_budget["logical"] = remaining_error / 2
             azure_error_budget["tstates"] = remaining_error / 2
         if self.use_full_circuit:
-            circuit = program.full_circuit
+            circuit = program.full_circuit_view
             return self._estimate_resources_for_circuit(circuit, azure_error_budget)
         else:
             raise NotImplementedError(
@@ -92,7 +115,7 @@ class AzureResourceEstimator:
             )
 
     def _estimate_resources_for_circuit(
-        self, circuit: Circuit, error_budget: Dict[str, float]
+        self, circuit: Union[Circuit, FullCircuitView], error_budget: Dict[str, float]
     ) -> AzureResourceInfo:
         if self.hw_model is not None:
             gate_time = self.hw_model.physical_gate_time_in_seconds
@@ -108,7 +131,7 @@ class AzureResourceEstimator:
         else:
             qubitParams = None
 
-        qiskit_circuit = export_to_qiskit(circuit)
+        qiskit_circuit = _export_to_qiskit(circuit)
         provider = AzureQuantumProvider(
             resource_id=os.getenv("AZURE_RESOURCE_ID"), location="East US"
         )
@@ -1,9 +1,21 @@
 """Initialization file for benchq.resource_estimation.v2 subpackage."""
+
 from .extrapolation_estimator import ExtrapolationResourceEstimator
 from .graph_estimator import GraphResourceEstimator, substrate_scheduler
-from .pipelines import run_extrapolation_pipeline, run_resource_estimation_pipeline
+from .measurement_scheduler import (
+    get_n_measurement_steps,
+    get_n_measurement_steps_bounds,
+    schedule_measurement_steps,
+)
+from .pipelines import (
+    run_extrapolation_pipeline,
+    run_parallel_extrapolation_pipeline,
+    run_resource_estimation_pipeline,
+    run_traced_extrapolation_pipeline,
+)
 from .transformers import (
     create_big_graph_from_subcircuits,
+    create_graph_trace_from_subcircuits,
     create_graphs_for_subcircuits,
     simplify_rotations,
     synthesize_clifford_t,
@@ -15,5 +27,11 @@ __all__ = [
     "simplify_rotations",
     "create_big_graph_from_subcircuits",
     "create_graphs_for_subcircuits",
+    "create_graph_trace_from_subcircuits",
+    "run_traced_extrapolation_pipeline",
+    "run_parallel_extrapolation_pipeline",
     "GraphResourceEstimator",
+    "get_n_measurement_steps",
+    "get_n_measurement_steps_bounds",
+    "schedule_measurement_steps",
 ]
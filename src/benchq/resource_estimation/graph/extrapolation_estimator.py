@@ -1,11 +1,18 @@
 from dataclasses import dataclass
 from math import ceil
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 import numpy as np
 
 from ...data_structures import BasicArchitectureModel, DecoderModel, ErrorBudget
-from .graph_estimator import GraphData, GraphResourceEstimator, ResourceInfo
+from .graph_estimator import (
+    MAX_CODE_DISTANCE,
+    GraphData,
+    GraphResourceEstimator,
+    ResourceInfo,
+    _check_n_measurement_steps_method,
+)
+from .structs import GraphTrace
 
 
 @dataclass
@@ -43,11 +50,16 @@ class ExtrapolationResourceEstimator(GraphResourceEstimator):
         steps_to_extrapolate_from: List[int],
         decoder_model: Optional[DecoderModel] = None,
         n_measurement_steps_fit_type: str = "logarithmic",
+        n_measurement_steps_method: str = "exact",
+        max_code_distance: int = MAX_CODE_DISTANCE,
     ):
+        _check_n_measurement_steps_method(n_measurement_steps_method)
         self.hw_model = hw_model
         self.steps_to_extrapolate_from = steps_to_extrapolate_from
         self.decoder_model = decoder_model
         self.n_measurement_steps_fit_type = n_measurement_steps_fit_type
+        self.n_measurement_steps_method = n_measurement_steps_method
+        self.max_code_distance = max_code_distance
 
     def _get_extrapolated_graph_data(
         self, data: List[ResourceInfo], steps_to_extrapolate_to: int
@@ -58,6 +70,42 @@ class ExtrapolationResourceEstimator(GraphResourceEstimator):
             np.array([d.n_logical_qubits for d in data]),
             steps_to_extrapolate_to,
         )
+        (
+            n_measurement_steps,
+            n_measurement_steps_r_squared,
+        ) = self._extrapolate_n_measurement_steps(
+            [d.n_measurement_steps for d in data], steps_to_extrapolate_to
+        )
+        n_measurement_steps_is_exact = all(d.n_measurement_steps_is_exact for d in data)
+        if n_measurement_steps_is_exact:
+            lower_bound = n_measurement_steps
+        else:
+            lower_bound, _ = self._extrapolate_n_measurement_steps(
+                [d.n_measurement_steps_lower_bound for d in data],
+                steps_to_extrapolate_to,
+            )
+
+        n_nodes, n_nodes_r_squared = _get_linear_extrapolation(
+            self.steps_to_extrapolate_from,
+            np.array([d.n_nodes for d in data]),
+            steps_to_extrapolate_to,
+        )
+
+        return ExtrapolatedGraphData(
+            max_graph_degree=max_graph_degree,
+            n_measurement_steps=n_measurement_steps,
+            n_measurement_steps_lower_bound=lower_bound,
+            n_measurement_steps_is_exact=n_measurement_steps_is_exact,
+            composed_from_subroutines=any(d.composed_from_subroutines for d in data),
+            n_nodes=n_nodes,
+            max_graph_degree_r_squared=max_graph_degree_r_squared,
+            n_measurement_steps_r_squared=n_measurement_steps_r_squared,
+            n_nodes_r_squared=n_nodes_r_squared,
+        )
+
+    def _extrapolate_n_measurement_steps(
+        self, values: List[int], steps_to_extrapolate_to: int
+    ) -> Tuple[int, float]:
         # sometimes the n_measurement_steps is logarithmic, sometimes it's linear.
         # we need to check which one is better by inspecting the fit
         if self.n_measurement_steps_fit_type == "logarithmic":
@@ -66,7 +114,7 @@ class ExtrapolationResourceEstimator(GraphResourceEstimator):
                 n_measurement_steps_r_squared,
             ) = _get_logarithmic_extrapolation(
                 self.steps_to_extrapolate_from,
-                np.array([d.n_measurement_steps for d in data]),
+                np.array(values),
                 steps_to_extrapolate_to,
             )
         elif self.n_measurement_steps_fit_type == "linear":
@@ -75,7 +123,7 @@ class ExtrapolationResourceEstimator(GraphResourceEstimator):
                 n_measurement_steps_r_squared,
             ) = _get_linear_extrapolation(
                 self.steps_to_extrapolate_from,
-                np.array([d.n_measurement_steps for d in data]),
+                np.array(values),
                 steps_to_extrapolate_to,
             )
         else:
@@ -84,20 +132,7 @@ class ExtrapolationResourceEstimator(GraphResourceEstimator):
                 f", not {self.n_measurement_steps_fit_type}"
             )
 
-        n_nodes, n_nodes_r_squared = _get_linear_extrapolation(
-            self.steps_to_extrapolate_from,
-            np.array([d.n_nodes for d in data]),
-            steps_to_extrapolate_to,
-        )
-
-        return ExtrapolatedGraphData(
-            max_graph_degree=max_graph_degree,
-            n_measurement_steps=n_measurement_steps,
-            n_nodes=n_nodes,
-            max_graph_degree_r_squared=max_graph_degree_r_squared,
-            n_measurement_steps_r_squared=n_measurement_steps_r_squared,
-            n_nodes_r_squared=n_nodes_r_squared,
-        )
+        return n_measurement_steps, n_measurement_steps_r_squared
 
     def estimate_via_extrapolation(
         self,
@@ -115,9 +150,15 @@ class ExtrapolationResourceEstimator(GraphResourceEstimator):
         return ExtrapolatedResourceInfo(
             n_logical_qubits=resource_info.n_logical_qubits,
             n_measurement_steps=resource_info.n_measurement_steps,
+            n_measurement_steps_lower_bound=(
+                resource_info.n_measurement_steps_lower_bound
+            ),
+            n_measurement_steps_is_exact=resource_info.n_measurement_steps_is_exact,
+            composed_from_subroutines=resource_info.composed_from_subroutines,
             n_nodes=resource_info.n_nodes,
             synthesis_multiplier=resource_info.synthesis_multiplier,
             code_distance=resource_info.code_distance,
+            code_distance_saturated=resource_info.code_distance_saturated,
             logical_error_rate=resource_info.logical_error_rate,
             total_time=resource_info.total_time,
             n_physical_qubits=resource_info.n_physical_qubits,
@@ -131,6 +172,38 @@ class ExtrapolationResourceEstimator(GraphResourceEstimator):
             steps_to_extrapolate_to=steps_to_extrapolate_to,
         )
 
+    def estimate_from_trace(
+        self,
+        trace: GraphTrace,
+        error_budget: ErrorBudget,
+        steps_to_extrapolate_to: int,
+    ) -> ExtrapolatedResourceInfo:
+        """Extrapolates the resources from graphs recorded in a single simulation,
+        instead of from separate estimates of each small program."""
+        if len(trace.graphs) != len(trace.steps):
+            raise ValueError(
+                f"Trace has {len(trace.graphs)} graphs for {len(trace.steps)} "
+                "numbers of steps."
+            )
+        if set(trace.steps) != set(self.steps_to_extrapolate_from):
+            raise ValueError(
+                f"Trace was recorded for steps {trace.steps}, but the estimator "
+                f"extrapolates from steps {self.steps_to_extrapolate_from}."
+            )
+        # the trace may be recorded in another order than the steps of the estimator
+        graph_of_steps = dict(zip(trace.steps, trace.graphs))
+        data = [
+            self._estimate_resources_from_graph_data(
+                self._get_graph_data(graph_of_steps[steps], len(graph_of_steps[steps])),
+                trace.delayed_gate_synthesis,
+                error_budget,
+            )
+            for steps in self.steps_to_extrapolate_from
+        ]
+        return self.estimate_via_extrapolation(
+            data, error_budget, trace.delayed_gate_synthesis, steps_to_extrapolate_to
+        )
+
 
 def _get_linear_extrapolation(x, y, steps_to_extrapolate_to):
     coeffs, sum_of_residuals, _, _, _ = np.polyfit(x, y, 1, full=True)
@@ -1,48 +1,121 @@
 from dataclasses import dataclass
-from typing import Callable, Optional
+from typing import Callable, Optional, Tuple, Union
 
 import networkx as nx
 import numpy as np
 from graph_state_generation.optimizers import greedy_stabilizer_measurement_scheduler
 from graph_state_generation.substrate_scheduler import TwoRowSubstrateScheduler
-
-from ...data_structures import BasicArchitectureModel, DecoderModel, ErrorBudget
-from .structs import GraphPartition
+from numpy.typing import ArrayLike
+
+from ...data_structures import (
+    BasicArchitectureModel,
+    CSRGraph,
+    DecoderModel,
+    ErrorBudget,
+    GraphStatistics,
+)
+from .measurement_scheduler import (
+    get_n_measurement_steps,
+    get_n_measurement_steps_bounds,
+)
+from .structs import AnyGraph, GraphPartition
 
 INITIAL_SYNTHESIS_ACCURACY = 0.0001
 
+MIN_CODE_DISTANCE = 4
+MAX_CODE_DISTANCE = 99
+
+N_MEASUREMENT_STEPS_METHODS = ("exact", "bounds")
 
-def substrate_scheduler(graph: nx.Graph) -> TwoRowSubstrateScheduler:
-    connected_graph = graph.copy()
-    connected_graph.remove_nodes_from(list(nx.isolates(graph)))  # remove isolated nodes
-    connected_graph = nx.convert_node_labels_to_integers(connected_graph)
+
+def substrate_scheduler(graph: Union[nx.Graph, CSRGraph]) -> TwoRowSubstrateScheduler:
     scheduler_only_compiler = TwoRowSubstrateScheduler(
-        connected_graph, stabilizer_scheduler=greedy_stabilizer_measurement_scheduler
+        _get_connected_integer_graph(graph),
+        stabilizer_scheduler=greedy_stabilizer_measurement_scheduler,
     )
     scheduler_only_compiler.run()
     return scheduler_only_compiler
 
 
+def _get_connected_integer_graph(graph: Union[nx.Graph, CSRGraph]) -> nx.Graph:
+    """The graph without its isolated nodes, with the other nodes labeled by
+    consecutive integers in their original order.
+
+    It is built in a single pass over the edges, instead of copying the graph,
+    removing the isolated nodes and relabeling the copy.
+    """
+    if isinstance(graph, CSRGraph):
+        degrees = graph.degrees()
+        labels = np.cumsum(degrees > 0) - 1
+        sources = np.repeat(np.arange(len(graph)), degrees)
+        # keep only one copy of each edge
+        mask = sources < graph.indices
+        connected_graph = nx.empty_graph(int(np.count_nonzero(degrees)))
+        connected_graph.add_edges_from(
+            zip(
+                labels[sources[mask]].tolist(),
+                labels[graph.indices[mask]].tolist(),
+            )
+        )
+        return connected_graph
+
+    labels = {}
+    for node, degree in graph.degree():
+        if degree > 0:
+            labels[node] = len(labels)
+    connected_graph = nx.empty_graph(len(labels))
+    connected_graph.add_edges_from(
+        (labels[node], labels[neighbor]) for node, neighbor in graph.edges()
+    )
+    return connected_graph
+
+
 @dataclass
 class GraphData:
-    """Contains minimal set of data to get a resource estimate for a graph."""
+    """Contains minimal set of data to get a resource estimate for a graph.
+
+    When the number of measurement steps is bounded rather than computed exactly,
+    n_measurement_steps is its upper bound. When the data is composed from the
+    graphs of the subroutines of a program, see ResourceInfo, it is approximate.
+    """
 
     max_graph_degree: int
     n_nodes: int
     n_measurement_steps: int
+    n_measurement_steps_lower_bound: int
+    n_measurement_steps_is_exact: bool
+    composed_from_subroutines: bool
 
 
 @dataclass
 class ResourceInfo:
-    """Contains all resource estimated for a problem instance."""
+    """Contains all resource estimated for a problem instance.
+
+    When the number of measurement steps is bounded rather than computed exactly,
+    n_measurement_steps and total_time are upper bounds. When no code distance up to
+    the maximum of the estimator meets the error budget, code_distance_saturated is
+    true and the resources are those of the maximum distance, whose
+    logical_error_rate exceeds the budget.
+
+    When the graph of the program wasn't combined into a single graph, the graph
+    data is composed from the graphs of its subroutines and composed_from_subroutines
+    is true. The edges that the data qubits carry across the boundaries of the
+    subroutines are then neglected, so n_logical_qubits, n_measurement_steps, its
+    lower bound and the resources depending on them are approximations rather than
+    bounds.
+    """
 
     synthesis_multiplier: float
     code_distance: int
+    code_distance_saturated: bool
     logical_error_rate: float
     n_logical_qubits: int
     n_nodes: int
     n_physical_qubits: int
     n_measurement_steps: int
+    n_measurement_steps_lower_bound: int
+    n_measurement_steps_is_exact: bool
+    composed_from_subroutines: bool
     total_time: float
     max_decodable_distance: Optional[int]
     decoder_power: Optional[float]
@@ -62,16 +135,73 @@ class ResourceInfo:
         return "\n".join(f"{info}: {getattr(self, info)}" for info in necessary_info)
 
 
+@dataclass
+class BatchResourceInfo:
+    """Resources estimated for a problem instance for many hardware models and
+    error budgets, as returned by GraphResourceEstimator.estimate_batch.
+
+    It is a table with one row per combination of parameters. The array attributes
+    are its columns, and the other attributes are the same for all the rows, see
+    ResourceInfo. pandas.DataFrame(dataclasses.asdict(info)) turns it into a data
+    frame.
+    """
+
+    # parameters of each row
+    physical_gate_error_rate: np.ndarray
+    physical_gate_time_in_seconds: np.ndarray
+    ultimate_failure_tolerance: np.ndarray
+    circuit_generation_weight: np.ndarray
+    synthesis_weight: np.ndarray
+    ec_weight: np.ndarray
+    # resources of each row
+    synthesis_multiplier: np.ndarray
+    code_distance: np.ndarray
+    code_distance_saturated: np.ndarray
+    logical_error_rate: np.ndarray
+    n_physical_qubits: np.ndarray
+    total_time: np.ndarray
+    max_decodable_distance: Optional[np.ndarray]
+    decoder_power: Optional[np.ndarray]
+    decoder_area: Optional[np.ndarray]
+    # resources shared by all the rows
+    n_logical_qubits: int
+    n_nodes: int
+    n_measurement_steps: int
+    n_measurement_steps_lower_bound: int
+    n_measurement_steps_is_exact: bool
+    composed_from_subroutines: bool
+
+    def __len__(self) -> int:
+        return len(self.code_distance)
+
+
 class GraphResourceEstimator:
+    """Estimates the resources needed to prepare the graph state of a program.
+
+    Args:
+        hw_model: architecture the program is run on.
+        decoder_model: decoder used to correct errors, if any.
+        n_measurement_steps_method: "exact" to schedule the stabilizer measurements,
+            or "bounds" to only bound the number of measurement steps from the
+            degrees of the nodes. Bounding takes linear time and works on graph
+            statistics, which is useful to triage many instances.
+        max_code_distance: largest code distance considered. If it doesn't meet
+            the error budget, the estimates are made for it and reported as
+            saturated.
+    """
+
     def __init__(
         self,
         hw_model: BasicArchitectureModel,
         decoder_model: Optional[DecoderModel] = None,
-        combine_partition: bool = True,
+        n_measurement_steps_method: str = "exact",
+        max_code_distance: int = MAX_CODE_DISTANCE,
     ):
+        _check_n_measurement_steps_method(n_measurement_steps_method)
         self.hw_model = hw_model
-        self.combine_partition = combine_partition
         self.decoder_model = decoder_model
+        self.n_measurement_steps_method = n_measurement_steps_method
+        self.max_code_distance = max_code_distance
 
     N_TOCKS_PER_T_GATE_FACTORY = 15
     # We are not sure if names below are the best choice
@@ -84,12 +214,18 @@ class GraphResourceEstimator:
     # Assumes gridsynth scaling and full Euler angle decompositions
     SYNTHESIS_SCALING = 3 * 4
 
-    def _logical_cell_failure_rate(self, distance: int) -> float:
+    def _logical_cell_failure_rate(
+        self, distance: int, physical_gate_error_rate: Optional[ArrayLike] = None
+    ) -> float:
+        """Failure rate of a logical cell, for the physical gate error rate of the
+        hardware model unless it is given. Works elementwise on arrays."""
+        if physical_gate_error_rate is None:
+            physical_gate_error_rate = self.hw_model.physical_gate_error_rate
         return (
             # 0.3 and 70 come from numerical simulations
             distance
             * 0.3
-            * (70 * self.hw_model.physical_gate_error_rate) ** ((distance + 1) / 2)
+            * (70 * physical_gate_error_rate) ** ((distance + 1) / 2)
         )
 
     def _minimize_code_distance(
@@ -98,21 +234,56 @@ class GraphResourceEstimator:
         max_graph_degree: int,
         error_budget: ErrorBudget,
         error_rate: Callable[[int, int, int], float],
-        min_d: int = 4,
-        max_d: int = 100,
-    ) -> int:
+        min_d: int = MIN_CODE_DISTANCE,
+        max_d: Optional[int] = None,
+    ) -> Tuple[int, bool]:
+        """Smallest code distance from min_d to max_d whose error rate is below the
+        error correction failure tolerance.
+
+        The error rates are proportional to the logical cell failure rate, whose
+        logarithm is concave in the distance. The distances below the tolerance
+        are therefore a prefix and a suffix of all the distances. If min_d isn't
+        below it, they are a suffix, whose start is found by bisection.
+
+        Returns:
+            The code distance, and whether it saturated at max_d without meeting
+            the tolerance.
+        """
+        if max_d is None:
+            max_d = self.max_code_distance
 
-        for distance in range(min_d, max_d):
-            if (
+        def meets_budget(distance):
+            return (
                 error_rate(distance, n_nodes, max_graph_degree)
                 < error_budget.ec_failure_tolerance
-            ):
-                return distance
-
-        raise RuntimeError(f"Not found good error rates under distance code: {max_d}.")
+            )
 
-    def _get_n_measurement_steps(self, graph) -> int:
-        return len(substrate_scheduler(graph).measurement_steps)
+        if meets_budget(min_d):
+            return min_d, False
+        # the budget isn't met at low, and is at high if it is for any distance
+        low, high = min_d, max_d + 1
+        while high - low > 1:
+            middle = (low + high) // 2
+            if meets_budget(middle):
+                high = middle
+            else:
+                low = middle
+        if high > max_d:
+            return max_d, True
+        return high, False
+
+    def _get_n_measurement_steps(self, graph: AnyGraph) -> Tuple[int, int]:
+        """Lower and upper bounds on the number of measurement steps, which are
+        equal if it is computed exactly."""
+        if self.n_measurement_steps_method == "bounds":
+            return get_n_measurement_steps_bounds(graph)
+        if isinstance(graph, GraphStatistics):
+            raise ValueError(
+                "Number of measurement steps can't be computed from graph statistics "
+                'alone. Use n_measurement_steps_method="bounds" to bound it instead.'
+            )
+        n_measurement_steps = get_n_measurement_steps(graph)
+        return n_measurement_steps, n_measurement_steps
 
     def _ec_error_rate_delayed_gate_synthesis(
         self, distance: int, n_nodes: int, max_graph_degree: int
@@ -123,11 +294,15 @@ class GraphResourceEstimator:
         return ec_error_rate
 
     def _ec_error_rate(
-        self, distance: int, n_nodes: int, max_graph_degree: int
+        self,
+        distance: int,
+        n_nodes: int,
+        max_graph_degree: int,
+        physical_gate_error_rate: Optional[ArrayLike] = None,
     ) -> float:
-        return self._logical_cell_failure_rate(distance) * self.get_logical_st_volume(
-            n_nodes, max_graph_degree
-        )
+        return self._logical_cell_failure_rate(
+            distance, physical_gate_error_rate
+        ) * self.get_logical_st_volume(n_nodes, max_graph_degree)
 
     def get_logical_st_volume(self, n_nodes: int, max_graph_degree: int):
         num_boxes = np.ceil((max_graph_degree + 1) / self.BOX_WIDTH)
@@ -136,16 +311,27 @@ class GraphResourceEstimator:
         time = self.N_TOCKS_PER_T_GATE_FACTORY * n_nodes
         return space * time
 
-    def find_max_decodable_distance(self, min_d=4, max_d=100):
-        max_distance = 0
+    def find_max_decodable_distance(
+        self,
+        min_d=4,
+        max_d=100,
+        physical_gate_time_in_seconds: Optional[ArrayLike] = None,
+    ):
+        """Largest distance below max_d which the decoder decodes faster than a
+        logical operation takes, 0 if there is none. Uses the physical gate time of
+        the hardware model unless it is given, and works elementwise on arrays."""
+        if physical_gate_time_in_seconds is None:
+            physical_gate_time_in_seconds = self.hw_model.physical_gate_time_in_seconds
+        max_distance = np.zeros(np.shape(physical_gate_time_in_seconds), dtype=int)
         for distance in range(min_d, max_d):
-            time_for_logical_operation = (
-                6 * self.hw_model.physical_gate_time_in_seconds * distance
+            time_for_logical_operation = 6 * physical_gate_time_in_seconds * distance
+            max_distance = np.where(
+                self.decoder_model.delay(distance) < time_for_logical_operation,
+                distance,
+                max_distance,
             )
-            if self.decoder_model.delay(distance) < time_for_logical_operation:
-                max_distance = distance
 
-        return max_distance
+        return max_distance if np.ndim(max_distance) else int(max_distance)
 
     # TODO: We need to make sure it's doing scientifically what it should be doing
     def balance_logical_error_rate_and_synthesis_accuracy(
@@ -173,14 +359,56 @@ class GraphResourceEstimator:
             current_synthesis_accuracy = new_synthesis_accuracy
         return current_synthesis_accuracy, ec_error_rate
 
-    def _get_graph_data(self, graph: nx.Graph, n_nodes: int) -> GraphData:
-        max_graph_degree = max(deg for _, deg in graph.degree())
+    def _get_max_graph_degree(self, graph: AnyGraph) -> int:
+        if isinstance(graph, GraphStatistics):
+            return graph.max_degree
+        elif isinstance(graph, CSRGraph):
+            return int(graph.degrees().max())
+        else:
+            return max(deg for _, deg in graph.degree())
+
+    def _get_graph_data(self, graph: AnyGraph, n_nodes: int) -> GraphData:
+        max_graph_degree = self._get_max_graph_degree(graph)
         n_nodes = n_nodes
-        n_measurement_steps = self._get_n_measurement_steps(graph)
+        lower_bound, n_measurement_steps = self._get_n_measurement_steps(graph)
         return GraphData(
             max_graph_degree=max_graph_degree,
             n_nodes=n_nodes,
             n_measurement_steps=n_measurement_steps,
+            n_measurement_steps_lower_bound=lower_bound,
+            n_measurement_steps_is_exact=self.n_measurement_steps_method == "exact",
+            composed_from_subroutines=False,
+        )
+
+    def _get_graph_data_from_partition(self, problem: GraphPartition) -> GraphData:
+        """Composes the graph data of a program from the graphs of its subroutines.
+
+        Each distinct subroutine graph is only looked at once. The subroutines are
+        executed one after another, so their measurement steps add up, weighted by
+        the number of times each subroutine is called. The max degree is the largest
+        degree of any subroutine graph which is called. Both neglect the edges
+        created across the boundaries of subroutines, so the data is marked as
+        composed, and the number of measurement steps as not exact.
+        """
+        max_graph_degree = 0
+        n_measurement_steps = 0
+        lower_bound = 0
+        for graph, multiplicity in zip(
+            problem.subgraphs, problem.program.multiplicities
+        ):
+            if multiplicity == 0:
+                continue
+            max_graph_degree = max(max_graph_degree, self._get_max_graph_degree(graph))
+            graph_lower_bound, graph_upper_bound = self._get_n_measurement_steps(graph)
+            n_measurement_steps += multiplicity * graph_upper_bound
+            lower_bound += multiplicity * graph_lower_bound
+        return GraphData(
+            max_graph_degree=max_graph_degree,
+            n_nodes=problem.n_nodes,
+            n_measurement_steps=n_measurement_steps,
+            n_measurement_steps_lower_bound=lower_bound,
+            n_measurement_steps_is_exact=False,
+            composed_from_subroutines=True,
         )
 
     def _estimate_resources_from_graph_data(
@@ -195,7 +423,7 @@ class GraphResourceEstimator:
             else self._ec_error_rate
         )
 
-        code_distance = self._minimize_code_distance(
+        code_distance, code_distance_saturated = self._minimize_code_distance(
             graph_data.n_nodes,
             graph_data.max_graph_degree,
             error_budget,
@@ -252,11 +480,15 @@ class GraphResourceEstimator:
         return ResourceInfo(
             synthesis_multiplier=synthesis_multiplier,
             code_distance=code_distance,
+            code_distance_saturated=code_distance_saturated,
             logical_error_rate=total_logical_error_rate,
             # estimate the number of logical qubits using max node degree
             n_logical_qubits=graph_data.max_graph_degree,
             n_nodes=graph_data.n_nodes,
             n_measurement_steps=graph_data.n_measurement_steps,
+            n_measurement_steps_lower_bound=graph_data.n_measurement_steps_lower_bound,
+            n_measurement_steps_is_exact=graph_data.n_measurement_steps_is_exact,
+            composed_from_subroutines=graph_data.composed_from_subroutines,
             total_time=wall_time,
             n_physical_qubits=n_physical_qubits,
             decoder_power=decoder_power,
@@ -264,19 +496,192 @@ class GraphResourceEstimator:
             max_decodable_distance=max_decodable_distance,
         )
 
+    def _get_problem_graph_data(self, problem: GraphPartition) -> GraphData:
+        if len(problem.subgraphs) == 1:
+            return self._get_graph_data(problem.subgraphs[0], problem.n_nodes)
+        else:
+            return self._get_graph_data_from_partition(problem)
+
     def estimate(
         self, problem: GraphPartition, error_budget: ErrorBudget
     ) -> ResourceInfo:
-        n_nodes = problem.n_nodes
-        if len(problem.subgraphs) == 1:
-            graph_data = self._get_graph_data(problem.subgraphs[0], n_nodes)
-            return self._estimate_resources_from_graph_data(
-                graph_data,
-                problem.delayed_gate_synthesis,
-                error_budget,
+        return self._estimate_resources_from_graph_data(
+            self._get_problem_graph_data(problem),
+            problem.delayed_gate_synthesis,
+            error_budget,
+        )
+
+    def estimate_batch(
+        self,
+        problem: GraphPartition,
+        ultimate_failure_tolerances: ArrayLike,
+        physical_gate_error_rates: Optional[ArrayLike] = None,
+        physical_gate_times_in_seconds: Optional[ArrayLike] = None,
+        circuit_generation_weights: ArrayLike = 1,
+        synthesis_weights: ArrayLike = 1,
+        ec_weights: ArrayLike = 1,
+    ) -> BatchResourceInfo:
+        """Estimates the resources of a problem for many hardware models and error
+        budgets at once.
+
+        The graph data of the problem is computed once, and the estimates for all
+        the combinations of parameters are computed with numpy instead of one by
+        one. They are the same as those of estimate with the corresponding
+        BasicArchitectureModel and ErrorBudget.
+
+        Args:
+            problem: the problem to estimate the resources of.
+            ultimate_failure_tolerances: see ErrorBudget.
+            physical_gate_error_rates: see BasicArchitectureModel. Defaults to the
+                one of the hardware model of the estimator.
+            physical_gate_times_in_seconds: see BasicArchitectureModel. Defaults to
+                the one of the hardware model of the estimator.
+            circuit_generation_weights: see ErrorBudget.
+            synthesis_weights: see ErrorBudget.
+            ec_weights: see ErrorBudget.
+
+        The parameters are broadcast against each other, so a grid is obtained by
+        giving them along different axes, and the rows of the table are the
+        flattened combinations.
+
+        Returns:
+            Table with a row per combination of parameters.
+        """
+        if physical_gate_error_rates is None:
+            physical_gate_error_rates = self.hw_model.physical_gate_error_rate
+        if physical_gate_times_in_seconds is None:
+            physical_gate_times_in_seconds = self.hw_model.physical_gate_time_in_seconds
+        columns = [
+            np.ravel(column).astype(float)
+            for column in np.broadcast_arrays(
+                physical_gate_error_rates,
+                physical_gate_times_in_seconds,
+                ultimate_failure_tolerances,
+                circuit_generation_weights,
+                synthesis_weights,
+                ec_weights,
+            )
+        ]
+        return self._estimate_batch_from_graph_data(
+            self._get_problem_graph_data(problem),
+            problem.delayed_gate_synthesis,
+            *columns,
+        )
+
+    def _estimate_batch_from_graph_data(
+        self,
+        graph_data: GraphData,
+        delayed_gate_synthesis: bool,
+        physical_gate_error_rate: np.ndarray,
+        physical_gate_time_in_seconds: np.ndarray,
+        ultimate_failure_tolerance: np.ndarray,
+        circuit_generation_weight: np.ndarray,
+        synthesis_weight: np.ndarray,
+        ec_weight: np.ndarray,
+    ) -> BatchResourceInfo:
+        """Vectorized version of _estimate_resources_from_graph_data, following the
+        same steps with one value per row."""
+        total_weights = circuit_generation_weight + synthesis_weight + ec_weight
+        ec_failure_tolerance = ultimate_failure_tolerance * ec_weight / total_weights
+        space_time_volume = self.get_logical_st_volume(
+            graph_data.n_nodes, graph_data.max_graph_degree
+        )
+
+        def ec_error_rate(distance):
+            error_rate = self._ec_error_rate(
+                distance,
+                graph_data.n_nodes,
+                graph_data.max_graph_degree,
+                physical_gate_error_rate,
             )
+            if delayed_gate_synthesis:
+                # balance_logical_error_rate_and_synthesis_accuracy gives up on
+                # these rates
+                error_rate[~(error_rate > 0)] = np.inf
+            return error_rate
+
+        # bisection of _minimize_code_distance, for all rows at once
+        min_d, max_d = MIN_CODE_DISTANCE, self.max_code_distance
+        meets_budget = ec_error_rate(min_d) < ec_failure_tolerance
+        low = np.where(meets_budget, min_d - 1, min_d)
+        high = np.where(meets_budget, min_d, max_d + 1)
+        while np.any(high - low > 1):
+            middle = (low + high) // 2
+            meets_budget = ec_error_rate(middle) < ec_failure_tolerance
+            searching = high - low > 1
+            high = np.where(searching & meets_budget, middle, high)
+            low = np.where(searching & ~meets_budget, middle, low)
+        code_distance_saturated = high > max_d
+        code_distance = np.minimum(high, max_d)
+
+        total_logical_error_rate = ec_error_rate(code_distance)
+        if not delayed_gate_synthesis:
+            synthesis_multiplier = np.ones(len(code_distance))
         else:
-            raise NotImplementedError(
-                "Resource estimation without combining subgraphs is not yet "
-                "supported."
+            synthesis_accuracy = (1 / (12 * graph_data.n_nodes)) * (
+                total_logical_error_rate
+            )
+            synthesis_multiplier = self.SYNTHESIS_SCALING * np.log2(
+                1 / synthesis_accuracy
+            )
+
+        time_of_logical_t_gate = 6 * physical_gate_time_in_seconds * code_distance
+
+        num_boxes = np.ceil((graph_data.max_graph_degree + 1) / self.BOX_WIDTH)
+        patch_size = 2 * code_distance**2
+        n_physical_qubits = self.BOX_WIDTH * self.BOX_HEIGHT * num_boxes * patch_size
+
+        wall_time = (
+            graph_data.n_measurement_steps * time_of_logical_t_gate
+            + time_of_logical_t_gate
+            * self.N_TOCKS_PER_T_GATE_FACTORY
+            * graph_data.n_nodes
+            * synthesis_multiplier
+        )
+
+        if self.decoder_model:
+            decoder_power = space_time_volume * self.decoder_model.power(
+                code_distance.astype(float)
             )
+            decoder_area = graph_data.max_graph_degree * self.decoder_model.area(
+                code_distance.astype(float)
+            )
+            max_decodable_distance = self.find_max_decodable_distance(
+                physical_gate_time_in_seconds=physical_gate_time_in_seconds
+            )
+        else:
+            decoder_power = None
+            decoder_area = None
+            max_decodable_distance = None
+
+        return BatchResourceInfo(
+            physical_gate_error_rate=physical_gate_error_rate,
+            physical_gate_time_in_seconds=physical_gate_time_in_seconds,
+            ultimate_failure_tolerance=ultimate_failure_tolerance,
+            circuit_generation_weight=circuit_generation_weight,
+            synthesis_weight=synthesis_weight,
+            ec_weight=ec_weight,
+            synthesis_multiplier=synthesis_multiplier,
+            code_distance=code_distance,
+            code_distance_saturated=code_distance_saturated,
+            logical_error_rate=total_logical_error_rate,
+            n_physical_qubits=n_physical_qubits,
+            total_time=wall_time,
+            max_decodable_distance=max_decodable_distance,
+            decoder_power=decoder_power,
+            decoder_area=decoder_area,
+            n_logical_qubits=graph_data.max_graph_degree,
+            n_nodes=graph_data.n_nodes,
+            n_measurement_steps=graph_data.n_measurement_steps,
+            n_measurement_steps_lower_bound=graph_data.n_measurement_steps_lower_bound,
+            n_measurement_steps_is_exact=graph_data.n_measurement_steps_is_exact,
+            composed_from_subroutines=graph_data.composed_from_subroutines,
+        )
+
+
+def _check_n_measurement_steps_method(method: str) -> None:
+    if method not in N_MEASUREMENT_STEPS_METHODS:
+        raise ValueError(
+            f"n_measurement_steps_method must be one of {N_MEASUREMENT_STEPS_METHODS}"
+            f", not {method}"
+        )
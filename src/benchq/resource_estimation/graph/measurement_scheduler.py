@@ -0,0 +1,149 @@
+"""Native scheduler of the stabilizer measurements preparing a graph state.
+
+It gives the same schedule as substrate_scheduler, which runs the
+TwoRowSubstrateScheduler of graph_state_generation with its
+greedy_stabilizer_measurement_scheduler, but works on the arrays of a CSRGraph
+instead of copying and relabeling the graph and building lists of tuples.
+
+In the two row layout each node is a patch, and measuring the stabilizer of a node
+occupies the ancillas from its leftmost to its rightmost patch among the node and
+its neighbors. Isolated nodes don't need to be measured and are skipped, which
+doesn't change the order of the other patches. Stabilizers are taken by increasing
+rightmost patch, and each one is measured in the step which has been free for the
+longest time if it is free by then, or in a new step otherwise. The stabilizers
+measured in a step therefore act on disjoint ranges of patches.
+"""
+
+from typing import Any, List, Tuple, Union
+
+import networkx as nx
+import numpy as np
+
+from ...data_structures import CSRGraph, GraphStatistics
+
+
+def get_n_measurement_steps(graph: Union[nx.Graph, CSRGraph]) -> int:
+    """Number of steps needed to measure the stabilizers of the graph state.
+
+    Args:
+        graph: graph of the state, either a networkx graph whose node order is the
+            order of the patches, or a CSRGraph.
+
+    Returns:
+        The number of measurement steps, 0 if the graph has no edges.
+    """
+    _, first, last = _get_stabilizer_spans(graph)
+    order = np.argsort(last, kind="stable")
+    n_stabilizers = len(order)
+    if n_stabilizers == 0:
+        return 0
+    first_by_last = first[order].tolist()
+    last_by_last = last[order].tolist()
+    # The steps are queued by the time they become free. Since stabilizers are
+    # taken by increasing rightmost patch, the queue always holds the last
+    # stabilizers of each step, which are last_by_last[oldest:k].
+    oldest = 0
+    for k in range(1, n_stabilizers):
+        if first_by_last[k] > last_by_last[oldest]:
+            oldest += 1
+    return n_stabilizers - oldest
+
+
+def schedule_measurement_steps(graph: Union[nx.Graph, CSRGraph]) -> List[List[Any]]:
+    """Schedule of the stabilizer measurements preparing the graph state.
+
+    Args:
+        graph: graph of the state, either a networkx graph whose node order is the
+            order of the patches, or a CSRGraph.
+
+    Returns:
+        For each measurement step, the nodes whose stabilizers are measured in it.
+        The steps are ordered like those of substrate_scheduler.
+    """
+    nodes, first, last = _get_stabilizer_spans(graph)
+    order = np.argsort(last, kind="stable")
+    n_stabilizers = len(order)
+    if n_stabilizers == 0:
+        return []
+    first_by_last = first[order].tolist()
+    last_by_last = last[order].tolist()
+    steps: List[List[int]] = [[0]]
+    step_of = [0] * n_stabilizers
+    oldest = 0
+    for k in range(1, n_stabilizers):
+        if first_by_last[k] > last_by_last[oldest]:
+            step_of[k] = step_of[oldest]
+            oldest += 1
+        else:
+            step_of[k] = len(steps)
+            steps.append([])
+        steps[step_of[k]].append(k)
+
+    labels = list(graph) if isinstance(graph, nx.Graph) else None
+    stabilizer_nodes = nodes[order].tolist()
+    schedule = []
+    for k in range(oldest, n_stabilizers):
+        step_nodes = [stabilizer_nodes[i] for i in steps[step_of[k]]]
+        if labels is not None:
+            step_nodes = [labels[node] for node in step_nodes]
+        schedule.append(step_nodes)
+    return schedule
+
+
+def get_n_measurement_steps_bounds(
+    graph: Union[nx.Graph, CSRGraph, GraphStatistics],
+) -> Tuple[int, int]:
+    """Lower and upper bounds on get_n_measurement_steps, computed from the degrees
+    of the nodes only.
+
+    The stabilizers of a node and of all its neighbors act on the patch of the node,
+    so they are measured in different steps, and there are at least max_degree + 1
+    steps. Each step measures at least one stabilizer, so there are at most as many
+    steps as non isolated nodes. This takes linear time and also works for graphs
+    of which only the statistics are known.
+
+    Args:
+        graph: graph of the state or its statistics.
+
+    Returns:
+        The lower and upper bounds, both 0 if the graph has no edges.
+    """
+    if isinstance(graph, nx.Graph):
+        degrees = np.array([degree for _, degree in graph.degree()], dtype=np.int64)
+        statistics = GraphStatistics.from_degrees(degrees)
+    elif isinstance(graph, CSRGraph):
+        statistics = graph.statistics()
+    else:
+        statistics = graph
+    if statistics.n_edges == 0:
+        return 0, 0
+    return statistics.max_degree + 1, statistics.n_nodes - statistics.n_isolated_nodes
+
+
+def _get_stabilizer_spans(
+    graph: Union[nx.Graph, CSRGraph],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Positions of the non isolated nodes, and of the leftmost and rightmost
+    patches their stabilizers act on."""
+    if isinstance(graph, nx.Graph):
+        positions = {node: position for position, node in enumerate(graph)}
+        nodes, first, last = [], [], []
+        for node, neighbors in graph.adjacency():
+            if not neighbors:
+                continue
+            position = positions[node]
+            neighbor_positions = [positions[neighbor] for neighbor in neighbors]
+            nodes.append(position)
+            first.append(min(position, min(neighbor_positions)))
+            last.append(max(position, max(neighbor_positions)))
+        return np.array(nodes, dtype=np.int64), np.array(first), np.array(last)
+
+    nodes = np.flatnonzero(graph.degrees())
+    if len(nodes) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    # rows of isolated nodes are empty, so each segment is the row of one node
+    starts = graph.indptr[nodes]
+    first = np.minimum(nodes, np.minimum.reduceat(graph.indices, starts))
+    last = np.maximum(nodes, np.maximum.reduceat(graph.indices, starts))
+    return nodes, first, last
@@ -1,9 +1,12 @@
-from copy import deepcopy
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional, Tuple
 
 from .extrapolation_estimator import (
     ExtrapolatedResourceInfo,
     ExtrapolationResourceEstimator,
 )
+from .graph_estimator import ResourceInfo
 
 
 def run_resource_estimation_pipeline(
@@ -25,18 +28,102 @@ def run_extrapolation_pipeline(
 ) -> ExtrapolatedResourceInfo:
     small_programs_resource_info = []
     for i in estimator.steps_to_extrapolate_from:
-        # create copy of program for each number of steps
-        small_program = deepcopy(program)
-        small_program.steps = i
-
-        for transformer in transformers:
-            small_program = transformer(small_program)
-        resource_info = estimator.estimate(small_program, error_budget)
+        resource_info, delayed_gate_synthesis = _estimate_small_program(
+            program, i, error_budget, estimator, transformers
+        )
         small_programs_resource_info.append(resource_info)
 
     return estimator.estimate_via_extrapolation(
         small_programs_resource_info,
         error_budget,
-        small_program.delayed_gate_synthesis,
+        delayed_gate_synthesis,
         program.steps,
     )
+
+
+def run_parallel_extrapolation_pipeline(
+    program,
+    error_budget,
+    estimator: ExtrapolationResourceEstimator,
+    transformers,
+    executor: Optional[Executor] = None,
+    max_workers: Optional[int] = None,
+) -> ExtrapolatedResourceInfo:
+    """Same as run_extrapolation_pipeline, but the programs for each of the steps to
+    extrapolate from are transformed and estimated concurrently.
+
+    The program, estimator and transformers are sent to the workers, so they have to
+    be picklable, e.g. the transformers from this package and programs whose
+    subroutine sequence is given by a SubroutineSequencePattern.
+
+    Args:
+        executor: executor running the small programs. If None, a pool of
+            max_workers processes is created for the call. The processes are
+            spawned rather than forked, so that each starts its own julia runtime.
+        max_workers: number of processes of the pool created when no executor is
+            given. Defaults to the number of steps to extrapolate from.
+    """
+    steps_to_extrapolate_from = estimator.steps_to_extrapolate_from
+    if executor is None:
+        with ProcessPoolExecutor(
+            max_workers=max_workers or len(steps_to_extrapolate_from),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as process_pool:
+            return run_parallel_extrapolation_pipeline(
+                program, error_budget, estimator, transformers, process_pool
+            )
+
+    futures = [
+        executor.submit(
+            _estimate_small_program,
+            program,
+            steps,
+            error_budget,
+            estimator,
+            transformers,
+        )
+        for steps in steps_to_extrapolate_from
+    ]
+    # gather results in the order of steps_to_extrapolate_from
+    results = [future.result() for future in futures]
+    small_programs_resource_info = [resource_info for resource_info, _ in results]
+    delayed_gate_synthesis = results[-1][1]
+
+    return estimator.estimate_via_extrapolation(
+        small_programs_resource_info,
+        error_budget,
+        delayed_gate_synthesis,
+        program.steps,
+    )
+
+
+def _estimate_small_program(
+    program, steps, error_budget, estimator, transformers
+) -> Tuple[ResourceInfo, bool]:
+    small_program = program.with_steps(steps)
+
+    for transformer in transformers:
+        small_program = transformer(small_program)
+    resource_info = estimator.estimate(small_program, error_budget)
+    return resource_info, small_program.delayed_gate_synthesis
+
+
+def run_traced_extrapolation_pipeline(
+    program,
+    error_budget,
+    estimator: ExtrapolationResourceEstimator,
+    transformers,
+) -> ExtrapolatedResourceInfo:
+    """Same as run_extrapolation_pipeline, but the transformers are only applied to
+    the program with the largest number of steps to extrapolate from, and the graphs
+    for the other numbers of steps are recorded during its simulation. The last
+    transformer should be create_graph_trace_from_subcircuits for
+    estimator.steps_to_extrapolate_from, which only supports programs whose
+    subroutine sequences for fewer steps are prefixes of the ones for more steps.
+    """
+    small_program = program.with_steps(max(estimator.steps_to_extrapolate_from))
+
+    for transformer in transformers:
+        small_program = transformer(small_program)
+
+    return estimator.estimate_from_trace(small_program, error_budget, program.steps)
@@ -6,15 +6,16 @@ from cirq.circuits.circuit import Circuit as CirqCircuit
 from orquestra.quantum.circuits import Circuit as OrquestraCircuit
 from qiskit.circuit import QuantumCircuit as QiskitCircuit
 
-from ...data_structures import QuantumProgram
+from ...data_structures import CSRGraph, GraphStatistics, QuantumProgram
 
 AnyCircuit = Union[OrquestraCircuit, CirqCircuit, QiskitCircuit]
+AnyGraph = Union[nx.Graph, CSRGraph, GraphStatistics]
 
 
 @dataclass
 class GraphPartition:
     program: QuantumProgram
-    subgraphs: List[nx.Graph]
+    subgraphs: List[AnyGraph]
     delayed_gate_synthesis: bool
 
     @property
@@ -27,3 +28,21 @@ class GraphPartition:
         return n_nodes - self.program.num_data_qubits * (
             len(self.program.subroutine_sequence) - 1
         )
+
+
+@dataclass
+class GraphTrace:
+    """Graphs of a program recorded after the subroutine calls of several numbers
+    of steps, obtained from a single simulation of the program.
+
+    Attributes:
+        program: the program with the largest number of steps which was simulated.
+        steps: numbers of steps at which the graphs were recorded.
+        graphs: graph, or its statistics, recorded for each number of steps.
+        delayed_gate_synthesis: whether the gate synthesis is delayed.
+    """
+
+    program: QuantumProgram
+    steps: List[int]
+    graphs: List[AnyGraph]
+    delayed_gate_synthesis: bool
@@ -1,27 +1,38 @@
-from typing import Callable
+from functools import partial
+from typing import Callable, Optional, Sequence
 
 from ...compilation import (
+    GraphCache,
     get_algorithmic_graph_from_graph_sim_mini,
+    get_default_graph_cache,
+    get_graph_trace_from_graph_sim_mini,
     pyliqtr_transpile_to_clifford_t,
 )
 from ...compilation import simplify_rotations as _simplify_rotations
 from ...data_structures import ErrorBudget, QuantumProgram, get_program_from_circuit
-from .structs import GraphPartition
+from ...data_structures.subroutine_sequence import as_subroutine_sequence
+from .structs import GraphPartition, GraphTrace
+
+# The transformers are partials of module level functions rather than closures, so
+# that they can be pickled and sent to worker processes.
 
 
 def synthesize_clifford_t(
     error_budget: ErrorBudget,
 ) -> Callable[[QuantumProgram], QuantumProgram]:
-    def _transformer(program: QuantumProgram) -> QuantumProgram:
-        circuits = [
-            pyliqtr_transpile_to_clifford_t(
-                circuit, circuit_precision=error_budget.synthesis_failure_tolerance
-            )
-            for circuit in program.subroutines
-        ]
-        return program.replace_circuits(circuits)
+    return partial(_synthesize_clifford_t, error_budget=error_budget)
 
-    return _transformer
+
+def _synthesize_clifford_t(
+    program: QuantumProgram, error_budget: ErrorBudget
+) -> QuantumProgram:
+    circuits = [
+        pyliqtr_transpile_to_clifford_t(
+            circuit, circuit_precision=error_budget.synthesis_failure_tolerance
+        )
+        for circuit in program.subroutines
+    ]
+    return program.replace_circuits(circuits)
 
 
 def simplify_rotations(program: QuantumProgram) -> QuantumProgram:
@@ -33,31 +44,151 @@ def simplify_rotations(program: QuantumProgram) -> QuantumProgram:
     )
 
 
+def _with_cache(graph_production_method, cache: Optional[GraphCache]):
+    if cache is None:
+        cache = get_default_graph_cache()
+    if cache is None:
+        return graph_production_method
+    return cache.cached(graph_production_method)
+
+
 def create_graphs_for_subcircuits(
     delayed_gate_synthesis: bool,
     graph_production_method=get_algorithmic_graph_from_graph_sim_mini,
+    cache: Optional[GraphCache] = None,
 ) -> Callable[[QuantumProgram], GraphPartition]:
-    def _transformer(program: QuantumProgram) -> GraphPartition:
-        graphs_list = [
-            graph_production_method(circuit) for circuit in program.subroutines
-        ]
-        return GraphPartition(
-            program, graphs_list, delayed_gate_synthesis=delayed_gate_synthesis
-        )
+    """Creates a graph for each subroutine of a program.
 
-    return _transformer
+    Graphs are looked up in the cache first, which defaults to the one configured
+    with the BENCHQ_GRAPH_CACHE_DIR environment variable, if any.
+    """
+    return partial(
+        _create_graphs_for_subcircuits,
+        delayed_gate_synthesis=delayed_gate_synthesis,
+        graph_production_method=graph_production_method,
+        cache=cache,
+    )
+
+
+def _create_graphs_for_subcircuits(
+    program: QuantumProgram,
+    delayed_gate_synthesis: bool,
+    graph_production_method,
+    cache: Optional[GraphCache],
+) -> GraphPartition:
+    produce_graph = _with_cache(graph_production_method, cache)
+    graphs_list = [produce_graph(circuit) for circuit in program.subroutines]
+    return GraphPartition(
+        program, graphs_list, delayed_gate_synthesis=delayed_gate_synthesis
+    )
 
 
 def create_big_graph_from_subcircuits(
     delayed_gate_synthesis: bool,
     graph_production_method=get_algorithmic_graph_from_graph_sim_mini,
+    cache: Optional[GraphCache] = None,
 ) -> Callable[[QuantumProgram], GraphPartition]:
-    def _transformer(program: QuantumProgram) -> GraphPartition:
-        big_circuit = program.full_circuit
-        new_program = get_program_from_circuit(big_circuit)
-        graph = graph_production_method(big_circuit)
-        return GraphPartition(
-            new_program, [graph], delayed_gate_synthesis=delayed_gate_synthesis
+    """Creates a single graph for the full circuit of a program.
+
+    The graph is looked up in the cache first, which defaults to the one configured
+    with the BENCHQ_GRAPH_CACHE_DIR environment variable, if any.
+    """
+    return partial(
+        _create_big_graph_from_subcircuits,
+        delayed_gate_synthesis=delayed_gate_synthesis,
+        graph_production_method=graph_production_method,
+        cache=cache,
+    )
+
+
+def _create_big_graph_from_subcircuits(
+    program: QuantumProgram,
+    delayed_gate_synthesis: bool,
+    graph_production_method,
+    cache: Optional[GraphCache],
+) -> GraphPartition:
+    produce_graph = _with_cache(graph_production_method, cache)
+    # the full circuit is only encoded, never built, by the graph simulators
+    big_circuit = program.full_circuit_view
+    new_program = get_program_from_circuit(big_circuit)
+    graph = produce_graph(big_circuit)
+    return GraphPartition(
+        new_program, [graph], delayed_gate_synthesis=delayed_gate_synthesis
+    )
+
+
+def create_graph_trace_from_subcircuits(
+    delayed_gate_synthesis: bool,
+    steps_to_trace: Sequence[int],
+    stats_only: bool = False,
+) -> Callable[[QuantumProgram], GraphTrace]:
+    """Simulates the full circuit of a program once, recording the graph after as
+    many subroutine calls as there are in the program with each of steps_to_trace.
+    The steps of the resulting trace are sorted and without duplicates.
+
+    This requires the subroutine sequences of smaller numbers of steps to be
+    prefixes of the sequence of the program (e.g. Trotter programs), so that the
+    recorded graphs are those of the smaller programs. Programs whose sequence ends
+    with a suffix, like QSP, are rejected with a ValueError. Use
+    run_extrapolation_pipeline for them instead.
+    """
+    return partial(
+        _create_graph_trace_from_subcircuits,
+        delayed_gate_synthesis=delayed_gate_synthesis,
+        steps_to_trace=steps_to_trace,
+        stats_only=stats_only,
+    )
+
+
+def _create_graph_trace_from_subcircuits(
+    program: QuantumProgram,
+    delayed_gate_synthesis: bool,
+    steps_to_trace: Sequence[int],
+    stats_only: bool,
+) -> GraphTrace:
+    subroutine_sequence = program.subroutine_sequence
+    subroutine_lengths = [
+        len(subroutine.operations) for subroutine in program.subroutines
+    ]
+    # the graphs are recorded in the order of the simulation
+    steps_to_trace = sorted(set(steps_to_trace))
+    boundaries = []
+    for steps in steps_to_trace:
+        traced_sequence = as_subroutine_sequence(
+            program.calculate_subroutine_sequence(steps)
+        )
+        if len(traced_sequence) > len(subroutine_sequence):
+            raise ValueError(
+                f"Can't trace {steps} steps of a program with {program.steps} steps."
+            )
+        if not all(
+            index == program_index
+            for index, program_index in zip(traced_sequence, subroutine_sequence)
+        ):
+            raise ValueError(
+                f"Can't trace {steps} steps of a program with {program.steps} steps, "
+                "since its subroutine sequence isn't a prefix of the program's one."
+            )
+        multiplicities = subroutine_sequence.prefix_multiplicities(
+            len(traced_sequence), len(program.subroutines)
         )
+        boundary = sum(
+            multiplicity * length
+            for multiplicity, length in zip(multiplicities, subroutine_lengths)
+        )
+        if boundary <= 0:
+            raise ValueError(
+                f"Can't trace {steps} steps, since their subroutine calls have no "
+                "gates."
+            )
+        boundaries.append(boundary)
 
-    return _transformer
+    graphs = get_graph_trace_from_graph_sim_mini(
+        program.full_circuit_view, boundaries, stats_only=stats_only
+    )
+    return GraphTrace(
+        program,
+        steps_to_trace,
+        graphs,
+        delayed_gate_synthesis=delayed_gate_synthesis,
+    )
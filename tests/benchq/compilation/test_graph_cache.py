@@ -0,0 +1,138 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+import os
+
+import networkx as nx
+import numpy as np
+import pytest
+from orquestra.quantum.circuits import CNOT, RZ, Circuit, H, T
+
+from benchq.compilation import (
+    GraphCache,
+    get_algorithmic_graph_from_graph_sim_mini,
+    get_csr_graph_from_graph_sim_mini,
+    get_graph_statistics_from_graph_sim_mini,
+    graph_cache,
+    julia_utils,
+)
+
+
+@pytest.fixture
+def counting_method():
+    calls = []
+
+    def _method(circuit):
+        calls.append(circuit)
+        return get_algorithmic_graph_from_graph_sim_mini(circuit)
+
+    _method.calls = calls
+    return _method
+
+
+def test_cached_graph_is_only_computed_once(tmp_path, counting_method):
+    cache = GraphCache(tmp_path)
+    cached_method = cache.cached(counting_method)
+    circuit = Circuit([H(0), T(0), CNOT(0, 1), T(1)])
+
+    graph = cached_method(circuit)
+    cached_graph = cached_method(circuit)
+
+    assert len(counting_method.calls) == 1
+    assert nx.utils.graphs_equal(graph, cached_graph)
+
+
+def test_gate_parameters_do_not_change_the_key(tmp_path):
+    cache = GraphCache(tmp_path)
+
+    assert cache.key(Circuit([RZ(0.1)(0), CNOT(0, 1)]), "method") == cache.key(
+        Circuit([RZ(0.2)(0), CNOT(0, 1)]), "method"
+    )
+    assert cache.key(Circuit([RZ(0.1)(0), CNOT(0, 1)]), "method") != cache.key(
+        Circuit([RZ(0.1)(1), CNOT(0, 1)]), "method"
+    )
+    assert cache.key(Circuit([H(0)]), "method") != cache.key(
+        Circuit([H(0)]), "other_method"
+    )
+
+
+@pytest.mark.parametrize(
+    "method",
+    [get_csr_graph_from_graph_sim_mini, get_graph_statistics_from_graph_sim_mini],
+)
+def test_csr_graphs_and_statistics_are_restored(tmp_path, method):
+    cache = GraphCache(tmp_path)
+    circuit = Circuit([H(0), T(0), CNOT(0, 1), H(2), CNOT(1, 2), T(2)])
+    graph = method(circuit)
+
+    cache.put("key", graph)
+    cached_graph = cache.get("key")
+
+    assert type(cached_graph) is type(graph)
+    for field in graph.__dataclass_fields__:
+        assert np.array_equal(getattr(cached_graph, field), getattr(graph, field))
+
+
+def test_networkx_graphs_keep_their_nodes(tmp_path):
+    cache = GraphCache(tmp_path)
+    graph = nx.Graph([(1, 3), (3, 5)])
+
+    cache.put("key", graph)
+
+    assert nx.utils.graphs_equal(cache.get("key"), graph)
+
+
+def test_least_recently_used_graphs_are_evicted(tmp_path):
+    graph = nx.path_graph(100)
+    cache = GraphCache(tmp_path)
+    cache.put("size", graph)
+    size = (tmp_path / "size.npz").stat().st_size
+    (tmp_path / "size.npz").unlink()
+
+    cache = GraphCache(tmp_path, max_size_in_bytes=2 * size)
+    cache.put("first", graph)
+    cache.put("second", graph)
+    # make sure that the access times differ
+    for timestamp, key in enumerate(["first", "second"]):
+        os.utime(tmp_path / f"{key}.npz", (timestamp, timestamp))
+    cache.get("first")
+    cache.put("third", graph)
+
+    assert cache.get("first") is not None
+    assert cache.get("second") is None
+    assert cache.get("third") is not None
+
+
+def test_missing_graphs_are_none(tmp_path):
+    assert GraphCache(tmp_path).get("missing") is None
+
+
+def test_corrupt_graphs_are_none(tmp_path):
+    cache = GraphCache(tmp_path)
+    cache.put("truncated", nx.path_graph(100))
+    path = tmp_path / "truncated.npz"
+    path.write_bytes(path.read_bytes()[:100])
+    (tmp_path / "empty.npz").write_bytes(b"")
+
+    assert cache.get("truncated") is None
+    assert cache.get("empty") is None
+
+
+def test_circuits_are_encoded_once(tmp_path, monkeypatch):
+    encoded_circuits = []
+    encode_circuit = julia_utils.encode_circuit
+
+    def _counting_encode_circuit(circuit):
+        encoded_circuit = encode_circuit(circuit)
+        if encoded_circuit is not circuit:
+            encoded_circuits.append(encoded_circuit)
+        return encoded_circuit
+
+    monkeypatch.setattr(julia_utils, "encode_circuit", _counting_encode_circuit)
+    monkeypatch.setattr(graph_cache, "encode_circuit", _counting_encode_circuit)
+    cached_method = GraphCache(tmp_path).cached(get_csr_graph_from_graph_sim_mini)
+
+    graph = cached_method(Circuit([H(0), T(0), CNOT(0, 1), T(1)]))
+
+    assert len(encoded_circuits) == 1
+    assert graph.n_nodes > 0
@@ -5,7 +5,7 @@ import numpy as np
 import pytest
 import stim
 from orquestra.integrations.qiskit.conversions import import_from_qiskit
-from orquestra.quantum.circuits import CNOT, CZ, Circuit, H, I, S
+from orquestra.quantum.circuits import CNOT, CZ, Circuit, H, I, S, T
 from qiskit import QuantumCircuit
 
 from benchq.compilation import jl, pyliqtr_transpile_to_clifford_t
@@ -90,6 +90,134 @@ def test_stabilizer_states_are_the_same_for_larger_circuits(filename):
         assert tableaus_correspond_to_same_state(graph_tableau, target_tableau)
 
 
+@pytest.mark.parametrize(
+    "circuit",
+    [
+        Circuit([H(0), CNOT(0, 1)]),
+        Circuit([H(0), T(0), CNOT(0, 1), T(1)]),
+        Circuit([H(0), S(0), T(0), H(0), T.dagger(0), CNOT(0, 1), H(2), CZ(1, 2)]),
+    ],
+)
+def test_streaming_mode_gives_the_same_graph_state(circuit):
+    loc, adj = jl.run_graph_sim_mini(circuit)
+    streamed_loc, streamed_adj = jl.run_graph_sim_mini(circuit, True)
+
+    assert list(loc) == list(streamed_loc)
+    assert [set(neighbors) for neighbors in adj] == [
+        set(neighbors) for neighbors in streamed_adj
+    ]
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [
+        "adaptive",
+        # every vertex with a neighbor is stored as a bit row
+        jl.seval("n -> AdaptiveAdjacency(n; min_dense_degree=0)"),
+    ],
+)
+@pytest.mark.parametrize(
+    "circuit",
+    [
+        Circuit([H(0), CNOT(0, 1)]),
+        Circuit([H(0), T(0), CNOT(0, 1), T(1)]),
+        Circuit([H(0), S(0), T(0), H(0), T.dagger(0), CNOT(0, 1), H(2), CZ(1, 2)]),
+        Circuit(
+            [H(i) for i in range(6)] + [CZ(i, j) for i in range(6) for j in range(i)]
+        ),
+    ],
+)
+def test_adaptive_adjacency_gives_the_same_stabilizer_state(backend, circuit):
+    icm_circuit = get_icm(circuit)
+    target_tableau = get_target_tableau(icm_circuit)
+    loc, adj = jl.run_graph_sim_mini(icm_circuit, False, backend)
+    vertices = list(zip(loc, adj))
+    graph_tableau = get_stabilizer_tableau_from_vertices(vertices)
+
+    assert tableaus_correspond_to_same_state(graph_tableau, target_tableau)
+
+
+def test_backends_give_the_same_graph_state():
+    circuit = Circuit(
+        [H(i) for i in range(8)]
+        + [CNOT(i, (3 * i + 1) % 8) for i in range(8)]
+        + [S(i) for i in range(0, 8, 3)]
+        + [CZ(i, (5 * i + 2) % 8) for i in range(8) if (5 * i + 2) % 8 != i]
+    )
+
+    loc, adj = jl.run_graph_sim_mini(circuit, False, "set")
+    adaptive_loc, adaptive_adj = jl.run_graph_sim_mini(circuit, False, "adaptive")
+
+    assert list(loc) == list(adaptive_loc)
+    assert [set(neighbors) for neighbors in adj] == [
+        set(neighbors) for neighbors in adaptive_adj
+    ]
+
+
+@pytest.mark.parametrize("min_dense_degree", [0, 3, 64])
+def test_adaptive_adjacency_matches_set_adjacency(min_dense_degree):
+    rng = np.random.default_rng(42)
+    n_vertices = 40
+    set_adj = jl.empty_adjacency("set", n_vertices)
+    adaptive_adj = jl.AdaptiveAdjacency(n_vertices, min_dense_degree=min_dense_degree)
+
+    for _ in range(500):
+        action = rng.random()
+        if action < 0.05:
+            jl.push_vertex_b(set_adj)
+            jl.push_vertex_b(adaptive_adj)
+            n_vertices += 1
+        elif action < 0.2:
+            v = int(rng.integers(1, n_vertices + 1))
+            jl.complement_neighborhood_b(set_adj, v)
+            jl.complement_neighborhood_b(adaptive_adj, v)
+        else:
+            v, u = rng.choice(np.arange(1, n_vertices + 1), 2, replace=False)
+            jl.toggle_edge(set_adj, int(v), int(u))
+            jl.toggle_edge(adaptive_adj, int(v), int(u))
+
+    assert jl.n_vertices(adaptive_adj) == n_vertices
+    for v in range(1, n_vertices + 1):
+        assert jl.vertex_degree(adaptive_adj, v) == jl.vertex_degree(set_adj, v)
+        assert sorted(jl.vertex_neighbors(adaptive_adj, v)) == sorted(
+            jl.vertex_neighbors(set_adj, v)
+        )
+
+
+def test_icm_compilation_of_encoded_circuit_matches_reference():
+    circuit = Circuit([H(0), T(0), CNOT(0, 1), T(1), S(1), CZ(0, 1)])
+    expected_icm_circuit = get_icm(circuit)
+
+    icm_circuit, icm_n_qubits = jl.get_icm(jl.encode_circuit(circuit), circuit.n_qubits)
+
+    assert icm_n_qubits == expected_icm_circuit.n_qubits
+    assert list(icm_circuit.qubit_1) == [
+        op.qubit_indices[0] for op in expected_icm_circuit.operations
+    ]
+    assert list(icm_circuit.qubit_2) == [
+        op.qubit_indices[1] if len(op.qubit_indices) > 1 else -1
+        for op in expected_icm_circuit.operations
+    ]
+
+
+def test_flat_lookup_tables_match_nested_tables():
+    assert jl.seval(
+        "all(lco_product(a, b) == multiply_lco[a, b] for a in 1:24, b in 1:24)"
+    )
+    assert jl.seval(
+        "all(cz_table_entry(connected, a, b) == cz_table[connected+1][a, b] "
+        "for connected in (false, true), a in 1:24, b in 1:24)"
+    )
+
+
+@pytest.mark.parametrize("gate", [T(0), T.dagger(0)])
+def test_non_clifford_gates_are_rejected_by_the_simulator(gate):
+    encoded_circuit = jl.encode_circuit(Circuit([H(0), gate]))
+
+    with pytest.raises(Exception, match="Unknown gate"):
+        jl.get_graph_state_data(encoded_circuit, 1)
+
+
 # Everything below here is testing utils
 
 
@@ -113,7 +241,7 @@ def get_icm(circuit: Circuit, gates_to_decompose=["T", "T_Dagger"]) -> Circuit:
         ]
 
         if op.gate.name in gates_to_decompose:
-            for (original_qubit, compiled_qubit) in zip(
+            for original_qubit, compiled_qubit in zip(
                 op.qubit_indices, compiled_qubits
             ):
                 icm_circuit_n_qubits += 1
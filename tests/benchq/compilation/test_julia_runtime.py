@@ -0,0 +1,27 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+import subprocess
+import sys
+
+from benchq.compilation import jl, warmup
+from benchq.compilation.julia_runtime import is_julia_started
+
+
+def test_importing_benchq_does_not_start_julia():
+    # checked in a new process, since julia may already run in this one
+    script = (
+        "import sys\n"
+        "import benchq.compilation\n"
+        "import benchq.resource_estimation.graph\n"
+        "assert 'juliacall' not in sys.modules\n"
+        "assert not benchq.compilation.julia_runtime.is_julia_started()\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+
+def test_warmup_starts_julia_with_the_benchq_sources():
+    warmup()
+
+    assert is_julia_started()
+    assert jl.seval("isdefined(Main, :run_graph_sim_mini_encoded)")
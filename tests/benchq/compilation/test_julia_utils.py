@@ -0,0 +1,164 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+import numpy as np
+import pytest
+from orquestra.quantum.circuits import CNOT, CZ, SWAP, Circuit, H, S, T
+
+from benchq.compilation import (
+    encode_circuit,
+    get_algorithmic_graph_from_graph_sim_mini,
+    get_csr_graph_from_graph_sim_mini,
+    get_graph_statistics_from_graph_sim_mini,
+    get_graph_trace_from_graph_sim_mini,
+    jl,
+)
+from benchq.data_structures import QuantumProgram, SubroutineSequence
+
+
+def test_encode_circuit_packs_gates_into_arrays():
+    circuit = Circuit([H(0), CNOT(0, 2), S.dagger(1), T(2), CZ(2, 1)])
+
+    encoded_circuit = encode_circuit(circuit)
+
+    assert encoded_circuit.n_qubits == 3
+    assert encoded_circuit.opcodes.dtype == np.uint8
+    assert encoded_circuit.qubit_1.dtype == np.int32
+    assert encoded_circuit.qubit_2.dtype == np.int32
+    np.testing.assert_array_equal(encoded_circuit.opcodes, [5, 9, 7, 10, 8])
+    np.testing.assert_array_equal(encoded_circuit.qubit_1, [0, 0, 1, 2, 2])
+    np.testing.assert_array_equal(encoded_circuit.qubit_2, [-1, 2, -1, -1, 1])
+
+
+def test_encoded_full_circuit_view_matches_encoded_full_circuit():
+    program = QuantumProgram(
+        [
+            Circuit([H(0), T(0), CNOT(0, 1)]),
+            Circuit([S(1), CZ(0, 1)]),
+            Circuit([H(1), T(1), H(1)]),
+        ],
+        3,
+        lambda steps: SubroutineSequence.from_list([0])
+        + SubroutineSequence.repeat([1, 2], steps)
+        + SubroutineSequence.from_list([1, 0]),
+    )
+
+    encoded_view = encode_circuit(program.full_circuit_view)
+    encoded_circuit = encode_circuit(program.full_circuit)
+
+    assert len(program.full_circuit_view) == len(program.full_circuit.operations)
+    assert encoded_view.n_qubits == encoded_circuit.n_qubits
+    for column in ["opcodes", "qubit_1", "qubit_2"]:
+        assert (
+            getattr(encoded_view, column).dtype
+            == getattr(encoded_circuit, column).dtype
+        )
+        np.testing.assert_array_equal(
+            getattr(encoded_view, column), getattr(encoded_circuit, column)
+        )
+
+
+def test_encode_circuit_raises_for_unknown_gates():
+    circuit = Circuit([H(0), SWAP(0, 1)])
+
+    with pytest.raises(ValueError):
+        encode_circuit(circuit)
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_encoded_circuit_gives_the_same_graph_state(streaming):
+    circuit = Circuit([H(0), T(0), CNOT(0, 1), S(1), T.dagger(1), H(2), CZ(1, 2)])
+    encoded_circuit = encode_circuit(circuit)
+
+    loc, adj = jl.run_graph_sim_mini(circuit)
+    encoded_loc, indptr, indices = jl.run_graph_sim_mini_encoded(
+        encoded_circuit.n_qubits,
+        encoded_circuit.opcodes,
+        encoded_circuit.qubit_1,
+        encoded_circuit.qubit_2,
+        streaming,
+    )
+
+    assert list(loc) == list(encoded_loc)
+    assert [sorted(neighbors) for neighbors in adj] == [
+        list(indices[indptr[i] : indptr[i + 1]]) for i in range(len(adj))
+    ]
+
+
+def test_csr_graph_has_the_same_edges_as_networkx_graph():
+    circuit = Circuit([H(0), T(0), CNOT(0, 1), CNOT(1, 2), T(2), H(3), CZ(2, 3)])
+
+    csr_graph = get_csr_graph_from_graph_sim_mini(circuit)
+    graph = get_algorithmic_graph_from_graph_sim_mini(circuit)
+    _, adj = jl.run_graph_sim_mini(circuit)
+
+    assert len(csr_graph) == len(graph) == len(adj)
+    assert csr_graph.n_edges == graph.number_of_edges()
+    for node, neighbors in enumerate(adj):
+        assert set(csr_graph.neighbors(node)) == set(neighbors)
+        assert set(graph.adj[node]) == set(neighbors)
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_graph_statistics_match_the_graph(streaming):
+    circuit = Circuit([H(0), T(0), CNOT(0, 1), CNOT(1, 2), T(2), H(3), CZ(2, 3), H(5)])
+
+    statistics = get_algorithmic_graph_from_graph_sim_mini(
+        circuit, streaming=streaming, stats_only=True
+    )
+    expected_statistics = get_csr_graph_from_graph_sim_mini(circuit).statistics()
+
+    assert statistics.n_nodes == expected_statistics.n_nodes
+    assert statistics.n_edges == expected_statistics.n_edges
+    assert statistics.max_degree == expected_statistics.max_degree
+    assert statistics.n_isolated_nodes == expected_statistics.n_isolated_nodes
+    np.testing.assert_array_equal(
+        statistics.degree_histogram, expected_statistics.degree_histogram
+    )
+
+
+@pytest.mark.parametrize("boundaries", [[0, 2], [3, 1], [2, 4]])
+def test_graph_trace_rejects_boundaries_which_would_be_skipped(boundaries):
+    circuit = Circuit([H(0), CNOT(0, 1), T(1)])
+
+    with pytest.raises(ValueError):
+        get_graph_trace_from_graph_sim_mini(circuit, boundaries)
+
+
+@pytest.mark.parametrize(
+    "get_graph",
+    [
+        get_csr_graph_from_graph_sim_mini,
+        get_graph_statistics_from_graph_sim_mini,
+        lambda circuit, adjacency_backend: get_graph_trace_from_graph_sim_mini(
+            circuit, [1], adjacency_backend=adjacency_backend
+        ),
+    ],
+)
+def test_unknown_adjacency_backends_raise_value_error(get_graph):
+    circuit = Circuit([H(0), CNOT(0, 1)])
+
+    with pytest.raises(ValueError):
+        get_graph(circuit, adjacency_backend="unknown")
+
+
+@pytest.mark.parametrize("stats_only", [False, True])
+def test_graph_trace_matches_simulations_of_prefixes(stats_only):
+    circuit = Circuit([H(0), T(0), CNOT(0, 1), CNOT(1, 2), T(2), H(3), CZ(2, 3), T(3)])
+    boundaries = [1, 3, 3, 6, 8]
+
+    trace = get_graph_trace_from_graph_sim_mini(
+        circuit, boundaries, stats_only=stats_only
+    )
+
+    assert len(trace) == len(boundaries)
+    for graph, boundary in zip(trace, boundaries):
+        prefix = Circuit(circuit.operations[:boundary], n_qubits=circuit.n_qubits)
+        expected_graph = get_csr_graph_from_graph_sim_mini(prefix)
+        if stats_only:
+            assert graph.n_nodes == expected_graph.n_nodes
+            assert graph.n_edges == expected_graph.n_edges
+            assert graph.max_degree == expected_graph.statistics().max_degree
+        else:
+            np.testing.assert_array_equal(graph.indptr, expected_graph.indptr)
+            np.testing.assert_array_equal(graph.indices, expected_graph.indices)
@@ -0,0 +1,137 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+import threading
+import time
+
+import numpy as np
+import pytest
+from orquestra.quantum.circuits import CNOT, Circuit, H, T
+
+from benchq.compilation import (
+    SimulationCancelledError,
+    SimulationCheckpoint,
+    SimulationControl,
+    get_csr_graph_from_graph_sim_mini,
+    get_graph_statistics_from_graph_sim_mini,
+)
+
+N_QUBITS = 20
+CIRCUIT = Circuit(
+    [H(0)]
+    + [CNOT(i, (i + 1) % N_QUBITS) for i in range(N_QUBITS)] * 10
+    + [T(i) for i in range(N_QUBITS)]
+)
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_progress_is_reported_until_the_end_of_the_simulation(streaming):
+    reports = []
+    control = SimulationControl(progress_callback=reports.append, report_every_ops=10)
+
+    graph = get_csr_graph_from_graph_sim_mini(CIRCUIT, streaming, control=control)
+
+    n_ops_done = [report.n_ops_done for report in reports]
+    assert len(reports) > 2
+    assert n_ops_done == sorted(n_ops_done)
+    assert all(b - a >= 10 for a, b in zip(n_ops_done[:-2], n_ops_done[1:-1]))
+    assert reports[-1].n_ops_done == reports[-1].n_ops
+    assert reports[-1].fraction_done == 1
+    assert reports[-1].remaining_time == 0
+    assert all(report.ops_per_second >= 0 for report in reports)
+    unmonitored_graph = get_csr_graph_from_graph_sim_mini(CIRCUIT, streaming)
+    np.testing.assert_array_equal(graph.indptr, unmonitored_graph.indptr)
+    np.testing.assert_array_equal(graph.indices, unmonitored_graph.indices)
+
+
+def test_simulation_is_cancelled_once_the_event_is_set():
+    cancel_event = threading.Event()
+
+    def cancel_after_first_report(progress):
+        cancel_event.set()
+
+    control = SimulationControl(
+        progress_callback=cancel_after_first_report,
+        report_every_ops=10,
+        cancel_event=cancel_event,
+    )
+
+    with pytest.raises(SimulationCancelledError) as error_info:
+        get_graph_statistics_from_graph_sim_mini(CIRCUIT, control=control)
+
+    assert error_info.value.reason == "cancelled"
+    assert 0 < error_info.value.n_ops_done < error_info.value.n_ops
+
+
+@pytest.mark.parametrize(
+    "control",
+    [
+        SimulationControl(deadline=time.time() - 1),
+        SimulationControl(time_limit=-1),
+    ],
+)
+def test_simulation_is_cancelled_after_its_deadline(control):
+    with pytest.raises(SimulationCancelledError) as error_info:
+        get_graph_statistics_from_graph_sim_mini(CIRCUIT, control=control)
+
+    assert error_info.value.reason == "deadline"
+    assert error_info.value.n_ops_done == 0
+
+
+def _cancel_after_n_ops(n_ops):
+    cancel_event = threading.Event()
+
+    def cancel_when_reached(progress):
+        if progress.n_ops_done >= n_ops:
+            cancel_event.set()
+
+    return SimulationControl(
+        progress_callback=cancel_when_reached,
+        report_every_ops=1,
+        cancel_event=cancel_event,
+    )
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_cancelled_simulation_resumes_from_its_checkpoint(tmp_path, streaming):
+    checkpoint = SimulationCheckpoint(tmp_path / "checkpoint", every_ops=10)
+    expected_graph = get_csr_graph_from_graph_sim_mini(CIRCUIT, streaming)
+
+    with pytest.raises(SimulationCancelledError):
+        get_csr_graph_from_graph_sim_mini(
+            CIRCUIT, streaming, control=_cancel_after_n_ops(55), checkpoint=checkpoint
+        )
+    assert checkpoint.path.exists()
+
+    reports = []
+    graph = get_csr_graph_from_graph_sim_mini(
+        CIRCUIT,
+        streaming,
+        control=SimulationControl(progress_callback=reports.append, report_every_ops=1),
+        checkpoint=checkpoint,
+    )
+
+    # the second run started from the last checkpoint before the cancellation
+    assert reports[0].n_ops_done == 51
+    np.testing.assert_array_equal(graph.indptr, expected_graph.indptr)
+    np.testing.assert_array_equal(graph.indices, expected_graph.indices)
+    assert not checkpoint.path.exists()
+
+
+def test_checkpoint_of_another_circuit_is_ignored(tmp_path):
+    checkpoint = SimulationCheckpoint(tmp_path / "checkpoint", every_ops=10)
+    other_circuit = Circuit([H(0), CNOT(0, 1), CNOT(1, 2), T(2)])
+    with pytest.raises(SimulationCancelledError):
+        get_graph_statistics_from_graph_sim_mini(
+            CIRCUIT, control=_cancel_after_n_ops(55), checkpoint=checkpoint
+        )
+
+    statistics = get_graph_statistics_from_graph_sim_mini(
+        other_circuit, checkpoint=checkpoint
+    )
+
+    expected_statistics = get_graph_statistics_from_graph_sim_mini(other_circuit)
+    assert statistics.n_nodes == expected_statistics.n_nodes
+    np.testing.assert_array_equal(
+        statistics.degree_histogram, expected_statistics.degree_histogram
+    )
@@ -0,0 +1,61 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+import os
+import sys
+
+import pytest
+
+from benchq.compilation.sysimage import (
+    JULIACALL_SYSIMAGE_ENV,
+    SYSIMAGE_ENV,
+    configure_sysimage,
+    get_sources_version,
+)
+
+
+@pytest.fixture
+def sysimage_path(tmp_path, monkeypatch):
+    path = tmp_path / "benchq_sysimage.so"
+    path.write_bytes(b"")
+    monkeypatch.setenv(SYSIMAGE_ENV, os.fspath(path))
+    # configure_sysimage sets it directly, so it is set here first for monkeypatch
+    # to restore it after the test
+    monkeypatch.setenv(JULIACALL_SYSIMAGE_ENV, "")
+    monkeypatch.delenv(JULIACALL_SYSIMAGE_ENV)
+    # pretend julia wasn't started yet
+    monkeypatch.delitem(sys.modules, "juliacall", raising=False)
+    return path
+
+
+def test_sysimage_of_the_installed_sources_is_picked_up(sysimage_path):
+    (sysimage_path.parent / "benchq_sysimage.so.version").write_text(
+        get_sources_version()
+    )
+
+    assert configure_sysimage() == sysimage_path
+    assert os.environ[JULIACALL_SYSIMAGE_ENV] == os.fspath(sysimage_path)
+
+
+def test_sysimage_of_other_sources_is_ignored(sysimage_path):
+    (sysimage_path.parent / "benchq_sysimage.so.version").write_text("outdated")
+
+    with pytest.warns(UserWarning, match="Ignoring the sysimage"):
+        assert configure_sysimage() is None
+    assert JULIACALL_SYSIMAGE_ENV not in os.environ
+
+
+def test_sysimage_is_not_picked_up_once_julia_is_running(sysimage_path, monkeypatch):
+    (sysimage_path.parent / "benchq_sysimage.so.version").write_text(
+        get_sources_version()
+    )
+    monkeypatch.setitem(sys.modules, "juliacall", object())
+
+    assert configure_sysimage() is None
+    assert JULIACALL_SYSIMAGE_ENV not in os.environ
+
+
+def test_explicitly_chosen_sysimage_is_kept(sysimage_path, monkeypatch):
+    monkeypatch.setenv(JULIACALL_SYSIMAGE_ENV, "/some/other/sysimage.so")
+
+    assert os.fspath(configure_sysimage()) == "/some/other/sysimage.so"
@@ -0,0 +1,51 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+import networkx as nx
+import numpy as np
+import pytest
+
+from benchq.data_structures import CSRGraph
+
+
+@pytest.mark.parametrize(
+    "graph",
+    [
+        nx.empty_graph(3),
+        nx.path_graph(5),
+        nx.star_graph(6),
+        nx.complete_graph(7),
+        nx.erdos_renyi_graph(30, 0.2, seed=42),
+    ],
+)
+def test_csr_graph_round_trips_through_networkx(graph):
+    csr_graph = CSRGraph.from_networkx(graph)
+    new_graph = csr_graph.to_networkx()
+
+    assert len(csr_graph) == graph.number_of_nodes()
+    assert csr_graph.n_edges == graph.number_of_edges()
+    assert nx.utils.graphs_equal(graph, new_graph)
+
+
+def test_csr_graph_degrees_and_neighbors():
+    csr_graph = CSRGraph(
+        indptr=np.array([0, 2, 3, 4, 4]), indices=np.array([1, 2, 0, 0])
+    )
+
+    np.testing.assert_array_equal(csr_graph.degrees(), [2, 1, 1, 0])
+    np.testing.assert_array_equal(csr_graph.neighbors(0), [1, 2])
+    np.testing.assert_array_equal(csr_graph.neighbors(3), [])
+
+
+def test_csr_graph_statistics():
+    graph = nx.star_graph(4)
+    graph.add_nodes_from([5, 6])
+    graph.add_edge(1, 2)
+
+    statistics = CSRGraph.from_networkx(graph).statistics()
+
+    assert statistics.n_nodes == 7
+    assert statistics.n_edges == 5
+    assert statistics.max_degree == 4
+    assert statistics.n_isolated_nodes == 2
+    np.testing.assert_array_equal(statistics.degree_histogram, [2, 2, 2, 0, 1])
@@ -0,0 +1,22 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+from orquestra.quantum.circuits import CNOT, Circuit, H
+
+from benchq.data_structures import QuantumProgram, SubroutineSequencePattern
+
+
+def test_with_steps_shares_subroutines():
+    program = QuantumProgram(
+        [Circuit([H(0), CNOT(0, 1)]), Circuit([CNOT(1, 0)])],
+        10,
+        SubroutineSequencePattern(prefix=[0], body=[1]),
+    )
+
+    small_program = program.with_steps(2)
+
+    assert small_program.steps == 2
+    assert program.steps == 10
+    assert small_program.subroutines is program.subroutines
+    assert small_program.subroutine_sequence == [0, 1, 1]
+    assert program.multiplicities == [1, 10]
@@ -0,0 +1,121 @@
+################################################################################
+# © Copyright 2023 Zapata Computing Inc.
+################################################################################
+import pickle
+
+import pytest
+from orquestra.quantum.circuits import CNOT, Circuit, H
+
+from benchq.data_structures import (
+    QuantumProgram,
+    SubroutineSequence,
+    SubroutineSequencePattern,
+    get_program_from_circuit,
+)
+
+
+def _qsp_sequence(n_block_encodings):
+    return (
+        SubroutineSequence.from_list([0])
+        + SubroutineSequence.repeat([1, 2], n_block_encodings)
+        + SubroutineSequence.from_list([1, 0])
+    )
+
+
+@pytest.mark.parametrize("n_block_encodings", [0, 1, 5])
+def test_nested_sequence_matches_flat_list(n_block_encodings):
+    flat_sequence = [0] + [1, 2] * n_block_encodings + [1, 0]
+    sequence = _qsp_sequence(n_block_encodings)
+
+    assert len(sequence) == len(flat_sequence)
+    assert list(sequence) == flat_sequence
+    assert sequence == flat_sequence
+    assert sequence.multiplicities(3) == [flat_sequence.count(i) for i in range(3)]
+
+
+def test_prefix_multiplicities_match_flat_list():
+    flat_sequence = [0] + [1, 2] * 4 + [1, 0]
+    sequence = _qsp_sequence(4)
+
+    for n_calls in range(len(flat_sequence) + 1):
+        assert sequence.prefix_multiplicities(n_calls) == [
+            flat_sequence[:n_calls].count(i) for i in range(3)
+        ]
+
+
+def test_multiplicities_have_the_same_length_as_prefix_multiplicities():
+    sequence = _qsp_sequence(0)
+
+    assert sequence.multiplicities() == [2, 1]
+    assert sequence.prefix_multiplicities(len(sequence)) == [2, 1]
+    assert sequence.multiplicities(4) == [2, 1, 0, 0]
+    assert sequence.prefix_multiplicities(2, 4) == [1, 1, 0, 0]
+    with pytest.raises(ValueError):
+        sequence.multiplicities(1)
+
+
+def test_lists_are_run_length_encoded():
+    sequence = SubroutineSequence.from_list([0, 0, 0, 1, 1, 0])
+
+    assert sequence.blocks == [(0, 3), (1, 2), (0, 1)]
+
+
+def test_length_does_not_depend_on_number_of_repetitions():
+    sequence = SubroutineSequence.repeat([0, 1], 10**12)
+
+    assert len(sequence) == 2 * 10**12
+    assert sequence.multiplicities() == [10**12, 10**12]
+    assert len(sequence.blocks) == 1
+
+
+def test_quantum_program_computes_sequence_once_per_number_of_steps():
+    calls = []
+
+    def calculate_subroutine_sequence(steps):
+        calls.append(steps)
+        return [0] * steps
+
+    program = QuantumProgram(
+        [Circuit([H(0), CNOT(0, 1)])], 3, calculate_subroutine_sequence
+    )
+
+    assert program.multiplicities == [3]
+    assert len(program.subroutine_sequence) == 3
+    program.steps = 5
+    assert program.multiplicities == [5]
+    assert calls == [3, 5]
+
+
+def test_program_multiplicities_line_up_with_subroutines():
+    program = QuantumProgram(
+        [Circuit([H(0)]), Circuit([CNOT(0, 1)]), Circuit([H(1)])],
+        0,
+        SubroutineSequencePattern(prefix=[0], body=[1, 2], suffix=[1, 0]),
+    )
+
+    assert program.multiplicities == [2, 1, 0]
+
+
+@pytest.mark.parametrize("steps", [0, 1, 4])
+def test_pattern_gives_prefix_repeated_body_and_suffix(steps):
+    pattern = SubroutineSequencePattern(prefix=[0], body=[1, 2], suffix=[1, 0])
+
+    assert pattern(steps) == [0] + [1, 2] * steps + [1, 0]
+
+
+def test_programs_with_patterns_can_be_pickled():
+    program = QuantumProgram(
+        [Circuit([H(0), CNOT(0, 1)]), Circuit([CNOT(1, 0)])],
+        7,
+        SubroutineSequencePattern(prefix=[0], body=[1]),
+    )
+
+    for original_program in [program, get_program_from_circuit(Circuit([H(0)]))]:
+        unpickled_program = pickle.loads(pickle.dumps(original_program))
+
+        assert unpickled_program.steps == original_program.steps
+        assert (
+            unpickled_program.subroutine_sequence
+            == original_program.subroutine_sequence
+        )
+        assert unpickled_program.full_circuit == original_program.full_circuit
@@ -1,18 +1,29 @@
+import pickle
+
+import networkx as nx
 import numpy as np
 import pytest
 from orquestra.quantum.circuits import CNOT, RZ, Circuit, H
 
-from benchq.data_structures import ErrorBudget, QuantumProgram
+from benchq.data_structures import (
+    ErrorBudget,
+    QuantumProgram,
+    SubroutineSequencePattern,
+)
 from benchq.data_structures.hardware_architecture_models import BasicArchitectureModel
 from benchq.resource_estimation.graph import (
     ExtrapolationResourceEstimator,
     GraphResourceEstimator,
     create_big_graph_from_subcircuits,
+    create_graph_trace_from_subcircuits,
     run_extrapolation_pipeline,
+    run_parallel_extrapolation_pipeline,
     run_resource_estimation_pipeline,
+    run_traced_extrapolation_pipeline,
     simplify_rotations,
     synthesize_clifford_t,
 )
+from benchq.resource_estimation.graph.structs import GraphTrace
 from benchq.vizualization_tools import plot_extrapolations
 
 
@@ -250,3 +261,137 @@ def test_higher_error_budget_does_not_require_more_resources(
         high_error_resource_estimates.total_time
         <= low_error_resource_estimates.total_time
     )
+
+
+@pytest.mark.parametrize("steps_to_trace", [[1, 2, 3, 4], [4, 2, 1, 3, 2]])
+def test_traced_extrapolation_matches_extrapolation_from_separate_runs(
+    steps_to_trace,
+):
+    architecture_model = BasicArchitectureModel(
+        physical_gate_error_rate=1e-3,
+        physical_gate_time_in_seconds=1e-6,
+    )
+    error_budget = ErrorBudget(
+        ultimate_failure_tolerance=1e-2, circuit_generation_weight=0
+    )
+    steps_to_extrapolate_from = [1, 2, 3, 4]
+    estimator = ExtrapolationResourceEstimator(
+        architecture_model, steps_to_extrapolate_from
+    )
+
+    circuit = Circuit([H(0), RZ(np.pi / 4)(0), CNOT(0, 1)])
+    quantum_program = QuantumProgram(
+        subroutines=[circuit],
+        steps=100,
+        calculate_subroutine_sequence=lambda x: [0] * x,
+    )
+
+    resource_estimates = run_extrapolation_pipeline(
+        quantum_program,
+        error_budget,
+        estimator=estimator,
+        transformers=_get_transformers(True, error_budget),
+    )
+    traced_resource_estimates = run_traced_extrapolation_pipeline(
+        quantum_program,
+        error_budget,
+        estimator=estimator,
+        transformers=[
+            simplify_rotations,
+            create_graph_trace_from_subcircuits(
+                delayed_gate_synthesis=True,
+                steps_to_trace=steps_to_trace,
+            ),
+        ],
+    )
+
+    for data, traced_data in zip(
+        resource_estimates.data_used_to_extrapolate,
+        traced_resource_estimates.data_used_to_extrapolate,
+    ):
+        assert data.n_nodes == traced_data.n_nodes
+        assert data.n_logical_qubits == traced_data.n_logical_qubits
+        assert data.n_measurement_steps == traced_data.n_measurement_steps
+    assert resource_estimates.code_distance == traced_resource_estimates.code_distance
+    assert resource_estimates.n_nodes == traced_resource_estimates.n_nodes
+
+
+def test_trace_with_missing_graphs_is_rejected():
+    estimator = ExtrapolationResourceEstimator(
+        BasicArchitectureModel(), steps_to_extrapolate_from=[1, 2, 3]
+    )
+    quantum_program = QuantumProgram(
+        subroutines=[Circuit([H(0), CNOT(0, 1)])],
+        steps=3,
+        calculate_subroutine_sequence=SubroutineSequencePattern(body=[0]),
+    )
+    trace = GraphTrace(
+        quantum_program,
+        [1, 2, 3],
+        [nx.path_graph(2), nx.path_graph(3)],
+        delayed_gate_synthesis=False,
+    )
+
+    with pytest.raises(ValueError):
+        estimator.estimate_from_trace(trace, ErrorBudget(1e-2), 10)
+
+
+def test_graph_trace_rejects_sequences_which_are_not_prefixes():
+    quantum_program = QuantumProgram(
+        subroutines=[Circuit([H(0)]), Circuit([CNOT(0, 1)]), Circuit([H(1)])],
+        steps=4,
+        calculate_subroutine_sequence=SubroutineSequencePattern(
+            prefix=[0], body=[1, 2], suffix=[1, 0]
+        ),
+    )
+    transformer = create_graph_trace_from_subcircuits(
+        delayed_gate_synthesis=False, steps_to_trace=[1, 2, 4]
+    )
+
+    with pytest.raises(ValueError, match="isn't a prefix"):
+        transformer(quantum_program)
+
+
+def test_transformers_can_be_pickled(use_delayed_gate_synthesis):
+    error_budget = ErrorBudget(
+        ultimate_failure_tolerance=1e-2, circuit_generation_weight=0
+    )
+    transformers = _get_transformers(use_delayed_gate_synthesis, error_budget)
+
+    pickle.loads(pickle.dumps(transformers))
+
+
+def test_parallel_extrapolation_matches_serial_extrapolation():
+    architecture_model = BasicArchitectureModel(
+        physical_gate_error_rate=1e-3,
+        physical_gate_time_in_seconds=1e-6,
+    )
+    error_budget = ErrorBudget(
+        ultimate_failure_tolerance=1e-2, circuit_generation_weight=0
+    )
+    estimator = ExtrapolationResourceEstimator(architecture_model, [1, 2, 3])
+    transformers = _get_transformers(True, error_budget)
+    quantum_program = QuantumProgram(
+        [
+            Circuit([H(0), RZ(np.pi / 14)(0), CNOT(0, 1)]),
+            Circuit([H(0), H(1), RZ(np.pi / 14)(0)]),
+        ],
+        20,
+        SubroutineSequencePattern(prefix=[0], body=[1], suffix=[0]),
+    )
+
+    resource_estimates = run_extrapolation_pipeline(
+        quantum_program, error_budget, estimator, transformers
+    )
+    parallel_resource_estimates = run_parallel_extrapolation_pipeline(
+        quantum_program, error_budget, estimator, transformers, max_workers=2
+    )
+
+    for data, parallel_data in zip(
+        resource_estimates.data_used_to_extrapolate,
+        parallel_resource_estimates.data_used_to_extrapolate,
+    ):
+        assert data.n_nodes == parallel_data.n_nodes
+        assert data.n_measurement_steps == parallel_data.n_measurement_steps
+    assert resource_estimates.code_distance == parallel_resource_estimates.code_distance
+    assert resource_estimates.n_nodes == parallel_resource_estimates.n_nodes
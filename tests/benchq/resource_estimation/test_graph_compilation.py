@@ -15,6 +15,7 @@ from benchq.data_structures import (
 from benchq.resource_estimation.graph import (
     GraphResourceEstimator,
     create_big_graph_from_subcircuits,
+    create_graphs_for_subcircuits,
     run_resource_estimation_pipeline,
     simplify_rotations,
     synthesize_clifford_t,
@@ -251,3 +252,240 @@ def test_get_resource_estimations_for_program_accounts_for_decoder():
     assert gsc_resource_estimates_with_decoder.max_decodable_distance is not None
     assert gsc_resource_estimates_with_decoder.decoder_area is not None
     assert gsc_resource_estimates_with_decoder.decoder_power is not None
+
+
+def test_estimation_from_uncombined_subgraphs_composes_subroutines():
+    architecture_model = BasicArchitectureModel(
+        physical_gate_error_rate=1e-3,
+        physical_gate_time_in_seconds=1e-6,
+    )
+    error_budget = ErrorBudget(
+        ultimate_failure_tolerance=1e-2, circuit_generation_weight=0
+    )
+    subroutines = [
+        Circuit([H(0), RZ(np.pi / 14)(0), CNOT(0, 1)]),
+        Circuit([H(0), H(1), RZ(np.pi / 14)(0)]),
+    ]
+    quantum_program = QuantumProgram(subroutines, 3, lambda x: [0] + [1] * x + [0])
+    estimator = GraphResourceEstimator(architecture_model)
+
+    uncombined_resource_estimates = run_resource_estimation_pipeline(
+        quantum_program,
+        error_budget,
+        estimator=estimator,
+        transformers=[simplify_rotations, create_graphs_for_subcircuits(True)],
+    )
+    combined_resource_estimates = run_resource_estimation_pipeline(
+        quantum_program,
+        error_budget,
+        estimator=estimator,
+        transformers=[simplify_rotations, create_big_graph_from_subcircuits(True)],
+    )
+    subroutine_resource_estimates = [
+        run_resource_estimation_pipeline(
+            get_program_from_circuit(subroutine),
+            error_budget,
+            estimator=estimator,
+            transformers=[simplify_rotations, create_graphs_for_subcircuits(True)],
+        )
+        for subroutine in subroutines
+    ]
+
+    assert uncombined_resource_estimates.n_nodes == combined_resource_estimates.n_nodes
+    assert uncombined_resource_estimates.n_measurement_steps == (
+        2 * subroutine_resource_estimates[0].n_measurement_steps
+        + 3 * subroutine_resource_estimates[1].n_measurement_steps
+    )
+    assert uncombined_resource_estimates.n_logical_qubits == max(
+        estimates.n_logical_qubits for estimates in subroutine_resource_estimates
+    )
+    assert uncombined_resource_estimates.composed_from_subroutines
+    assert not uncombined_resource_estimates.n_measurement_steps_is_exact
+    assert not combined_resource_estimates.composed_from_subroutines
+
+
+def test_bounded_measurement_steps_contain_the_exact_ones(use_delayed_gate_synthesis):
+    architecture_model = BasicArchitectureModel(
+        physical_gate_error_rate=1e-3,
+        physical_gate_time_in_seconds=1e-6,
+    )
+    error_budget = ErrorBudget(
+        ultimate_failure_tolerance=1e-2, circuit_generation_weight=0
+    )
+    quantum_program = get_program_from_circuit(
+        Circuit([H(0)] + [CNOT(i, i + 1) for i in range(3)] + [T(1), T(2)])
+    )
+    transformers = _get_transformers(use_delayed_gate_synthesis, error_budget)
+
+    exact_resource_estimates = run_resource_estimation_pipeline(
+        quantum_program,
+        error_budget,
+        estimator=GraphResourceEstimator(architecture_model),
+        transformers=transformers,
+    )
+    bounded_resource_estimates = run_resource_estimation_pipeline(
+        quantum_program,
+        error_budget,
+        estimator=GraphResourceEstimator(
+            architecture_model, n_measurement_steps_method="bounds"
+        ),
+        transformers=transformers,
+    )
+
+    assert exact_resource_estimates.n_measurement_steps_is_exact
+    assert not bounded_resource_estimates.n_measurement_steps_is_exact
+    assert (
+        bounded_resource_estimates.n_measurement_steps_lower_bound
+        <= exact_resource_estimates.n_measurement_steps
+        <= bounded_resource_estimates.n_measurement_steps
+    )
+    assert (
+        bounded_resource_estimates.code_distance
+        == exact_resource_estimates.code_distance
+    )
+    assert bounded_resource_estimates.total_time >= exact_resource_estimates.total_time
+
+
+def test_unknown_measurement_steps_method_is_rejected():
+    architecture_model = BasicArchitectureModel(
+        physical_gate_error_rate=1e-3,
+        physical_gate_time_in_seconds=1e-6,
+    )
+    with pytest.raises(ValueError):
+        GraphResourceEstimator(architecture_model, n_measurement_steps_method="guess")
+
+
+@pytest.mark.parametrize("use_decoder", [True, False])
+def test_batch_estimation_matches_estimation_of_each_combination(
+    use_delayed_gate_synthesis, use_decoder
+):
+    file_path = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "..",
+        "data_structures",
+        "decoder_test_data.csv",
+    )
+    decoder = DecoderModel.from_csv(file_path) if use_decoder else None
+    # the largest error rate can't meet the smaller tolerances with any distance
+    physical_gate_error_rates = [1e-4, 1e-3, 1e-2]
+    physical_gate_times_in_seconds = [1e-6, 1e-7]
+    ultimate_failure_tolerances = [1e-1, 1e-2, 1e-4, 1e-20]
+    quantum_program = get_program_from_circuit(
+        Circuit([H(0)] + [CNOT(i, i + 1) for i in range(3)] + [T(1), T(2)])
+    )
+    error_budget = ErrorBudget(
+        ultimate_failure_tolerance=1e-2, circuit_generation_weight=0
+    )
+    problem = quantum_program
+    for transformer in _get_transformers(use_delayed_gate_synthesis, error_budget):
+        problem = transformer(problem)
+    estimator = GraphResourceEstimator(BasicArchitectureModel(), decoder)
+
+    table = estimator.estimate_batch(
+        problem,
+        np.array(ultimate_failure_tolerances)[None, None, :],
+        physical_gate_error_rates=np.array(physical_gate_error_rates)[:, None, None],
+        physical_gate_times_in_seconds=np.array(physical_gate_times_in_seconds)[
+            None, :, None
+        ],
+        circuit_generation_weights=0,
+    )
+
+    assert len(table) == 24
+    assert table.code_distance_saturated.any()
+    assert not table.code_distance_saturated.all()
+    row = 0
+    for error_rate in physical_gate_error_rates:
+        for gate_time in physical_gate_times_in_seconds:
+            for failure_tolerance in ultimate_failure_tolerances:
+                resource_info = GraphResourceEstimator(
+                    BasicArchitectureModel(error_rate, gate_time), decoder
+                ).estimate(
+                    problem,
+                    ErrorBudget(failure_tolerance, circuit_generation_weight=0),
+                )
+                assert table.physical_gate_error_rate[row] == error_rate
+                assert table.physical_gate_time_in_seconds[row] == gate_time
+                assert table.ultimate_failure_tolerance[row] == failure_tolerance
+                assert table.code_distance[row] == resource_info.code_distance
+                assert (
+                    table.code_distance_saturated[row]
+                    == resource_info.code_distance_saturated
+                )
+                for column in [
+                    "logical_error_rate",
+                    "synthesis_multiplier",
+                    "n_physical_qubits",
+                    "total_time",
+                    "decoder_power",
+                    "decoder_area",
+                    "max_decodable_distance",
+                ]:
+                    if getattr(resource_info, column) is None:
+                        assert getattr(table, column) is None
+                    else:
+                        assert getattr(table, column)[row] == pytest.approx(
+                            getattr(resource_info, column)
+                        )
+                row += 1
+    assert table.n_measurement_steps == resource_info.n_measurement_steps
+    assert table.n_logical_qubits == resource_info.n_logical_qubits
+
+
+@pytest.mark.parametrize("physical_gate_error_rate", [1e-5, 1e-4, 1e-3])
+@pytest.mark.parametrize("ec_failure_tolerance", [1e-1, 1e-6, 1e-20])
+def test_code_distance_is_the_smallest_one_meeting_the_error_budget(
+    use_delayed_gate_synthesis, physical_gate_error_rate, ec_failure_tolerance
+):
+    estimator = GraphResourceEstimator(
+        BasicArchitectureModel(physical_gate_error_rate=physical_gate_error_rate)
+    )
+    error_budget = ErrorBudget(
+        ultimate_failure_tolerance=ec_failure_tolerance,
+        circuit_generation_weight=0,
+        synthesis_weight=0,
+    )
+    ec_error_rate = (
+        estimator._ec_error_rate_delayed_gate_synthesis
+        if use_delayed_gate_synthesis
+        else estimator._ec_error_rate
+    )
+    expected_distance = next(
+        distance
+        for distance in range(4, estimator.max_code_distance + 1)
+        if ec_error_rate(distance, 100, 20) < error_budget.ec_failure_tolerance
+    )
+
+    code_distance, code_distance_saturated = estimator._minimize_code_distance(
+        100, 20, error_budget, ec_error_rate
+    )
+
+    assert code_distance == expected_distance
+    assert not code_distance_saturated
+
+
+def test_code_distance_saturates_when_the_error_budget_cannot_be_met(
+    use_delayed_gate_synthesis,
+):
+    quantum_program = get_program_from_circuit(
+        Circuit([H(0)] + [CNOT(i, i + 1) for i in range(3)] + [T(1), T(2)])
+    )
+    error_budget = ErrorBudget(
+        ultimate_failure_tolerance=1e-30, circuit_generation_weight=0
+    )
+    problem = quantum_program
+    for transformer in _get_transformers(use_delayed_gate_synthesis, error_budget):
+        problem = transformer(problem)
+    estimator = GraphResourceEstimator(
+        BasicArchitectureModel(physical_gate_error_rate=1e-3), max_code_distance=25
+    )
+
+    resource_info = estimator.estimate(problem, error_budget)
+    table = estimator.estimate_batch(
+        problem, [1e-30, 1e-1], circuit_generation_weights=0
+    )
+
+    assert resource_info.code_distance == 25
+    assert resource_info.code_distance_saturated
+    assert table.code_distance[0] == 25
+    assert table.code_distance_saturated.tolist() == [True, False]
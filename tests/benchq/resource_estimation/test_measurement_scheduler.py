@@ -0,0 +1,86 @@
+import networkx as nx
+import pytest
+
+from benchq.data_structures import CSRGraph
+from benchq.resource_estimation.graph import (
+    get_n_measurement_steps,
+    get_n_measurement_steps_bounds,
+    schedule_measurement_steps,
+    substrate_scheduler,
+)
+
+GRAPHS = [
+    nx.path_graph(10),
+    nx.complete_graph(7),
+    nx.star_graph(9),
+    nx.wheel_graph(12),
+    nx.barbell_graph(5, 3),
+    # graphs with isolated nodes, which aren't measured
+    nx.erdos_renyi_graph(20, 0.05, seed=1),
+    *[nx.erdos_renyi_graph(50, 0.1, seed=seed) for seed in range(10)],
+]
+
+
+def _get_expected_schedule(graph):
+    scheduler = substrate_scheduler(graph)
+    # the patches of substrate_scheduler are the non isolated nodes, in order
+    patches = [node for node in graph if graph.degree(node) > 0]
+    return [
+        [patches[patch] for patch, _ in step] for step in scheduler.measurement_steps
+    ]
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_native_scheduler_matches_substrate_scheduler(graph):
+    expected_schedule = _get_expected_schedule(graph)
+
+    for graph_format in [graph, CSRGraph.from_networkx(graph)]:
+        assert get_n_measurement_steps(graph_format) == len(expected_schedule)
+        assert schedule_measurement_steps(graph_format) == expected_schedule
+
+
+def test_native_scheduler_keeps_node_labels():
+    graph = nx.relabel_nodes(nx.wheel_graph(12), lambda node: f"q{node}")
+
+    assert schedule_measurement_steps(graph) == _get_expected_schedule(graph)
+
+
+def test_graph_without_edges_needs_no_measurement_steps():
+    graph = nx.empty_graph(5)
+
+    assert get_n_measurement_steps(graph) == 0
+    assert get_n_measurement_steps(CSRGraph.from_networkx(graph)) == 0
+    assert schedule_measurement_steps(graph) == []
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_bounds_contain_the_number_of_measurement_steps(graph):
+    n_measurement_steps = get_n_measurement_steps(graph)
+    csr_graph = CSRGraph.from_networkx(graph)
+
+    lower_bound, upper_bound = get_n_measurement_steps_bounds(graph)
+
+    assert lower_bound <= n_measurement_steps <= upper_bound
+    assert get_n_measurement_steps_bounds(csr_graph) == (lower_bound, upper_bound)
+    assert get_n_measurement_steps_bounds(csr_graph.statistics()) == (
+        lower_bound,
+        upper_bound,
+    )
+
+
+@pytest.mark.parametrize("graph", [nx.star_graph(9), nx.complete_graph(7)])
+def test_bounds_are_tight_for_graphs_with_a_node_connected_to_all_others(graph):
+    assert get_n_measurement_steps_bounds(graph) == (
+        get_n_measurement_steps(graph),
+        get_n_measurement_steps(graph),
+    )
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_substrate_scheduler_gives_the_same_steps_for_csr_graphs(graph):
+    csr_graph = CSRGraph.from_networkx(graph)
+
+    assert (
+        substrate_scheduler(csr_graph).measurement_steps
+        == substrate_scheduler(graph).measurement_steps
+    )